@@ -0,0 +1,68 @@
+# skrip microbenchmark penambahan aktivitas ke satu hari yang padat:
+# cek konflik linear terhadap seluruh aktivitasList vs bisect pada aktivitasList terurut
+# jalankan: uv run benchmarks/bench_aktivitas.py [--slots 288 1440 5000]
+
+import argparse
+import random
+import sys
+import time as waktu
+from datetime import date, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models.entity import HariPerjalanan, Aktivitas
+from models.exception import AktivitasKonflikException
+
+DETIK_PER_HARI = 24 * 60 * 60
+
+# konversi detik sejak tengah malam ke datetime.time
+def ke_waktu(detik: int) -> time:
+    return time(detik // 3600, detik % 3600 // 60, detik % 60)
+
+# membuat slot aktivitas berdurasi sama yang memenuhi satu hari, dalam urutan acak
+def buat_slot(jumlah: int) -> list[Aktivitas]:
+    panjang = DETIK_PER_HARI // jumlah
+    slot = [
+        Aktivitas(waktuMulai=ke_waktu(i * panjang), waktuSelesai=ke_waktu((i + 1) * panjang - 1), deskripsi=f"Slot {i}", lokasi={})
+        for i in range(jumlah)
+    ]
+    random.Random(42).shuffle(slot)
+    return slot
+
+# cara lama: bandingkan aktivitas baru dengan seluruh aktivitas pada hari tersebut
+def tambah_linear(hari: HariPerjalanan, aktivitas_baru: Aktivitas):
+    hari.cekKonflikAktivitas(aktivitas_baru, hari.aktivitasList)
+    hari.aktivitasList.append(aktivitas_baru)
+
+# mengisi satu hari dengan slot lalu mencoba menambahkan slot yang bentrok, mengembalikan detik
+def ukur(tambah, slot: list[Aktivitas], bentrok: list[Aktivitas]) -> float:
+    hari = HariPerjalanan(tanggal=date(2024, 12, 1))
+    mulai = waktu.perf_counter()
+    for aktivitas in slot:
+        tambah(hari, aktivitas)
+    for aktivitas in bentrok:
+        try:
+            tambah(hari, aktivitas)
+        except AktivitasKonflikException:
+            pass
+    return waktu.perf_counter() - mulai
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark cek konflik aktivitas")
+    parser.add_argument("--slots", type=int, nargs="+", default=[288, 1440, 5000])
+    args = parser.parse_args()
+
+    print(f"{'slot':>6} {'linear (s)':>12} {'bisect (s)':>12} {'speedup':>9}")
+    for jumlah in args.slots:
+        panjang = DETIK_PER_HARI // jumlah
+        bentrok = [
+            Aktivitas(waktuMulai=ke_waktu(i * panjang + 1), waktuSelesai=ke_waktu(i * panjang + 2), deskripsi="Bentrok", lokasi={})
+            for i in range(0, jumlah, max(jumlah // 100, 1))
+        ]
+        durasi_linear = ukur(tambah_linear, buat_slot(jumlah), bentrok)
+        durasi_bisect = ukur(HariPerjalanan.tambahAktivitas, buat_slot(jumlah), bentrok)
+        print(f"{jumlah:>6} {durasi_linear:>12.3f} {durasi_bisect:>12.3f} {durasi_linear / durasi_bisect:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# skrip benchmark throughput router sync vs router async (AsyncSession)
+# jalankan: uv run benchmarks/bench_async.py [--requests 2000] [--concurrency 200]
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-at-least-32-characters")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from database import get_session, get_async_session
+from router import router, async_router
+from security import create_access_token
+
+# membuat aplikasi dengan router sync yang memakai database file sementara
+def buat_app_sync(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_session] = get_session_override
+    return app, engine
+
+# membuat aplikasi dengan router async yang memakai database file sementara
+def buat_app_async(url: str):
+    async_engine = create_async_engine(url.replace("sqlite:", "sqlite+aiosqlite:", 1))
+
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(async_router, prefix="/api")
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    return app, async_engine
+
+# mengirim sejumlah request dengan batas konkurensi dan mengembalikan request/detik
+async def ukur(client: AsyncClient, buat_request, jumlah: int, konkurensi: int) -> float:
+    semaphore = asyncio.Semaphore(konkurensi)
+
+    async def satu(i: int):
+        async with semaphore:
+            response = await buat_request(client, i)
+            response.raise_for_status()
+
+    mulai = time.perf_counter()
+    await asyncio.gather(*(satu(i) for i in range(jumlah)))
+    return jumlah / (time.perf_counter() - mulai)
+
+async def jalankan_skenario(nama: str, buat_app, url: str, headers: dict, jumlah: int, konkurensi: int):
+    app, engine = buat_app(url)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.post("/api/perencanaan/", headers=headers, json={
+            "nama": "Benchmark",
+            "durasi": {"tanggalMulai": "2024-01-01", "tanggalSelesai": "2030-12-31"},
+            "anggaran": {"jumlah": 1e12, "mata_uang": "IDR"},
+        })
+        rencana_id = response.json()["id"]
+
+        async def get_rencana(client, i):
+            return await client.get(f"/api/perencanaan/{rencana_id}", headers=headers)
+
+        async def post_rencana(client, i):
+            return await client.post("/api/perencanaan/", headers=headers, json={
+                "nama": f"Rencana {i}",
+                "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+                "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"},
+            })
+
+        for label, buat_request in (("GET /{id}", get_rencana), ("POST /", post_rencana)):
+            rps = await ukur(client, buat_request, jumlah, konkurensi)
+            print(f"{nama:<6} {label:<10} {rps:>10.1f} req/s")
+
+    # engine async harus ditutup di event loop yang sama agar thread aiosqlite berhenti
+    if isinstance(engine, AsyncEngine):
+        await engine.dispose()
+    else:
+        engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark router sync vs async")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'johndoe'})}"}
+    print(f"{args.requests} request per skenario, konkurensi {args.concurrency}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for nama, buat_app in (("sync", buat_app_sync), ("async", buat_app_async)):
+            url = f"sqlite:///{tmp}/bench_{nama}.db"
+            SQLModel.metadata.create_all(create_engine(url))
+            asyncio.run(jalankan_skenario(nama, buat_app, url, headers, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
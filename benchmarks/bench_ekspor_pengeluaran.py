@@ -0,0 +1,110 @@
+# skrip benchmark ekspor pengeluaran: objek ORM -> csv vs batch kolom dari cursor (csv, parquet, arrow)
+# mencatat waktu dan puncak memori Python (tracemalloc, dijalankan terpisah dari pengukuran waktu)
+# jalankan: uv run benchmarks/bench_ekspor_pengeluaran.py [--items 1000000]
+
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-at-least-32-characters")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, select
+from sqlmodel import SQLModel, Session, create_engine
+
+from database import get_pool_kwargs, apply_sqlite_profile
+from ekspor_pengeluaran import ekspor_pengeluaran_ke_file, format_tersedia, NAMA_KOLOM_PENGELUARAN
+from models.aggregate_root import RencanaPerjalanan
+from models.entity import Pengeluaran
+
+# file tujuan yang hanya menghitung byte, agar yang diukur adalah pembacaan dan penulisan format
+class PenghitungByte(io.RawIOBase):
+    def __init__(self):
+        self.ukuran = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.ukuran += len(data)
+        return len(data)
+
+# mengisi database dengan jumlah pengeluaran yang tersebar pada rencana berisi 100 pengeluaran
+def isi_database(engine, jumlah: int):
+    mulai = date(2024, 1, 1)
+    with Session(engine) as session:
+        for awal in range(0, jumlah, 100_000):
+            rencana, pengeluaran = [], []
+            for i in range(awal, min(awal + 100_000, jumlah)):
+                if i % 100 == 0:
+                    rencana_id = uuid.uuid4()
+                    rencana.append({
+                        "id": rencana_id, "nama": f"Rencana {i}", "pemilik": "johndoe",
+                        "durasi_mulai": mulai, "durasi_selesai": mulai + timedelta(days=364), "anggaran_jumlah": 1e12,
+                    })
+                pengeluaran.append({
+                    "idPengeluaran": uuid.uuid4(), "deskripsi": f"Struk {i}", "tanggalPengeluaran": mulai + timedelta(days=i % 365),
+                    "biaya_jumlah": 1000.0 + i % 997, "biaya_mata_uang": "IDR", "rencana_id": rencana_id,
+                })
+            session.execute(insert(RencanaPerjalanan), rencana)
+            session.execute(insert(Pengeluaran), pengeluaran)
+        session.commit()
+
+# jalur pembanding: memuat seluruh pengeluaran sebagai objek ORM lalu menulis csv
+def ekspor_orm(session: Session, berkas) -> int:
+    teks = io.TextIOWrapper(berkas, encoding="utf-8", newline="", write_through=True)
+    penulis = csv.writer(teks, lineterminator="\n")
+    penulis.writerow(NAMA_KOLOM_PENGELUARAN)
+    semua = session.execute(select(Pengeluaran).order_by(Pengeluaran.rencana_id, Pengeluaran.tanggalPengeluaran)).scalars().all()
+    for p in semua:
+        penulis.writerow((p.idPengeluaran, p.rencana_id, p.tanggalPengeluaran, p.biaya_jumlah, p.biaya_mata_uang, p.deskripsi))
+    teks.detach()
+    return len(semua)
+
+# mengembalikan (detik, MiB ditulis, MiB puncak memori)
+def ukur(engine, ekspor) -> tuple[float, float, float]:
+    with Session(engine) as session:
+        berkas = PenghitungByte()
+        mulai = time.perf_counter()
+        ekspor(session, berkas)
+        durasi = time.perf_counter() - mulai
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        ekspor(session, PenghitungByte())
+        _, puncak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return durasi, berkas.ukuran / 1024 / 1024, puncak / 1024 / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ekspor kolumnar pengeluaran")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench_ekspor.db"
+        engine = create_engine(url, **get_pool_kwargs(url))
+        apply_sqlite_profile(engine)
+        SQLModel.metadata.create_all(engine)
+        isi_database(engine, args.items)
+
+        jalur = [("orm csv", ekspor_orm)] + [
+            (f"batch {format}", lambda session, berkas, format=format: ekspor_pengeluaran_ke_file(session, berkas, format=format))
+            for format in format_tersedia()
+        ]
+        print(f"{'jalur':<14} {'detik':>8} {'baris/s':>11} {'ukuran (MiB)':>13} {'puncak memori (MiB)':>20}")
+        for nama, ekspor in jalur:
+            durasi, ukuran, puncak = ukur(engine, ekspor)
+            print(f"{nama:<14} {durasi:>8.2f} {args.items / durasi:>11.0f} {ukuran:>13.1f} {puncak:>20.1f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# skrip benchmark penambahan pengeluaran: POST satu per satu vs satu POST batch
+# jalankan: uv run benchmarks/bench_pengeluaran_batch.py [--items 10000] [--single 500]
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-at-least-32-characters")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import SQLModel, Session, create_engine
+
+from database import get_session, get_pool_kwargs, apply_sqlite_profile
+from router import router
+from security import create_access_token
+
+RENCANA_BARU = {
+    "nama": "Rencana Benchmark",
+    "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-31"},
+    "anggaran": {"jumlah": 1e12, "mata_uang": "IDR"},
+}
+
+# membuat aplikasi router sync di atas database file dengan profil production
+def buat_app(url: str):
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **get_pool_kwargs(url))
+    apply_sqlite_profile(engine)
+    SQLModel.metadata.create_all(engine)
+
+    def get_session_override():
+        with Session(engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_session] = get_session_override
+    return app, engine
+
+# daftar item pengeluaran untuk dikirim
+def buat_item(jumlah: int) -> list[dict]:
+    return [
+        {"deskripsi": f"Struk {i}", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": f"2024-12-{i % 31 + 1:02d}"}
+        for i in range(jumlah)
+    ]
+
+# mengembalikan (detik untuk POST satu per satu, detik untuk satu POST batch)
+async def ukur(app: FastAPI, headers: dict, jumlah_batch: int, jumlah_satuan: int):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        rencana_satuan = (await client.post("/api/perencanaan/", json=RENCANA_BARU, headers=headers)).json()["id"]
+        mulai = time.perf_counter()
+        for item in buat_item(jumlah_satuan):
+            (await client.post(f"/api/perencanaan/{rencana_satuan}/pengeluaran", json=item, headers=headers)).raise_for_status()
+        durasi_satuan = time.perf_counter() - mulai
+
+        rencana_batch = (await client.post("/api/perencanaan/", json=RENCANA_BARU, headers=headers)).json()["id"]
+        item = buat_item(jumlah_batch)
+        mulai = time.perf_counter()
+        (await client.post(f"/api/perencanaan/{rencana_batch}/pengeluaran/batch", json=item, headers=headers)).raise_for_status()
+        durasi_batch = time.perf_counter() - mulai
+
+    return durasi_satuan, durasi_batch
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark penambahan pengeluaran batch")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--single", type=int, default=500)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'johndoe'})}"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engine = buat_app(f"sqlite:///{tmp}/bench_batch.db")
+        durasi_satuan, durasi_batch = asyncio.run(ukur(app, headers, args.items, args.single))
+        engine.dispose()
+
+    print(f"satuan  {args.single:>6} item  {durasi_satuan:>8.3f} s  {args.single / durasi_satuan:>10.1f} item/s")
+    print(f"batch   {args.items:>6} item  {durasi_batch:>8.3f} s  {args.items / durasi_batch:>10.1f} item/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# skrip benchmark serialisasi aggregate RencanaPerjalanan per ukuran aggregate:
+# jalur lama (model response -> jsonable_encoder -> json.dumps) vs TypeAdapter yang dikompilasi sekali (dump_json)
+# jalankan: uv run benchmarks/bench_serialisasi.py [--items 100 500 2000] [--ulang 50]
+
+import argparse
+import json
+import os
+import sys
+import time as waktu
+from datetime import date, time, timedelta
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-at-least-32-characters")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from models.aggregate_root import RencanaPerjalanan
+from models.entity import HariPerjalanan, Aktivitas, Pengeluaran
+from schema import RencanaPerjalananRead
+from serialisasi import serialisasi_rencana
+
+LOKASI = {"namaTempat": "Pantai Kuta", "alamat": "Kuta, Badung, Bali", "koordinat": {"lat": -8.7184, "lng": 115.1686}}
+
+# membuat aggregate transien berisi jumlah_item anak: separuh aktivitas (24 per hari) dan separuh pengeluaran
+def buat_rencana(jumlah_item: int) -> RencanaPerjalanan:
+    jumlah_aktivitas = jumlah_item // 2
+    jumlah_hari = max((jumlah_aktivitas + 23) // 24, 1)
+    mulai = date(2024, 12, 1)
+    rencana = RencanaPerjalanan(
+        nama="Rencana Benchmark",
+        durasi_mulai=mulai,
+        durasi_selesai=mulai + timedelta(days=jumlah_hari - 1),
+        anggaran_jumlah=1e12,
+        anggaran_mata_uang="IDR",
+    )
+    for h in range(jumlah_hari):
+        hari = HariPerjalanan(tanggal=mulai + timedelta(days=h))
+        for jam in range(min(24, jumlah_aktivitas - h * 24)):
+            hari.aktivitasList.append(
+                Aktivitas(waktuMulai=time(jam, 0), waktuSelesai=time(jam, 59), deskripsi=f"Aktivitas {h}-{jam}", lokasi=LOKASI)
+            )
+        rencana.hariPerjalananList.append(hari)
+    for i in range(jumlah_item - jumlah_aktivitas):
+        rencana.pengeluaranList.append(
+            Pengeluaran(deskripsi=f"Struk {i}", biaya_jumlah=125000.0, biaya_mata_uang="IDR", tanggalPengeluaran=mulai + timedelta(days=i % jumlah_hari))
+        )
+    return rencana
+
+# jalur sebelumnya: handler mengembalikan model response lalu FastAPI menjalankan jsonable_encoder dan json.dumps
+def serialisasi_lama(rencana: RencanaPerjalanan) -> bytes:
+    konten = jsonable_encoder(RencanaPerjalananRead.model_validate(rencana))
+    return json.dumps(konten, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# rata-rata milidetik per serialisasi
+def ukur(serialisasi, rencana: RencanaPerjalanan, ulang: int) -> float:
+    serialisasi(rencana)
+    mulai = waktu.perf_counter()
+    for _ in range(ulang):
+        serialisasi(rencana)
+    return (waktu.perf_counter() - mulai) / ulang * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serialisasi aggregate")
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--ulang", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'item':>6} {'ukuran (KiB)':>13} {'lama (ms)':>10} {'adapter (ms)':>13} {'speedup':>9}")
+    for jumlah in args.items:
+        rencana = buat_rencana(jumlah)
+        assert json.loads(serialisasi_lama(rencana)) == json.loads(serialisasi_rencana(rencana))
+        durasi_lama = ukur(serialisasi_lama, rencana, args.ulang)
+        durasi_baru = ukur(serialisasi_rencana, rencana, args.ulang)
+        ukuran = len(serialisasi_rencana(rencana)) / 1024
+        print(f"{jumlah:>6} {ukuran:>13.1f} {durasi_lama:>10.2f} {durasi_baru:>13.2f} {durasi_lama / durasi_baru:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# skrip benchmark throughput GET/POST bersamaan pada SQLite: pengaturan bawaan vs profil production (WAL)
+# jalankan: uv run benchmarks/bench_sqlite.py [--requests 2000] [--concurrency 40] [--write-ratio 0.2]
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-at-least-32-characters")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from sqlmodel import SQLModel, Session, create_engine
+
+from database import get_session, get_pool_kwargs, apply_sqlite_profile
+from router import router
+from security import create_access_token
+
+RENCANA_BARU = {
+    "nama": "Rencana Benchmark",
+    "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+    "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"},
+}
+
+# membuat aplikasi router sync di atas database file dengan atau tanpa profil production
+def buat_app(url: str, profil: bool):
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **get_pool_kwargs(url))
+    if profil:
+        apply_sqlite_profile(engine)
+    SQLModel.metadata.create_all(engine)
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.dependency_overrides[get_session] = get_session_override
+    return app, engine
+
+# campuran GET dan POST bersamaan, mengembalikan (request/detik, p99 latensi ms)
+async def ukur(app: FastAPI, headers: dict, jumlah: int, konkurensi: int, rasio_tulis: float):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        rencana_id = (await client.post("/api/perencanaan/", json=RENCANA_BARU, headers=headers)).json()["id"]
+        semaphore = asyncio.Semaphore(konkurensi)
+        latensi = []
+        setiap_tulis = max(int(1 / rasio_tulis), 1) if rasio_tulis > 0 else 0
+
+        async def satu(i: int):
+            async with semaphore:
+                mulai = time.perf_counter()
+                if setiap_tulis and i % setiap_tulis == 0:
+                    response = await client.post("/api/perencanaan/", json=RENCANA_BARU, headers=headers)
+                else:
+                    response = await client.get(f"/api/perencanaan/{rencana_id}", headers=headers)
+                response.raise_for_status()
+                latensi.append((time.perf_counter() - mulai) * 1000)
+
+        mulai = time.perf_counter()
+        await asyncio.gather(*(satu(i) for i in range(jumlah)))
+        durasi = time.perf_counter() - mulai
+
+    latensi.sort()
+    return jumlah / durasi, latensi[int(len(latensi) * 0.99) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark profil SQLite")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'johndoe'})}"}
+    print(f"{args.requests} request, konkurensi {args.concurrency}, rasio tulis {args.write_ratio}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for nama, profil in (("default", False), ("production", True)):
+            app, engine = buat_app(f"sqlite:///{tmp}/bench_{nama}.db", profil)
+            rps, p99 = asyncio.run(ukur(app, headers, args.requests, args.concurrency, args.write_ratio))
+            engine.dispose()
+            print(f"{nama:<11} {rps:>10.1f} req/s   p99 {p99:>8.1f} ms")
+
+if __name__ == "__main__":
+    main()
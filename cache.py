@@ -0,0 +1,166 @@
+# skrip berisikan cache in-process untuk aggregate RencanaPerjalanan yang sudah diserialisasi
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from uuid import UUID
+
+from invalidasi import BusInvalidasi, CACHE_INVALIDASI_URL, buat_bus
+
+# konfigurasi cache dari Environment Variable (cache nonaktif secara default)
+CACHE_AGGREGATE = os.getenv("CACHE_AGGREGATE", "false").lower() in ("1", "true", "yes")
+CACHE_AGGREGATE_TTL = float(os.getenv("CACHE_AGGREGATE_TTL", "30"))  # detik
+CACHE_AGGREGATE_MAKS_BYTE = int(os.getenv("CACHE_AGGREGATE_MAKS_BYTE", str(64 * 1024 * 1024)))
+
+# perkiraan overhead per entri (kunci, tuple, node OrderedDict) yang ikut dihitung ke batas memori
+OVERHEAD_ENTRI_BYTE = 200
+
+# jumlah maksimal penanda versi minimal yang disimpan untuk rencana yang baru diinvalidasi
+MAKS_PENANDA_INVALIDASI = 10000
+
+# cache LRU + TTL berisi JSON aggregate per rencana beserta versinya, dibatasi total ukuran byte
+# aman dipakai bersamaan oleh worker threadpool; semua operasi O(1)
+class CacheAggregate:
+    def __init__(self, ttl: float = CACHE_AGGREGATE_TTL, maks_byte: int = CACHE_AGGREGATE_MAKS_BYTE, waktu: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maks_byte = maks_byte
+        self._waktu = waktu
+        self._lock = threading.Lock()
+        self.bersihkan()
+
+    # mengosongkan seluruh entri dan statistik
+    def bersihkan(self):
+        with self._lock:
+            # rencana_id -> (versi, isi JSON, waktu kedaluwarsa)
+            self._entri: "OrderedDict[UUID, Tuple[int, bytes, float]]" = OrderedDict()
+            # rencana_id -> versi minimal yang boleh disimpan setelah invalidasi
+            self._versi_minimal: "OrderedDict[UUID, int]" = OrderedDict()
+            self._ukuran_byte = 0
+            self._hit = 0
+            self._miss = 0
+            self._eviksi = 0
+            self._kedaluwarsa = 0
+            self._invalidasi = 0
+
+    # mengambil (versi, isi JSON) rencana bila ada dan belum kedaluwarsa
+    def ambil(self, rencana_id: UUID) -> Optional[Tuple[int, bytes]]:
+        with self._lock:
+            entri = self._entri.get(rencana_id)
+            if entri is None:
+                self._miss += 1
+                return None
+            versi, isi, kedaluwarsa = entri
+            if self._waktu() >= kedaluwarsa:
+                self._lepas(rencana_id)
+                self._kedaluwarsa += 1
+                self._miss += 1
+                return None
+            self._entri.move_to_end(rencana_id)
+            self._hit += 1
+            return versi, isi
+
+    # menyimpan JSON aggregate hasil baca database
+    # ditolak bila versinya lebih lama dari entri yang ada atau dari versi hasil penulisan yang sudah diinvalidasi,
+    # sehingga pembaca yang kalah balapan dengan penulis tidak menyimpan aggregate basi
+    def simpan(self, rencana_id: UUID, versi: int, isi: bytes) -> bool:
+        ukuran = len(isi) + OVERHEAD_ENTRI_BYTE
+        if ukuran > self.maks_byte:
+            return False
+        with self._lock:
+            if versi < self._versi_minimal.get(rencana_id, 0):
+                return False
+            lama = self._entri.get(rencana_id)
+            if lama is not None:
+                if lama[0] > versi:
+                    return False
+                self._lepas(rencana_id)
+            self._entri[rencana_id] = (versi, isi, self._waktu() + self.ttl)
+            self._ukuran_byte += ukuran
+            while self._ukuran_byte > self.maks_byte:
+                self._lepas(next(iter(self._entri)))
+                self._eviksi += 1
+            return True
+
+    # menghapus entri rencana setelah penulisan; versi_baru (bila diketahui) menjadi versi minimal yang boleh disimpan
+    def invalidasi(self, rencana_id: UUID, versi_baru: Optional[int] = None):
+        with self._lock:
+            if rencana_id in self._entri:
+                self._lepas(rencana_id)
+            self._invalidasi += 1
+            if versi_baru is not None and versi_baru > self._versi_minimal.get(rencana_id, 0):
+                self._versi_minimal[rencana_id] = versi_baru
+                self._versi_minimal.move_to_end(rencana_id)
+                if len(self._versi_minimal) > MAKS_PENANDA_INVALIDASI:
+                    self._versi_minimal.popitem(last=False)
+
+    # mengeluarkan seluruh entri tanpa mengubah statistik (mis. saat pesan invalidasi mungkin terlewat)
+    def kosongkan(self):
+        with self._lock:
+            self._entri.clear()
+            self._ukuran_byte = 0
+
+    # menghapus entri dan mengurangi ukuran total (dipanggil saat lock dipegang)
+    def _lepas(self, rencana_id: UUID):
+        _, isi, _ = self._entri.pop(rencana_id)
+        self._ukuran_byte -= len(isi) + OVERHEAD_ENTRI_BYTE
+
+    # ringkasan statistik cache
+    def snapshot(self) -> dict:
+        with self._lock:
+            jumlah_akses = self._hit + self._miss
+            return {
+                "jumlah_entri": len(self._entri),
+                "ukuran_byte": self._ukuran_byte,
+                "maks_byte": self.maks_byte,
+                "ttl_detik": self.ttl,
+                "hit": self._hit,
+                "miss": self._miss,
+                "rasio_hit": self._hit / jumlah_akses if jumlah_akses else 0.0,
+                "eviksi": self._eviksi,
+                "kedaluwarsa": self._kedaluwarsa,
+                "invalidasi": self._invalidasi,
+            }
+
+# instance cache yang dipakai router, None bila CACHE_AGGREGATE tidak diaktifkan
+cache_aggregate: Optional[CacheAggregate] = CacheAggregate() if CACHE_AGGREGATE else None
+
+# bus invalidasi antar worker, None bila cache nonaktif atau CACHE_INVALIDASI_URL tidak diisi
+bus_invalidasi: Optional[BusInvalidasi] = buat_bus(CACHE_INVALIDASI_URL) if CACHE_AGGREGATE and CACHE_INVALIDASI_URL else None
+
+# menginvalidasi entri rencana setelah penulisan: langsung di cache proses ini lalu diterbitkan ke worker lain
+# bus yang tidak tersedia tidak menggagalkan penulisan yang sudah di-commit
+def invalidasi_rencana(rencana_id: UUID, versi: int):
+    if cache_aggregate is None:
+        return
+    cache_aggregate.invalidasi(rencana_id, versi)
+    if bus_invalidasi is not None:
+        bus_invalidasi.terbitkan_aman(rencana_id, versi)
+
+# menerapkan pesan invalidasi dari worker lain
+def _terima_invalidasi(rencana_id: UUID, versi: int):
+    if cache_aggregate is not None:
+        cache_aggregate.invalidasi(rencana_id, versi)
+
+# mengosongkan cache saat bus tidak dapat menjamin semua pesan diterima
+def _kosongkan_cache():
+    if cache_aggregate is not None:
+        cache_aggregate.kosongkan()
+
+# menjalankan penerima bus invalidasi (dipanggil saat startup aplikasi)
+def mulai_bus_invalidasi():
+    if bus_invalidasi is not None:
+        bus_invalidasi.mulai(_terima_invalidasi, _kosongkan_cache)
+
+# menghentikan penerima bus invalidasi (dipanggil saat shutdown aplikasi)
+def hentikan_bus_invalidasi():
+    if bus_invalidasi is not None:
+        bus_invalidasi.berhenti()
+
+# statistik cache aggregate beserta status aktif dan bus invalidasinya
+def get_statistik_cache() -> dict:
+    if cache_aggregate is None:
+        return {"aktif": False}
+    bus = bus_invalidasi.snapshot() if bus_invalidasi is not None else None
+    return {"aktif": True, **cache_aggregate.snapshot(), "bus": bus}
@@ -1,6 +1,17 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy import event, func, inspect, select, text, update
+from sqlalchemy.schema import CreateColumn
+from pool_metrics import QueuePoolTerukur, AsyncQueuePoolTerukur, statistik_pool_sync, statistik_pool_async
+from models.aggregate_root import RencanaPerjalanan, waktu_sekarang
+from repository import hitung_ulang_total_pengeluaran
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # URL dari Environment Variable atau default ke SQLite lokal
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./local_travel.db")
 
@@ -8,26 +19,222 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./local_travel.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# mode async (AsyncSession + driver async) diaktifkan lewat DATABASE_ASYNC=true
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# fungsi untuk mengubah URL sync menjadi URL dengan driver async (aiosqlite/asyncpg)
+def get_async_database_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+
+# Konfigurasi connection pool dari Environment Variable
+# default pool_size + max_overflow disamakan dengan 40 worker threadpool Starlette
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# mode session: expire_on_commit=False (default) mempertahankan state objek setelah commit sehingga
+# response tidak memuat ulang kolom/relasi; DB_EXPIRE_ON_COMMIT=true mengembalikan perilaku bawaan SQLAlchemy
+DB_EXPIRE_ON_COMMIT = os.getenv("DB_EXPIRE_ON_COMMIT", "false").lower() in ("1", "true", "yes")
+
+# jumlah percobaan penulisan saat UPDATE compare-and-swap pada kolom versi rencana gagal
+MAKS_PERCOBAAN_TULIS = int(os.getenv("MAKS_PERCOBAAN_TULIS", "3"))
+
+# pemilik yang diberikan kepada rencana lama saat kolom pemilik ditambahkan oleh migrasi init_db
+# kosong = rencana lama dibiarkan tanpa pemilik (tidak muncul di daftar siapa pun) dan migrasi mencatat peringatan
+PEMILIK_RENCANA_LAMA = os.getenv("PEMILIK_RENCANA_LAMA") or None
+
+# Profil SQLite: "production" (WAL + pragma tuning) atau "default" (pengaturan bawaan SQLite)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production").lower()
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negatif = KiB, yaitu 64 MiB
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # milidetik
+
+# cek apakah URL mengarah ke SQLite in-memory
+def is_sqlite_memory(url: str) -> bool:
+    return url.startswith("sqlite") and make_url(url).database in (None, "", ":memory:")
+
+# daftar PRAGMA untuk profil SQLite production
+def get_sqlite_pragmas() -> list[str]:
+    return [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={SQLITE_CACHE_SIZE}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}",
+    ]
+
+# memasang hook connect yang menjalankan PRAGMA profil production pada setiap koneksi baru
+# WAL membuat pembaca tidak terblokir oleh commit penulis, sehingga tiap worker threadpool
+# dapat memakai koneksinya sendiri dari pool secara bersamaan
+def apply_sqlite_profile(sync_engine):
+    @event.listens_for(sync_engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in get_sqlite_pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+# fungsi untuk menyusun argumen pool engine (SQLite in-memory memakai pool bawaan SQLAlchemy)
+def get_pool_kwargs(url: str, is_async: bool = False) -> dict:
+    if is_sqlite_memory(url):
+        return {}
+    return {
+        "poolclass": AsyncQueuePoolTerukur if is_async else QueuePoolTerukur,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
 # Engine database dengan konfigurasi yang tepat
 if DATABASE_URL.startswith("sqlite"):
     # Untuk SQLite, gunakan sync driver dan check_same_thread=False
     engine = create_engine(
-        DATABASE_URL, 
+        DATABASE_URL,
         echo=False,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        **get_pool_kwargs(DATABASE_URL)
     )
 else:
     # Untuk PostgreSQL atau database lainnya
-    engine = create_engine(DATABASE_URL, echo=False)
+    engine = create_engine(DATABASE_URL, echo=False, **get_pool_kwargs(DATABASE_URL))
+
+# profil production hanya berlaku untuk SQLite berbasis file
+USE_SQLITE_PROFILE = (
+    DATABASE_URL.startswith("sqlite")
+    and not is_sqlite_memory(DATABASE_URL)
+    and SQLITE_PROFILE == "production"
+)
+
+if USE_SQLITE_PROFILE:
+    apply_sqlite_profile(engine)
+
+# engine async hanya dibuat saat dibutuhkan agar driver async tidak wajib di mode sync
+_async_engine = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **get_pool_kwargs(ASYNC_DATABASE_URL, is_async=True))
+        if USE_SQLITE_PROFILE:
+            apply_sqlite_profile(_async_engine.sync_engine)
+    return _async_engine
 
 # membuat semua tabel yang didefinisikan di SQLModel metadata
-def init_db():
-    SQLModel.metadata.create_all(engine)
+def init_db(db_engine=engine):
+    SQLModel.metadata.create_all(db_engine)
+    # create_all melewati tabel yang sudah ada, sehingga kolom dan index baru ditambahkan terpisah
+    kolom_baru = migrasi_kolom(db_engine)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db_engine, checkfirst=True)
+    isi_kolom_baru(db_engine, kolom_baru)
+
+# menambahkan kolom model yang belum ada pada tabel lama lewat ALTER TABLE ... ADD COLUMN
+# kolom NOT NULL tanpa server_default ditambahkan nullable (SQLite menolak NOT NULL tanpa default)
+# lalu diisi oleh isi_kolom_baru; mengembalikan pasangan (tabel, kolom) yang ditambahkan
+def migrasi_kolom(db_engine) -> set[tuple[str, str]]:
+    inspektor = inspect(db_engine)
+    ditambahkan = set()
+    with db_engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            kolom_ada = {kolom["name"] for kolom in inspektor.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in kolom_ada:
+                    continue
+                kolom = column._copy()
+                kolom.nullable = column.nullable or column.server_default is None
+                definisi = CreateColumn(kolom).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {conn.dialect.identifier_preparer.format_table(table)} ADD COLUMN {definisi}"))
+                ditambahkan.add((table.name, column.name))
+    return ditambahkan
+
+# mengisi kolom hasil migrasi pada baris lama agar sama dengan data yang ditulis aplikasi
+def isi_kolom_baru(db_engine, kolom_baru: set[tuple[str, str]]):
+    tabel = RencanaPerjalanan.__tablename__
+    with Session(db_engine) as session:
+        # total dan jumlah pengeluaran dihitung sekali dari tabel pengeluaran
+        # migrasi berjalan sebelum aplikasi melayani request, sehingga belum ada entri cache yang perlu diinvalidasi
+        if {(tabel, "total_pengeluaran"), (tabel, "jumlah_pengeluaran")} & kolom_baru:
+            hitung_ulang_total_pengeluaran(session)
+        # baris lama dimulai dari versi 1, termasuk setelah backfill total di atas menaikkan versinya
+        if (tabel, "versi") in kolom_baru:
+            session.execute(update(RencanaPerjalanan.__table__).values(versi=1))
+        # rencana lama diberikan kepada PEMILIK_RENCANA_LAMA agar tetap muncul di daftar rencana pemiliknya;
+        # tanpa variabel tersebut pemilik dibiarkan NULL, karena menebak pemilik dapat membuka rencana kepada user yang salah
+        if (tabel, "pemilik") in kolom_baru:
+            if PEMILIK_RENCANA_LAMA is not None:
+                session.execute(
+                    update(RencanaPerjalanan.__table__)
+                    .where(RencanaPerjalanan.pemilik.is_(None))
+                    .values(pemilik=PEMILIK_RENCANA_LAMA)
+                )
+            else:
+                tanpa_pemilik = session.execute(
+                    select(func.count()).select_from(RencanaPerjalanan.__table__).where(RencanaPerjalanan.pemilik.is_(None))
+                ).scalar_one()
+                if tanpa_pemilik:
+                    logger.warning(
+                        "%d rencana lama tidak memiliki pemilik dan tidak akan muncul di daftar rencana; "
+                        "isi kolom pemilik secara manual, misalnya UPDATE %s SET pemilik = '<username>' WHERE pemilik IS NULL",
+                        tanpa_pemilik, tabel
+                    )
+        # waktu migrasi menjadi waktu perubahan terakhir, sehingga ekspor inkremental berikutnya memuat baris lama
+        if (tabel, "diperbarui_pada") in kolom_baru:
+            session.execute(
+                update(RencanaPerjalanan.__table__)
+                .where(RencanaPerjalanan.diperbarui_pada.is_(None))
+                .values(diperbarui_pada=waktu_sekarang())
+            )
+        session.commit()
 
 # Dependency injection untuk session database
 def get_session():
-    with Session(engine) as session:
+    with Session(engine, expire_on_commit=DB_EXPIRE_ON_COMMIT) as session:
+        yield session
+
+# Dependency injection untuk AsyncSession (mode async)
+# selalu expire_on_commit=False karena response diserialisasi di luar greenlet AsyncSession
+async def get_async_session():
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
         yield session
 
+# me-refresh hanya kolom yang nilainya dibuat database (server_default/server_onupdate) dan belum dimuat
+# kolom dengan default Python sudah terisi saat INSERT sehingga umumnya tidak ada query tambahan
+def refresh_kolom_server(session: Session, obj) -> None:
+    state = inspect(obj)
+    kolom = [
+        attr.key for attr in state.mapper.column_attrs
+        if attr.key in state.unloaded
+        and any(c.server_default is not None or c.server_onupdate is not None for c in attr.columns)
+    ]
+    if kolom:
+        session.refresh(obj, attribute_names=kolom)
+
+# menutup engine async saat aplikasi berhenti
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+# statistik connection pool engine sync dan async (None jika engine async belum dibuat)
+def get_statistik_pool() -> dict:
+    return {
+        "sync": statistik_pool_sync.snapshot(engine.pool),
+        "async": statistik_pool_async.snapshot(_async_engine.sync_engine.pool) if _async_engine is not None else None,
+    }
+
 # Alias untuk konsistensi dengan router
 get_db = get_session
\ No newline at end of file
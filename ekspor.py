@@ -0,0 +1,171 @@
+# skrip berisikan ekspor NDJSON RencanaPerjalanan beserta hari, aktivitas dan pengeluarannya
+# satu baris per rencana dengan bentuk yang sama seperti response GET aggregate (ditambah pemilik, total dan diperbarui_pada)
+# rencana dibaca dengan server-side cursor (yield_per) dan koleksi anak dimuat per batch,
+# sehingga memori tetap konstan berapa pun jumlah rencana
+# jalankan: uv run ekspor.py --output rencana.ndjson [--sejak 2024-12-01T00:00:00] [--pemilik johndoe]
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, select
+from sqlmodel import Session
+
+from database import engine
+from models.aggregate_root import RencanaPerjalanan
+from models.entity import HariPerjalanan, Aktivitas, Pengeluaran
+
+# jumlah rencana per batch cursor (juga batas jumlah rencana yang koleksi anaknya dimuat sekaligus)
+UKURAN_BATCH_EKSPOR = 500
+
+# tumpang tindih cursor ekspor inkremental (detik), minimal selama transaksi tulis terlama:
+# diperbarui_pada dicatat saat aggregate diubah, sedangkan barisnya baru terlihat setelah commit
+EKSPOR_OVERLAP_DETIK = float(os.getenv("EKSPOR_OVERLAP_DETIK", "60"))
+
+KOLOM_RENCANA_EKSPOR = (
+    RencanaPerjalanan.id,
+    RencanaPerjalanan.nama,
+    RencanaPerjalanan.pemilik,
+    RencanaPerjalanan.durasi_mulai,
+    RencanaPerjalanan.durasi_selesai,
+    RencanaPerjalanan.anggaran_jumlah,
+    RencanaPerjalanan.anggaran_mata_uang,
+    RencanaPerjalanan.total_pengeluaran,
+    RencanaPerjalanan.jumlah_pengeluaran,
+    RencanaPerjalanan.versi,
+    RencanaPerjalanan.diperbarui_pada,
+)
+KOLOM_HARI_EKSPOR = (HariPerjalanan.idHari, HariPerjalanan.tanggal, HariPerjalanan.rencana_id)
+KOLOM_AKTIVITAS_EKSPOR = (
+    Aktivitas.idAktivitas, Aktivitas.waktuMulai, Aktivitas.waktuSelesai, Aktivitas.deskripsi, Aktivitas.lokasi, Aktivitas.hari_id
+)
+KOLOM_PENGELUARAN_EKSPOR = (
+    Pengeluaran.idPengeluaran, Pengeluaran.deskripsi, Pengeluaran.tanggalPengeluaran,
+    Pengeluaran.biaya_jumlah, Pengeluaran.biaya_mata_uang, Pengeluaran.rencana_id
+)
+
+# menyamakan timestamp masukan dengan kolom diperbarui_pada (UTC tanpa tzinfo)
+def ke_utc_naif(waktu: datetime) -> datetime:
+    if waktu.tzinfo is None:
+        return waktu
+    return waktu.astimezone(timezone.utc).replace(tzinfo=None)
+
+# filter rencana berdasarkan rentang diperbarui_pada dan pemilik
+def _filter_rencana(query, diperbarui_sejak: Optional[datetime], diperbarui_sampai: Optional[datetime], pemilik: Optional[str]):
+    if diperbarui_sejak is not None:
+        query = query.where(RencanaPerjalanan.diperbarui_pada >= ke_utc_naif(diperbarui_sejak))
+    if diperbarui_sampai is not None:
+        query = query.where(RencanaPerjalanan.diperbarui_pada <= ke_utc_naif(diperbarui_sampai))
+    if pemilik is not None:
+        query = query.where(RencanaPerjalanan.pemilik == pemilik)
+    return query
+
+# menentukan (batas atas, cursor berikutnya) sebelum ekspor dialirkan
+# batas atas adalah diperbarui_pada terbesar yang sudah ter-commit; ekspor hanya mengalirkan rencana sampai batas itu,
+# sehingga cursor diambil dari diperbarui_pada terbesar yang benar-benar dialirkan dikurangi EKSPOR_OVERLAP_DETIK.
+# penulisan yang dicatat sebelum batas tetapi baru di-commit setelah ekspor masih tercakup ekspor berikutnya;
+# akibatnya rencana di sekitar cursor dapat terekspor lebih dari sekali, dan konsumen menghapus duplikat berdasarkan id
+def batas_ekspor(
+    session: Session,
+    diperbarui_sejak: Optional[datetime] = None,
+    pemilik: Optional[str] = None
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    query = _filter_rencana(select(func.max(RencanaPerjalanan.diperbarui_pada)), diperbarui_sejak, None, pemilik)
+    batas = session.execute(query).scalar()
+    if batas is None:
+        # tidak ada rencana yang dialirkan, cursor sebelumnya tetap berlaku
+        return None, ke_utc_naif(diperbarui_sejak) if diperbarui_sejak is not None else None
+    return batas, batas - timedelta(seconds=EKSPOR_OVERLAP_DETIK)
+
+# menghasilkan baris NDJSON (bytes) untuk setiap rencana, terurut (diperbarui_pada, id)
+# diperbarui_sejak membatasi ekspor ke rencana yang berubah sejak waktu tersebut (ekspor inkremental),
+# diperbarui_sampai membatasi ekspor ke rencana sampai batas atas dari batas_ekspor
+def iter_rencana_ndjson(
+    session: Session,
+    diperbarui_sejak: Optional[datetime] = None,
+    pemilik: Optional[str] = None,
+    ukuran_batch: int = UKURAN_BATCH_EKSPOR,
+    diperbarui_sampai: Optional[datetime] = None
+) -> Iterator[bytes]:
+    query = select(*KOLOM_RENCANA_EKSPOR).order_by(RencanaPerjalanan.diperbarui_pada, RencanaPerjalanan.id)
+    query = _filter_rencana(query, diperbarui_sejak, diperbarui_sampai, pemilik)
+
+    hasil = session.execute(query.execution_options(yield_per=ukuran_batch))
+    for batch in hasil.mappings().partitions():
+        yield from _ndjson_batch(session, batch)
+
+# memuat koleksi anak untuk satu batch rencana (satu query per jenis anak) lalu menyusun barisnya
+def _ndjson_batch(session: Session, batch) -> Iterator[bytes]:
+    rencana_ids = [baris["id"] for baris in batch]
+
+    aktivitas_per_hari = defaultdict(list)
+    query_aktivitas = (
+        select(*KOLOM_AKTIVITAS_EKSPOR)
+        .join(HariPerjalanan, Aktivitas.hari_id == HariPerjalanan.idHari)
+        .where(HariPerjalanan.rencana_id.in_(rencana_ids))
+        .order_by(Aktivitas.hari_id, Aktivitas.waktuMulai, Aktivitas.waktuSelesai)
+    )
+    for aktivitas in session.execute(query_aktivitas).mappings():
+        aktivitas_per_hari[aktivitas["hari_id"]].append(dict(aktivitas))
+
+    hari_per_rencana = defaultdict(list)
+    query_hari = select(*KOLOM_HARI_EKSPOR).where(HariPerjalanan.rencana_id.in_(rencana_ids)).order_by(HariPerjalanan.rencana_id, HariPerjalanan.tanggal)
+    for hari in session.execute(query_hari).mappings():
+        hari_per_rencana[hari["rencana_id"]].append({**hari, "aktivitasList": aktivitas_per_hari.pop(hari["idHari"], [])})
+
+    pengeluaran_per_rencana = defaultdict(list)
+    query_pengeluaran = (
+        select(*KOLOM_PENGELUARAN_EKSPOR)
+        .where(Pengeluaran.rencana_id.in_(rencana_ids))
+        .order_by(Pengeluaran.rencana_id, Pengeluaran.tanggalPengeluaran, Pengeluaran.idPengeluaran)
+    )
+    for pengeluaran in session.execute(query_pengeluaran).mappings():
+        pengeluaran_per_rencana[pengeluaran["rencana_id"]].append(dict(pengeluaran))
+
+    for rencana in batch:
+        yield orjson.dumps({
+            **rencana,
+            "hariPerjalananList": hari_per_rencana.pop(rencana["id"], []),
+            "pengeluaranList": pengeluaran_per_rencana.pop(rencana["id"], []),
+        }) + b"\n"
+
+# menulis ekspor ke file, mengembalikan jumlah rencana yang ditulis
+def ekspor_ke_file(session: Session, berkas: BinaryIO, **opsi) -> int:
+    jumlah = 0
+    for baris in iter_rencana_ndjson(session, **opsi):
+        berkas.write(baris)
+        jumlah += 1
+    return jumlah
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor NDJSON rencana perjalanan")
+    parser.add_argument("--output", default="-", help="File tujuan, - untuk stdout")
+    parser.add_argument("--sejak", type=datetime.fromisoformat, default=None, help="Hanya rencana yang berubah sejak waktu ISO 8601 ini")
+    parser.add_argument("--pemilik", default=None)
+    parser.add_argument("--batch", type=int, default=UKURAN_BATCH_EKSPOR)
+    args = parser.parse_args()
+
+    mulai = time.perf_counter()
+    berkas = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        with Session(engine) as session:
+            batas, cursor = batas_ekspor(session, diperbarui_sejak=args.sejak, pemilik=args.pemilik)
+            jumlah = ekspor_ke_file(
+                session, berkas, diperbarui_sejak=args.sejak, diperbarui_sampai=batas, pemilik=args.pemilik, ukuran_batch=args.batch
+            )
+    finally:
+        if berkas is not sys.stdout.buffer:
+            berkas.close()
+    durasi = time.perf_counter() - mulai
+
+    print(f"{jumlah} rencana diekspor dalam {durasi:.2f} s ({jumlah / max(durasi, 1e-9):.0f} rencana/s)", file=sys.stderr)
+    if cursor is not None:
+        print(f"ekspor berikutnya: --sejak {cursor.isoformat()}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
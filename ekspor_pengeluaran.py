@@ -0,0 +1,215 @@
+# skrip berisikan ekspor kolumnar Pengeluaran (CSV, Parquet, Arrow IPC) untuk analitik
+# satu baris per pengeluaran: idPengeluaran, rencana_id, tanggalPengeluaran, biaya_jumlah, biaya_mata_uang, deskripsi
+# baris dibaca langsung dari cursor database (yield_per, tanpa objek ORM) dan ditulis per batch kolom,
+# sehingga memori dibatasi oleh ukuran batch berapa pun jumlah pengeluaran
+# jalankan: uv run ekspor_pengeluaran.py --format parquet --output pengeluaran.parquet [--pemilik johndoe]
+
+import argparse
+import csv
+import io
+import sys
+import time
+from datetime import date
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from sqlalchemy import String, cast, func, select, type_coerce
+from sqlmodel import Session
+
+from database import engine
+from models.aggregate_root import RencanaPerjalanan
+from models.entity import Pengeluaran
+
+# pyarrow bersifat opsional (pip install travel-planner[analitik]); tanpa pyarrow hanya format csv yang tersedia
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# jumlah baris per batch cursor, juga ukuran row group Parquet dan record batch Arrow
+UKURAN_BATCH_PENGELUARAN = 65536
+
+# urutan kolom pada file ekspor
+NAMA_KOLOM_PENGELUARAN = ("idPengeluaran", "rencana_id", "tanggalPengeluaran", "biaya_jumlah", "biaya_mata_uang", "deskripsi")
+
+# media type dan ekstensi file per format
+MEDIA_TYPE_FORMAT = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EKSTENSI_FORMAT = {"csv": "csv", "parquet": "parquet", "arrow": "arrows"}
+
+# format yang tersedia sesuai paket yang terpasang
+def format_tersedia() -> list[str]:
+    return ["csv", "parquet", "arrow"] if pyarrow is not None else ["csv"]
+
+def _cek_format(format: str):
+    if format not in format_tersedia():
+        raise ValueError(f"Format {format} tidak tersedia, pilih salah satu dari {', '.join(format_tersedia())}")
+
+# skema Arrow pengeluaran; id disimpan sebagai string UUID seperti pada response API
+def skema_arrow():
+    return pyarrow.schema([
+        ("idPengeluaran", pyarrow.string()),
+        ("rencana_id", pyarrow.string()),
+        ("tanggalPengeluaran", pyarrow.date32()),
+        ("biaya_jumlah", pyarrow.float64()),
+        ("biaya_mata_uang", pyarrow.string()),
+        ("deskripsi", pyarrow.string()),
+    ])
+
+# UUID sebagai teks bertanda hubung langsung dari database, tanpa membuat objek UUID per baris
+# SQLite menyimpan UUID sebagai 32 karakter hex, PostgreSQL sebagai tipe uuid native
+def _uuid_sebagai_teks(kolom, dialek: str):
+    if dialek != "sqlite":
+        return cast(kolom, String).label(kolom.key)
+    hex_ = type_coerce(kolom, String)
+    bagian = [func.substr(hex_, awal, panjang, type_=String) for awal, panjang in ((1, 8), (9, 4), (13, 4), (17, 4), (21, 12))]
+    teks = bagian[0]
+    for lanjutan in bagian[1:]:
+        teks = teks + "-" + lanjutan
+    return teks.label(kolom.key)
+
+# menghasilkan batch baris pengeluaran (list tuple) langsung dari cursor dalam urutan tabel (tanpa sort)
+# query dijalankan pada koneksi Core tanpa lapisan ORM; tanggal dibaca apa adanya dari driver
+# (teks ISO 8601 pada SQLite, objek date pada PostgreSQL) sehingga tidak ada konversi per baris di Python
+def iter_batch_pengeluaran(
+    session: Session,
+    pemilik: Optional[str] = None,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    ukuran_batch: int = UKURAN_BATCH_PENGELUARAN
+) -> Iterator[list[tuple]]:
+    koneksi = session.connection()
+    dialek = koneksi.dialect.name
+    query = select(
+        _uuid_sebagai_teks(Pengeluaran.idPengeluaran, dialek),
+        _uuid_sebagai_teks(Pengeluaran.rencana_id, dialek),
+        type_coerce(Pengeluaran.tanggalPengeluaran, String).label("tanggalPengeluaran"),
+        Pengeluaran.biaya_jumlah,
+        Pengeluaran.biaya_mata_uang,
+        Pengeluaran.deskripsi,
+    )
+    if pemilik is not None:
+        query = query.join(RencanaPerjalanan, Pengeluaran.rencana_id == RencanaPerjalanan.id).where(RencanaPerjalanan.pemilik == pemilik)
+    if tanggal_dari is not None:
+        query = query.where(Pengeluaran.tanggalPengeluaran >= tanggal_dari)
+    if tanggal_sampai is not None:
+        query = query.where(Pengeluaran.tanggalPengeluaran <= tanggal_sampai)
+
+    hasil = koneksi.execute(query.execution_options(yield_per=ukuran_batch))
+    for batch in hasil.tuples().partitions():
+        yield batch
+
+# menyusun record batch Arrow dari satu batch baris (baris dipindah ke kolom sekali per batch)
+def _record_batch(batch: list[tuple], skema):
+    id_pengeluaran, rencana_id, tanggal, jumlah, mata_uang, deskripsi = zip(*batch)
+    return pyarrow.record_batch([
+        pyarrow.array(id_pengeluaran, pyarrow.string()),
+        pyarrow.array(rencana_id, pyarrow.string()),
+        # teks ISO 8601 maupun objek date dikonversi ke date32 sekali per kolom
+        pyarrow.array(tanggal).cast(pyarrow.date32()),
+        pyarrow.array(jumlah, pyarrow.float64()),
+        pyarrow.array(mata_uang, pyarrow.string()),
+        pyarrow.array(deskripsi, pyarrow.string()),
+    ], schema=skema)
+
+# file tujuan sementara bagi writer pyarrow; isinya diambil per batch agar dapat dialirkan
+class _PenampungBytes(io.RawIOBase):
+    def __init__(self):
+        self._potongan: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._potongan.append(bytes(data))
+        return len(data)
+
+    def ambil(self) -> bytes:
+        isi = b"".join(self._potongan)
+        self._potongan = []
+        return isi
+
+# menghasilkan isi file ekspor per batch (bytes) dalam format csv, parquet atau arrow (IPC stream)
+def iter_ekspor_pengeluaran(session: Session, format: str = "csv", **opsi) -> Iterator[bytes]:
+    _cek_format(format)
+    return tulis_batch_pengeluaran(iter_batch_pengeluaran(session, **opsi), format)
+
+# mengubah batch baris pengeluaran menjadi potongan file dalam format yang dipilih
+def tulis_batch_pengeluaran(batches: Iterable[list[tuple]], format: str) -> Iterator[bytes]:
+    if format == "csv":
+        yield from _iter_csv(batches)
+        return
+
+    skema = skema_arrow()
+    penampung = _PenampungBytes()
+    if format == "parquet":
+        penulis = pyarrow.parquet.ParquetWriter(penampung, skema, compression="zstd")
+    else:
+        penulis = pyarrow.ipc.new_stream(penampung, skema)
+    for batch in batches:
+        # setiap batch menjadi satu row group Parquet / satu record batch Arrow
+        penulis.write_batch(_record_batch(batch, skema))
+        yield penampung.ambil()
+    penulis.close()
+    yield penampung.ambil()
+
+def _iter_csv(batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    teks = io.StringIO()
+    penulis = csv.writer(teks, lineterminator="\n")
+    penulis.writerow(NAMA_KOLOM_PENGELUARAN)
+    for batch in batches:
+        penulis.writerows(batch)
+        yield teks.getvalue().encode("utf-8")
+        teks.seek(0)
+        teks.truncate()
+    yield teks.getvalue().encode("utf-8")
+
+# menulis ekspor ke file, mengembalikan jumlah pengeluaran yang ditulis
+def ekspor_pengeluaran_ke_file(session: Session, berkas: BinaryIO, format: str = "csv", **opsi) -> int:
+    _cek_format(format)
+    jumlah = 0
+
+    # menghitung baris yang lewat tanpa menahan batch
+    def hitung(batches):
+        nonlocal jumlah
+        for batch in batches:
+            jumlah += len(batch)
+            yield batch
+
+    for potongan in tulis_batch_pengeluaran(hitung(iter_batch_pengeluaran(session, **opsi)), format):
+        berkas.write(potongan)
+    return jumlah
+
+def main():
+    parser = argparse.ArgumentParser(description="Ekspor kolumnar pengeluaran untuk analitik")
+    parser.add_argument("--format", choices=["csv", "parquet", "arrow"], default="csv")
+    parser.add_argument("--output", default="-", help="File tujuan, - untuk stdout")
+    parser.add_argument("--pemilik", default=None)
+    parser.add_argument("--dari", type=date.fromisoformat, default=None, help="Tanggal pengeluaran terawal (ISO 8601)")
+    parser.add_argument("--sampai", type=date.fromisoformat, default=None, help="Tanggal pengeluaran terakhir (ISO 8601)")
+    parser.add_argument("--batch", type=int, default=UKURAN_BATCH_PENGELUARAN)
+    args = parser.parse_args()
+    if args.format not in format_tersedia():
+        parser.error(f"format {args.format} membutuhkan pyarrow (pip install travel-planner[analitik])")
+
+    mulai = time.perf_counter()
+    berkas = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        with Session(engine) as session:
+            jumlah = ekspor_pengeluaran_ke_file(
+                session, berkas, format=args.format, pemilik=args.pemilik,
+                tanggal_dari=args.dari, tanggal_sampai=args.sampai, ukuran_batch=args.batch
+            )
+    finally:
+        if berkas is not sys.stdout.buffer:
+            berkas.close()
+    durasi = time.perf_counter() - mulai
+
+    print(f"{jumlah} pengeluaran diekspor ke {args.format} dalam {durasi:.2f} s ({jumlah / max(durasi, 1e-9):.0f} baris/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# skrip berisikan impor NDJSON RencanaPerjalanan beserta hari, aktivitas dan pengeluarannya
+# bentuk baris sama dengan baris ekspor (ekspor.py), sehingga hasil ekspor dapat langsung diimpor ke database lain
+# setiap baris divalidasi lewat value object (Uang, Durasi, Lokasi) dan invariant aggregate, lalu baris yang valid
+# ditulis per chunk dengan INSERT executemany dalam satu transaksi; memori terbatas pada satu chunk
+# baris yang tidak valid dicatat beserta nomor barisnya tanpa menggagalkan baris lain
+# jalankan: uv run impor.py rencana.ndjson [--checkpoint impor.checkpoint] [--pemilik johndoe]
+
+import argparse
+import os
+import sys
+import time
+from itertools import batched
+from typing import AsyncIterator, Callable, Iterable, Optional, Sequence
+from uuid import UUID, uuid5
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+import repository
+from database import engine
+from models.aggregate_root import RencanaPerjalanan, waktu_sekarang
+from models.exception import AnggaranTerlampauiException, TanggalDiLuarDurasiException
+from models.value_objects import Uang, Durasi
+from schema import RencanaPerjalananImpor, KesalahanImpor, LaporanImpor
+
+# jumlah baris per chunk (satu transaksi dan satu executemany per tabel)
+UKURAN_CHUNK_IMPOR = 500
+
+# batas jumlah kesalahan yang disimpan untuk laporan; kesalahan berikutnya hanya dihitung
+MAKS_KESALAHAN_DICATAT = 1000
+
+# namespace uuid5 untuk id rencana yang diturunkan dari baris tanpa id
+NAMESPACE_IMPOR = UUID("6f1c2a4e-3b7d-5e8f-9a0b-1c2d3e4f5a6b")
+
+# id rencana untuk baris tanpa id, diturunkan dari pemilik, nomor baris dan isi baris
+# sehingga body yang dikirim ulang (misalnya setelah koneksi terputus) menghasilkan id yang sama dan tidak menggandakan rencana
+def id_turunan(pemilik: Optional[str], nomor: int, baris: bytes) -> UUID:
+    return uuid5(NAMESPACE_IMPOR, f"{pemilik or ''}:{nomor}:".encode() + baris.strip())
+
+# baris tabel hasil validasi satu rencana
+class RencanaSiapTulis:
+    def __init__(self, rencana: dict, hari: list[dict], aktivitas: list[dict], pengeluaran: list[dict]):
+        self.rencana = rencana
+        self.hari = hari
+        self.aktivitas = aktivitas
+        self.pengeluaran = pengeluaran
+
+# menyusun pesan ringkas dari ValidationError pydantic
+def _pesan_validasi(error: ValidationError, awalan: str = "") -> str:
+    return "; ".join(
+        awalan + ".".join(str(bagian) for bagian in detail["loc"]) + (": " if detail["loc"] else "") + detail["msg"]
+        for detail in error.errors()
+    )
+
+# memvalidasi satu baris NDJSON dan menyusun baris tabelnya
+# melempar ValidationError (bentuk/value object) atau exception domain (invariant aggregate) bila tidak valid
+# rencana tanpa id memakai id_cadangan bila diberikan, selain itu dibuatkan id acak
+def validasi_baris(baris: bytes, pemilik: Optional[str] = None, id_cadangan: Optional[UUID] = None) -> RencanaSiapTulis:
+    rekaman = RencanaPerjalananImpor.model_validate_json(baris)
+    durasi = Durasi(tanggalMulai=rekaman.durasi_mulai, tanggalSelesai=rekaman.durasi_selesai)
+    anggaran = Uang(jumlah=rekaman.anggaran_jumlah, mata_uang=rekaman.anggaran_mata_uang)
+    biaya = [Uang(jumlah=p.biaya_jumlah, mata_uang=p.biaya_mata_uang) for p in rekaman.pengeluaranList]
+
+    # aggregate sementara (tidak masuk session) untuk menjalankan invariant yang sama dengan endpoint penulisan
+    rencana = RencanaPerjalanan(
+        nama=rekaman.nama,
+        pemilik=pemilik if pemilik is not None else rekaman.pemilik,
+        durasi_mulai=durasi.tanggalMulai,
+        durasi_selesai=durasi.tanggalSelesai,
+        anggaran_jumlah=anggaran.jumlah,
+        anggaran_mata_uang=anggaran.mata_uang,
+    )
+    if rekaman.id is not None:
+        rencana.id = rekaman.id
+    elif id_cadangan is not None:
+        rencana.id = id_cadangan
+
+    baris_hari, baris_aktivitas = [], []
+    for h in rekaman.hariPerjalananList:
+        hari = rencana.tambahHariPerjalanan(h.tanggal)
+        if h.idHari is not None:
+            hari.idHari = h.idHari
+        kesalahan = hari.validasiAktivitasBatch([(i, a.waktuMulai, a.waktuSelesai, a.deskripsi) for i, a in enumerate(h.aktivitasList)])
+        if kesalahan:
+            raise ValueError(f"Hari {h.tanggal}: " + "; ".join(pesan for _, pesan in kesalahan))
+
+        baris_hari.append({"idHari": hari.idHari, "tanggal": hari.tanggal, "rencana_id": rencana.id})
+        for a in h.aktivitasList:
+            aktivitas = {
+                "waktuMulai": a.waktuMulai,
+                "waktuSelesai": a.waktuSelesai,
+                "deskripsi": a.deskripsi,
+                "lokasi": a.lokasi.model_dump(),
+                "hari_id": hari.idHari,
+            }
+            if a.idAktivitas is not None:
+                aktivitas["idAktivitas"] = a.idAktivitas
+            baris_aktivitas.append(aktivitas)
+
+    kesalahan = rencana.tambahPengeluaranBatch([(uang.jumlah, p.tanggalPengeluaran) for uang, p in zip(biaya, rekaman.pengeluaranList)])
+    if kesalahan:
+        raise ValueError("; ".join(f"pengeluaran ke-{indeks}: {pesan}" for indeks, pesan in kesalahan))
+
+    baris_pengeluaran = []
+    for uang, p in zip(biaya, rekaman.pengeluaranList):
+        pengeluaran = {
+            "deskripsi": p.deskripsi,
+            "tanggalPengeluaran": p.tanggalPengeluaran,
+            "biaya_jumlah": uang.jumlah,
+            "biaya_mata_uang": uang.mata_uang,
+            "rencana_id": rencana.id,
+        }
+        if p.idPengeluaran is not None:
+            pengeluaran["idPengeluaran"] = p.idPengeluaran
+        baris_pengeluaran.append(pengeluaran)
+
+    # rencana hasil impor adalah aggregate baru pada database ini: versi dimulai dari 1
+    baris_rencana = {
+        "id": rencana.id,
+        "nama": rencana.nama,
+        "pemilik": rencana.pemilik,
+        "durasi_mulai": rencana.durasi_mulai,
+        "durasi_selesai": rencana.durasi_selesai,
+        "anggaran_jumlah": rencana.anggaran_jumlah,
+        "anggaran_mata_uang": rencana.anggaran_mata_uang,
+        "total_pengeluaran": rencana.total_pengeluaran,
+        "jumlah_pengeluaran": rencana.jumlah_pengeluaran,
+        "versi": 1,
+        "diperbarui_pada": waktu_sekarang(),
+    }
+    return RencanaSiapTulis(baris_rencana, baris_hari, baris_aktivitas, baris_pengeluaran)
+
+# mengimpor baris NDJSON per chunk sambil mencatat kemajuan, kesalahan dan throughput
+# baris_diproses dan offset_diproses hanya bergerak setelah chunk di-commit, sehingga aman dipakai sebagai checkpoint
+# baris tanpa id yang id turunannya sudah ada dianggap sudah diimpor sebelumnya dan dilewati tanpa dicatat sebagai kesalahan
+class PengimporNdjson:
+    def __init__(
+        self,
+        session: Session,
+        pemilik: Optional[str] = None,
+        ukuran_chunk: int = UKURAN_CHUNK_IMPOR,
+        baris_awal: int = 0,
+        offset_awal: int = 0,
+        saat_commit: Optional[Callable[["PengimporNdjson"], None]] = None
+    ):
+        self.session = session
+        self.pemilik = pemilik
+        self.ukuran_chunk = ukuran_chunk
+        self.baris_diproses = baris_awal
+        self.offset_diproses = offset_awal
+        self.saat_commit = saat_commit
+        self.jumlah_berhasil = 0
+        self.jumlah_gagal = 0
+        self.jumlah_dilewati = 0
+        self.kesalahan: list[KesalahanImpor] = []
+        self._mulai = time.perf_counter()
+
+    def _catat_gagal(self, baris: int, rencana_id: Optional[UUID], pesan: str):
+        self.jumlah_gagal += 1
+        if len(self.kesalahan) < MAKS_KESALAHAN_DICATAT:
+            self.kesalahan.append(KesalahanImpor(baris=baris, id=rencana_id, pesan=pesan))
+
+    # memproses satu chunk baris mentah (nomor baris melanjutkan baris_diproses), lalu commit dan checkpoint
+    def impor_chunk(self, chunk: Sequence[bytes]):
+        siap: list[tuple[int, RencanaSiapTulis]] = []
+        id_chunk = set()
+        diturunkan = set()
+        for nomor, baris in enumerate(chunk, start=self.baris_diproses + 1):
+            if not baris.strip():
+                continue
+            id_cadangan = id_turunan(self.pemilik, nomor, baris)
+            try:
+                hasil = validasi_baris(baris, self.pemilik, id_cadangan)
+            except ValidationError as e:
+                self._catat_gagal(nomor, None, _pesan_validasi(e))
+                continue
+            except (ValueError, TanggalDiLuarDurasiException, AnggaranTerlampauiException) as e:
+                self._catat_gagal(nomor, None, str(e))
+                continue
+
+            rencana_id = hasil.rencana["id"]
+            if rencana_id in id_chunk:
+                self._catat_gagal(nomor, rencana_id, "Rencana perjalanan dengan id yang sama muncul lebih dari sekali")
+                continue
+            id_chunk.add(rencana_id)
+            if rencana_id == id_cadangan:
+                diturunkan.add(rencana_id)
+            siap.append((nomor, hasil))
+
+        # rencana yang sudah ada (misalnya impor ulang) ditolak, dicek dengan satu query IN per chunk
+        if siap:
+            sudah_ada = set(self.session.execute(
+                select(RencanaPerjalanan.id).where(RencanaPerjalanan.id.in_([hasil.rencana["id"] for _, hasil in siap]))
+            ).scalars())
+            for nomor, hasil in siap:
+                if hasil.rencana["id"] in sudah_ada and hasil.rencana["id"] in diturunkan:
+                    self.jumlah_dilewati += 1
+                elif hasil.rencana["id"] in sudah_ada:
+                    self._catat_gagal(nomor, hasil.rencana["id"], "Rencana perjalanan dengan id ini sudah ada")
+            siap = [(nomor, hasil) for nomor, hasil in siap if hasil.rencana["id"] not in sudah_ada]
+
+        self._tulis(siap)
+        self.baris_diproses += len(chunk)
+        self.offset_diproses += sum(len(baris) for baris in chunk)
+        if self.saat_commit is not None:
+            self.saat_commit(self)
+
+    # menulis seluruh rencana siap tulis dalam satu transaksi; bila melanggar constraint (misalnya id anak
+    # bentrok dengan data yang sudah ada) chunk diulang per rencana agar hanya rencana yang bermasalah yang gagal
+    def _tulis(self, siap: list[tuple[int, RencanaSiapTulis]]):
+        try:
+            self._sisipkan([hasil for _, hasil in siap])
+            self.session.commit()
+            self.jumlah_berhasil += len(siap)
+            return
+        except IntegrityError:
+            self.session.rollback()
+
+        for nomor, hasil in siap:
+            try:
+                self._sisipkan([hasil])
+                self.session.commit()
+                self.jumlah_berhasil += 1
+            except IntegrityError as e:
+                self.session.rollback()
+                self._catat_gagal(nomor, hasil.rencana["id"], f"Melanggar constraint database: {e.orig}")
+
+    def _sisipkan(self, daftar: list[RencanaSiapTulis]):
+        repository.sisipkan_rencana(self.session, [hasil.rencana for hasil in daftar])
+        repository.sisipkan_hari(self.session, [baris for hasil in daftar for baris in hasil.hari])
+        repository.sisipkan_aktivitas(self.session, [baris for hasil in daftar for baris in hasil.aktivitas])
+        repository.sisipkan_pengeluaran(self.session, [baris for hasil in daftar for baris in hasil.pengeluaran])
+
+    def laporan(self) -> LaporanImpor:
+        durasi = time.perf_counter() - self._mulai
+        return LaporanImpor(
+            baris_diproses=self.baris_diproses,
+            jumlah_berhasil=self.jumlah_berhasil,
+            jumlah_gagal=self.jumlah_gagal,
+            jumlah_dilewati=self.jumlah_dilewati,
+            durasi_detik=round(durasi, 3),
+            rencana_per_detik=round(self.jumlah_berhasil / max(durasi, 1e-9), 1),
+            kesalahan=self.kesalahan,
+        )
+
+# mengimpor baris NDJSON dari iterable (misalnya file biner) per chunk
+def impor_ndjson(session: Session, baris: Iterable[bytes], **opsi) -> LaporanImpor:
+    pengimpor = PengimporNdjson(session, **opsi)
+    for chunk in batched(baris, pengimpor.ukuran_chunk):
+        pengimpor.impor_chunk(chunk)
+    return pengimpor.laporan()
+
+# memecah aliran potongan bytes (misalnya body request) menjadi baris, termasuk newline-nya
+async def aiter_baris(potongan: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    tertahan: list[bytes] = []
+    async for data in potongan:
+        awal = 0
+        while (akhir := data.find(b"\n", awal)) != -1:
+            tertahan.append(data[awal:akhir + 1])
+            yield b"".join(tertahan)
+            tertahan = []
+            awal = akhir + 1
+        if awal < len(data):
+            tertahan.append(data[awal:])
+    if tertahan:
+        yield b"".join(tertahan)
+
+# membaca checkpoint impor, None bila belum ada
+def baca_checkpoint(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as berkas:
+        return orjson.loads(berkas.read())
+
+# menyimpan checkpoint secara atomik (tulis file sementara lalu rename)
+def simpan_checkpoint(path: str, data: dict):
+    sementara = f"{path}.tmp"
+    with open(sementara, "wb") as berkas:
+        berkas.write(orjson.dumps(data))
+        berkas.flush()
+        os.fsync(berkas.fileno())
+    os.replace(sementara, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Impor NDJSON rencana perjalanan")
+    parser.add_argument("input", help="File NDJSON sumber (misalnya hasil ekspor.py)")
+    parser.add_argument("--checkpoint", default=None, help="File checkpoint; impor dilanjutkan dari posisi terakhir bila file ini ada")
+    parser.add_argument("--pemilik", default=None, help="Menimpa pemilik seluruh rencana")
+    parser.add_argument("--chunk", type=int, default=UKURAN_CHUNK_IMPOR)
+    parser.add_argument("--kesalahan", default=None, help="File NDJSON tujuan kesalahan per baris (default stderr)")
+    args = parser.parse_args()
+
+    checkpoint = baca_checkpoint(args.checkpoint) if args.checkpoint else None
+    if checkpoint is not None and checkpoint["input"] != os.path.abspath(args.input):
+        parser.error(f"checkpoint {args.checkpoint} milik input lain: {checkpoint['input']}")
+
+    def saat_commit(pengimpor: PengimporNdjson):
+        if args.checkpoint:
+            simpan_checkpoint(args.checkpoint, {
+                "input": os.path.abspath(args.input),
+                "baris": pengimpor.baris_diproses,
+                "offset": pengimpor.offset_diproses,
+            })
+
+    with open(args.input, "rb") as berkas, Session(engine) as session:
+        baris_awal, offset_awal = (checkpoint["baris"], checkpoint["offset"]) if checkpoint else (0, 0)
+        berkas.seek(offset_awal)
+        laporan = impor_ndjson(
+            session, berkas, pemilik=args.pemilik, ukuran_chunk=args.chunk,
+            baris_awal=baris_awal, offset_awal=offset_awal, saat_commit=saat_commit
+        )
+
+    if args.kesalahan:
+        with open(args.kesalahan, "wb") as berkas:
+            for kesalahan in laporan.kesalahan:
+                berkas.write(kesalahan.model_dump_json().encode() + b"\n")
+    else:
+        for kesalahan in laporan.kesalahan:
+            print(f"baris {kesalahan.baris}: {kesalahan.pesan}", file=sys.stderr)
+
+    if baris_awal:
+        print(f"dilanjutkan dari baris {baris_awal + 1}", file=sys.stderr)
+    print(
+        f"{laporan.jumlah_berhasil} rencana diimpor, {laporan.jumlah_gagal} gagal, dalam {laporan.durasi_detik:.2f} s "
+        f"({laporan.rencana_per_detik:.0f} rencana/s)",
+        file=sys.stderr
+    )
+    if laporan.jumlah_dilewati:
+        print(f"{laporan.jumlah_dilewati} rencana dilewati karena sudah diimpor sebelumnya", file=sys.stderr)
+    if laporan.jumlah_gagal > len(laporan.kesalahan):
+        print(f"hanya {len(laporan.kesalahan)} kesalahan pertama yang dicatat", file=sys.stderr)
+    sys.exit(1 if laporan.jumlah_gagal else 0)
+
+if __name__ == "__main__":
+    main()
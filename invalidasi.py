@@ -0,0 +1,252 @@
+# skrip berisikan bus invalidasi untuk menjaga cache aggregate tetap koheren antar worker
+# setiap penulisan menerbitkan (rencana_id, versi) ke bus; worker lain menerimanya lalu mengeluarkan entri cache yang sama
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+from uuid import UUID, uuid4
+
+# konfigurasi bus dari Environment Variable (kosong = hanya cache lokal, tanpa koordinasi antar worker)
+CACHE_INVALIDASI_URL = os.getenv("CACHE_INVALIDASI_URL", "")
+CACHE_INVALIDASI_INTERVAL = float(os.getenv("CACHE_INVALIDASI_INTERVAL", "0.2"))  # detik, untuk bus sqlite
+CACHE_INVALIDASI_RETENSI = float(os.getenv("CACHE_INVALIDASI_RETENSI", "3600"))  # detik, umur baris change log
+# batas tunggu penerbitan (detik); penerbitan berjalan di jalur request setelah commit sehingga harus singkat
+CACHE_INVALIDASI_TIMEOUT = float(os.getenv("CACHE_INVALIDASI_TIMEOUT", "0.5"))
+
+logger = logging.getLogger(__name__)
+
+# nama channel pub/sub untuk bus redis
+CHANNEL_REDIS = "travel_planner:invalidasi"
+
+# antarmuka bus invalidasi
+# terbitkan() dipanggil setelah penulisan berhasil; mulai() menjalankan penerima yang memanggil
+# terima(rencana_id, versi) untuk pesan dari worker lain dan kosongkan() bila ada pesan yang mungkin terlewat
+# galat_bus berisi exception yang menandakan bus sedang tidak tersedia (file log terkunci, koneksi Redis putus)
+class BusInvalidasi(ABC):
+    jenis = "dasar"
+    galat_bus: tuple = ()
+
+    def __init__(self):
+        # penanda proses ini agar pesan sendiri tidak diproses ulang
+        self.asal = uuid4().hex
+        self._lock = threading.Lock()
+        self._terbit = 0
+        self._terima = 0
+        self._kosongkan = 0
+        self._gagal_terbit = 0
+
+    @abstractmethod
+    def terbitkan(self, rencana_id: UUID, versi: int):
+        ...
+
+    @abstractmethod
+    def mulai(self, terima: Callable[[UUID, int], None], kosongkan: Callable[[], None]):
+        ...
+
+    def berhenti(self):
+        pass
+
+    # menerbitkan pesan setelah penulisan di-commit tanpa menggagalkan request bila bus tidak tersedia;
+    # kegagalan dicatat dan invalidasi hanya berlaku di cache lokal (worker lain menunggu TTL)
+    def terbitkan_aman(self, rencana_id: UUID, versi: int) -> bool:
+        try:
+            self.terbitkan(rencana_id, versi)
+            return True
+        except self.galat_bus as e:
+            logger.warning("Gagal menerbitkan invalidasi rencana %s versi %s ke bus %s: %s", rencana_id, versi, self.jenis, e)
+            self._catat(gagal_terbit=1)
+            return False
+
+    # mencatat jumlah pesan (dipanggil setelah operasi bus berhasil)
+    def _catat(self, terbit: int = 0, terima: int = 0, kosongkan: int = 0, gagal_terbit: int = 0):
+        with self._lock:
+            self._terbit += terbit
+            self._terima += terima
+            self._kosongkan += kosongkan
+            self._gagal_terbit += gagal_terbit
+
+    # ringkasan statistik bus
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "jenis": self.jenis,
+                "terbit": self._terbit,
+                "terima": self._terima,
+                "kosongkan": self._kosongkan,
+                "gagal_terbit": self._gagal_terbit,
+            }
+
+# bus berbasis change log pada file SQLite bersama (cocok untuk beberapa worker uvicorn di satu host)
+# setiap worker menambah baris saat menulis dan membaca baris baru secara berkala berdasarkan seq;
+# baris lebih tua dari retensi dihapus, dan bila ada baris yang terhapus sebelum terbaca seluruh cache dikosongkan
+class BusSqlite(BusInvalidasi):
+    jenis = "sqlite"
+    galat_bus = (sqlite3.Error,)
+
+    def __init__(
+        self,
+        path: str,
+        interval: float = CACHE_INVALIDASI_INTERVAL,
+        retensi: float = CACHE_INVALIDASI_RETENSI,
+        timeout_terbit: float = CACHE_INVALIDASI_TIMEOUT
+    ):
+        super().__init__()
+        self.path = path
+        self.interval = interval
+        self.retensi = retensi
+        self._koneksi_tulis = self._hubungkan()
+        self._koneksi_tulis.execute(
+            "CREATE TABLE IF NOT EXISTS log_invalidasi ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, asal TEXT NOT NULL, rencana_id TEXT NOT NULL, versi INTEGER NOT NULL, waktu REAL NOT NULL)"
+        )
+        # penerbitan menunggu kunci file log paling lama timeout_terbit
+        self._koneksi_tulis.execute(f"PRAGMA busy_timeout={int(timeout_terbit * 1000)}")
+        self._lock_tulis = threading.Lock()
+        self._koneksi_baca: Optional[sqlite3.Connection] = None
+        self._terakhir = 0
+        self._pembersihan_berikutnya = 0.0
+        self._berhenti = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._callback_terima: Optional[Callable[[UUID, int], None]] = None
+        self._callback_kosongkan: Optional[Callable[[], None]] = None
+
+    # koneksi autocommit dengan WAL agar penerbit tidak memblokir pembaca
+    def _hubungkan(self) -> sqlite3.Connection:
+        koneksi = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        koneksi.execute("PRAGMA journal_mode=WAL")
+        koneksi.execute("PRAGMA synchronous=NORMAL")
+        return koneksi
+
+    def terbitkan(self, rencana_id: UUID, versi: int):
+        with self._lock_tulis:
+            self._koneksi_tulis.execute(
+                "INSERT INTO log_invalidasi (asal, rencana_id, versi, waktu) VALUES (?, ?, ?, ?)",
+                (self.asal, str(rencana_id), versi, time.time())
+            )
+        self._catat(terbit=1)
+
+    # mulai membaca dari akhir log saat ini (cache worker baru masih kosong) di thread latar belakang
+    def mulai(self, terima: Callable[[UUID, int], None], kosongkan: Callable[[], None]):
+        self._callback_terima = terima
+        self._callback_kosongkan = kosongkan
+        self._koneksi_baca = self._hubungkan()
+        self._terakhir = self._koneksi_baca.execute("SELECT COALESCE(MAX(seq), 0) FROM log_invalidasi").fetchone()[0]
+        self._berhenti.clear()
+        self._thread = threading.Thread(target=self._jalankan, name="bus-invalidasi-sqlite", daemon=True)
+        self._thread.start()
+
+    def _jalankan(self):
+        while not self._berhenti.wait(self.interval):
+            try:
+                self.tarik()
+            except sqlite3.Error:
+                # file log sedang terkunci atau tidak tersedia; dicoba lagi pada interval berikutnya
+                continue
+
+    # membaca baris baru sejak seq terakhir lalu menerapkannya ke cache
+    def tarik(self):
+        seq_minimal = self._koneksi_baca.execute("SELECT MIN(seq) FROM log_invalidasi").fetchone()[0]
+        if seq_minimal is None:
+            # seluruh baris sudah dihapus retensi; seq berikutnya diambil dari penghitung AUTOINCREMENT
+            seq_terbit = self._koneksi_baca.execute("SELECT seq FROM sqlite_sequence WHERE name = 'log_invalidasi'").fetchone()
+            seq_minimal = (seq_terbit[0] if seq_terbit else 0) + 1
+        if seq_minimal > self._terakhir + 1:
+            self._callback_kosongkan()
+            self._catat(kosongkan=1)
+            self._terakhir = seq_minimal - 1
+
+        baris = self._koneksi_baca.execute(
+            "SELECT seq, asal, rencana_id, versi FROM log_invalidasi WHERE seq > ? ORDER BY seq",
+            (self._terakhir,)
+        ).fetchall()
+        for seq, asal, rencana_id, versi in baris:
+            if asal != self.asal:
+                self._callback_terima(UUID(rencana_id), versi)
+                self._catat(terima=1)
+            self._terakhir = seq
+
+        if time.monotonic() >= self._pembersihan_berikutnya:
+            self._pembersihan_berikutnya = time.monotonic() + min(self.retensi, 60)
+            self._koneksi_baca.execute("DELETE FROM log_invalidasi WHERE waktu < ?", (time.time() - self.retensi,))
+
+    def berhenti(self):
+        self._berhenti.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._koneksi_baca is not None:
+            self._koneksi_baca.close()
+            self._koneksi_baca = None
+        self._koneksi_tulis.close()
+
+# bus berbasis pub/sub server yang kompatibel dengan Redis (untuk worker di beberapa host)
+# membutuhkan paket opsional redis; pesan yang terlewat saat koneksi putus ditangani dengan mengosongkan cache
+class BusRedis(BusInvalidasi):
+    jenis = "redis"
+
+    def __init__(self, url: str, channel: str = CHANNEL_REDIS, timeout_terbit: float = CACHE_INVALIDASI_TIMEOUT):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Bus invalidasi redis membutuhkan paket redis: pip install travel-planner[redis]") from e
+        self._redis = redis
+        self.galat_bus = (redis.RedisError,)
+        self.channel = channel
+        self._klien = redis.Redis.from_url(url)
+        # klien terpisah untuk penerbitan agar publish di jalur request dibatasi timeout_terbit
+        self._klien_terbit = redis.Redis.from_url(url, socket_timeout=timeout_terbit, socket_connect_timeout=timeout_terbit)
+        self._berhenti = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pubsub = None
+
+    def terbitkan(self, rencana_id: UUID, versi: int):
+        pesan = json.dumps({"asal": self.asal, "rencana_id": str(rencana_id), "versi": versi})
+        self._klien_terbit.publish(self.channel, pesan)
+        self._catat(terbit=1)
+
+    def mulai(self, terima: Callable[[UUID, int], None], kosongkan: Callable[[], None]):
+        self._berhenti.clear()
+        self._thread = threading.Thread(target=self._jalankan, args=(terima, kosongkan), name="bus-invalidasi-redis", daemon=True)
+        self._thread.start()
+
+    def _jalankan(self, terima: Callable[[UUID, int], None], kosongkan: Callable[[], None]):
+        while not self._berhenti.is_set():
+            try:
+                self._pubsub = self._klien.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(self.channel)
+                while not self._berhenti.is_set():
+                    pesan = self._pubsub.get_message(timeout=1.0)
+                    if pesan is None:
+                        continue
+                    data = json.loads(pesan["data"])
+                    if data["asal"] != self.asal:
+                        terima(UUID(data["rencana_id"]), data["versi"])
+                        self._catat(terima=1)
+            except self._redis.RedisError:
+                # pesan selama koneksi terputus tidak dapat diketahui, sehingga seluruh cache dikosongkan
+                kosongkan()
+                self._catat(kosongkan=1)
+                self._berhenti.wait(1.0)
+            finally:
+                if self._pubsub is not None:
+                    self._pubsub.close()
+
+    def berhenti(self):
+        self._berhenti.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+# membuat bus sesuai URL: sqlite:///path/ke/log.db atau redis://host:port/db
+def buat_bus(url: str) -> BusInvalidasi:
+    if url.startswith("sqlite:///"):
+        return BusSqlite(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return BusRedis(url)
+    raise ValueError(f"CACHE_INVALIDASI_URL tidak didukung: {url}")
@@ -0,0 +1,223 @@
+# skrip berisikan middleware ASGI untuk kompresi response (gzip, brotli, zstd) berdasarkan negosiasi Accept-Encoding
+# response kecil dikirim apa adanya; response streaming dikompresi per potongan dan di-flush agar tetap mengalir
+
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli dan zstd bersifat opsional (pip install travel-planner[kompresi])
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# konfigurasi kompresi dari Environment Variable
+KOMPRESI = os.getenv("KOMPRESI", "true").lower() in ("1", "true", "yes")
+KOMPRESI_MIN_BYTE = int(os.getenv("KOMPRESI_MIN_BYTE", "1024"))
+KOMPRESI_LEVEL_GZIP = int(os.getenv("KOMPRESI_LEVEL_GZIP", "6"))
+KOMPRESI_LEVEL_BROTLI = int(os.getenv("KOMPRESI_LEVEL_BROTLI", "4"))
+KOMPRESI_LEVEL_ZSTD = int(os.getenv("KOMPRESI_LEVEL_ZSTD", "3"))
+
+# tipe konten yang layak dikompresi
+TIPE_TERKOMPRESI = ("application/json", "application/x-ndjson", "application/xml", "application/javascript", "text/")
+
+# encoding yang dapat ditambahkan sebagai sufiks ETag representasi terkompresi
+ENCODING_ETAG = ("gzip", "br", "zstd")
+
+# ETag representasi terkompresi: sufiks encoding ditambahkan di dalam tanda kutip ("3" -> "3-gzip")
+# sehingga tetap ETag kuat namun berbeda untuk setiap encoding
+def etag_terkompresi(etag: str, encoding: str) -> str:
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+# kebalikan etag_terkompresi, dipakai saat membaca If-None-Match dan If-Match ("3-gzip" -> "3")
+def etag_tanpa_encoding(etag: str) -> str:
+    for encoding in ENCODING_ETAG:
+        sufiks = f'-{encoding}"'
+        if etag.endswith(sufiks):
+            return etag[:-len(sufiks)] + '"'
+    return etag
+
+# kompresor satu response; tulis() mengembalikan potongan terkompresi, akhir=True menutup stream
+class _KompresorGzip:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def tulis(self, data: bytes, akhir: bool) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_FINISH if akhir else zlib.Z_SYNC_FLUSH)
+
+class _KompresorBrotli:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def tulis(self, data: bytes, akhir: bool) -> bytes:
+        hasil = self._obj.process(data)
+        return hasil + (self._obj.finish() if akhir else self._obj.flush())
+
+class _KompresorZstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def tulis(self, data: bytes, akhir: bool) -> bytes:
+        hasil = self._obj.compress(data)
+        return hasil + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH if akhir else zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+# encoding yang tersedia, dalam urutan preferensi server bila bobot q dari client sama
+def encoding_tersedia() -> list[str]:
+    tersedia = []
+    if brotli is not None:
+        tersedia.append("br")
+    if zstandard is not None:
+        tersedia.append("zstd")
+    tersedia.append("gzip")
+    return tersedia
+
+# memilih encoding dari header Accept-Encoding (bobot q tertinggi, q=0 berarti ditolak)
+def pilih_encoding(accept_encoding: str, tersedia: list[str]) -> Optional[str]:
+    bobot = {}
+    for bagian in accept_encoding.split(","):
+        nama, _, parameter = bagian.strip().partition(";")
+        nama = nama.strip().lower()
+        q = 1.0
+        parameter = parameter.strip()
+        if parameter.startswith("q="):
+            try:
+                q = float(parameter[2:])
+            except ValueError:
+                q = 0.0
+        if nama:
+            bobot[nama] = q
+
+    kandidat = [(bobot.get(enc, bobot.get("*", 0.0)), -i, enc) for i, enc in enumerate(tersedia)]
+    q, _, encoding = max(kandidat)
+    return encoding if q > 0 else None
+
+# middleware kompresi response
+class MiddlewareKompresi:
+    def __init__(
+        self,
+        app: ASGIApp,
+        min_byte: int = KOMPRESI_MIN_BYTE,
+        level_gzip: int = KOMPRESI_LEVEL_GZIP,
+        level_brotli: int = KOMPRESI_LEVEL_BROTLI,
+        level_zstd: int = KOMPRESI_LEVEL_ZSTD,
+    ):
+        self.app = app
+        self.min_byte = min_byte
+        self.level = {"gzip": level_gzip, "br": level_brotli, "zstd": level_zstd}
+        self.tersedia = encoding_tersedia()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = pilih_encoding(headers.get("accept-encoding", ""), self.tersedia)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        penulis = _PenulisKompresi(send, encoding, self.level[encoding], self.min_byte, headers.get("if-none-match", ""))
+        await self.app(scope, receive, penulis.kirim)
+
+# menahan awal response sampai ukuran body cukup diketahui, lalu memutuskan kompresi atau tidak
+class _PenulisKompresi:
+    def __init__(self, send: Send, encoding: str, level: int, min_byte: int, if_none_match: str = ""):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.min_byte = min_byte
+        self.if_none_match = if_none_match
+        self._awal: Optional[Message] = None
+        self._tertahan: list[bytes] = []
+        self._ukuran_tertahan = 0
+        # None = belum diputuskan, True = dikompresi, False = diteruskan apa adanya
+        self._kompres: Optional[bool] = None
+        self._kompresor = None
+
+    async def kirim(self, message: Message):
+        if message["type"] == "http.response.start":
+            self._awal = message
+            headers = Headers(raw=message["headers"])
+            tipe = headers.get("content-type", "")
+            if (
+                message["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not (tipe.startswith(TIPE_TERKOMPRESI) or tipe.split(";")[0].endswith("+json"))
+            ):
+                self._kompres = False
+                if message["status"] == 304:
+                    self._etag_tidak_berubah(message)
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self._kompres is False:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        lanjut = message.get("more_body", False)
+
+        if self._kompres is None:
+            self._tertahan.append(body)
+            self._ukuran_tertahan += len(body)
+            if self._ukuran_tertahan < self.min_byte:
+                if lanjut:
+                    return
+                # response selesai di bawah ambang: diteruskan tanpa kompresi
+                self._kompres = False
+                await self._send(self._awal)
+                await self._send({"type": "http.response.body", "body": b"".join(self._tertahan), "more_body": False})
+                return
+
+            body = b"".join(self._tertahan)
+            self._tertahan = []
+            headers = self._mulai_kompresi()
+            if not lanjut:
+                # seluruh body sudah diterima sehingga Content-Length terkompresi dapat dikirim
+                potongan = self._kompresor.tulis(body, akhir=True)
+                headers["Content-Length"] = str(len(potongan))
+                await self._send(self._awal)
+                await self._send({"type": "http.response.body", "body": potongan, "more_body": False})
+                return
+            await self._send(self._awal)
+
+        potongan = self._kompresor.tulis(body, akhir=not lanjut)
+        if potongan or not lanjut:
+            await self._send({"type": "http.response.body", "body": potongan, "more_body": lanjut})
+
+    # menyiapkan kompresor dan header response terkompresi (belum dikirim)
+    def _mulai_kompresi(self) -> MutableHeaders:
+        self._kompres = True
+        self._kompresor = {"gzip": _KompresorGzip, "br": _KompresorBrotli, "zstd": _KompresorZstd}[self.encoding](self.level)
+        headers = MutableHeaders(scope=self._awal)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        # representasi terkompresi berbeda byte dengan aslinya, sehingga ETag-nya diberi sufiks encoding
+        etag = headers.get("etag")
+        if etag is not None:
+            headers["ETag"] = etag_terkompresi(etag, self.encoding)
+        return headers
+
+    # 304 membawa ETag yang sama dengan representasi yang disimpan client: bila client mengirim
+    # ETag bersufiks encoding yang sedang dinegosiasikan, sufiks yang sama dipasang pada ETag 304
+    def _etag_tidak_berubah(self, message: Message):
+        headers = MutableHeaders(scope=message)
+        etag = headers.get("etag")
+        if etag is None:
+            return
+        terkompresi = etag_terkompresi(etag, self.encoding)
+        if terkompresi in (tag.strip() for tag in self.if_none_match.split(",")):
+            headers["ETag"] = terkompresi
@@ -3,15 +3,24 @@ from contextlib import asynccontextmanager
 import uvicorn
 from router.router import router
 from router.auth_router import router as auth_router
-from database import init_db
+from router.async_router import router as async_router
+from router.monitoring_router import router as monitoring_router
+from router.ekspor_router import router as ekspor_router
+from router.impor_router import router as impor_router
+from database import init_db, dispose_async_engine, DATABASE_ASYNC
+from cache import mulai_bus_invalidasi, hentikan_bus_invalidasi
+from kompresi import MiddlewareKompresi, KOMPRESI
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # initialize database
     init_db()
+    # penerima invalidasi cache dari worker lain
+    mulai_bus_invalidasi()
     yield
     # shutdown
-    pass
+    hentikan_bus_invalidasi()
+    await dispose_async_engine()
 
 app = FastAPI(
     title="API Perencanaan Perjalanan",
@@ -20,8 +29,19 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# kompresi response (gzip, dan brotli/zstd bila paket opsionalnya terpasang) sesuai Accept-Encoding client
+if KOMPRESI:
+    app.add_middleware(MiddlewareKompresi)
+
 app.include_router(auth_router, prefix="/api/auth")
-app.include_router(router, prefix="/api")
+app.include_router(monitoring_router, prefix="/api/monitoring")
+app.include_router(ekspor_router, prefix="/api/ekspor")
+app.include_router(impor_router, prefix="/api/impor")
+# router perencanaan sync atau async sesuai konfigurasi DATABASE_ASYNC
+if DATABASE_ASYNC:
+    app.include_router(async_router, prefix="/api")
+else:
+    app.include_router(router, prefix="/api")
 
 @app.get("/", tags=["Root"])
 async def root():
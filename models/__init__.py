@@ -3,7 +3,8 @@ from models.entity import HariPerjalanan, Aktivitas, Pengeluaran
 from models.exception import (
     AnggaranTerlampauiException,
     AktivitasKonflikException,
-    TanggalDiLuarDurasiException
+    TanggalDiLuarDurasiException,
+    KonflikVersiException
 )
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     "Pengeluaran",
     "AnggaranTerlampauiException",
     "AktivitasKonflikException",
-    "TanggalDiLuarDurasiException"
+    "TanggalDiLuarDurasiException",
+    "KonflikVersiException"
 ]
\ No newline at end of file
@@ -1,30 +1,150 @@
 # skrip berisikan Aggregate Root untuk Konteks Perencanaan Perjalanan
 
 from sqlmodel import SQLModel, Field, Relationship
-from typing import List
+from sqlalchemy import Index, func, inspect, or_, select
+from sqlalchemy.orm import object_session, declared_attr
+from typing import List, Optional, Sequence, Tuple
 from uuid import UUID, uuid4
-from datetime import date
+from datetime import date, datetime, timezone
+import math
 from models.entity import HariPerjalanan, Pengeluaran
-from models.exception import TanggalDiLuarDurasiException, AnggaranTerlampauiException
+from models.koleksi import koleksi_terindeks
+from models.exception import TanggalDiLuarDurasiException, AnggaranTerlampauiException, KonflikVersiException
+
+# waktu sekarang dalam UTC tanpa tzinfo (disimpan apa adanya oleh SQLite dan kolom timestamp PostgreSQL)
+def waktu_sekarang() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 # Kelas ini adalah satu-satunya titik masuk untuk memodifikasi state internal
 class RencanaPerjalanan(SQLModel, table=True):
+    # index komposit untuk daftar rencana per pemilik dengan keyset pagination terurut (durasi_mulai, id)
+    __table_args__ = (
+        Index("ix_rencanaperjalanan_pemilik_durasi_mulai_id", "pemilik", "durasi_mulai", "id"),
+        # index untuk ekspor inkremental berdasarkan waktu perubahan terakhir
+        Index("ix_rencanaperjalanan_diperbarui_pada_id", "diperbarui_pada", "id"),
+    )
+
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     nama: str
 
+    # username pembuat rencana (dari token JWT)
+    pemilik: Optional[str] = Field(default=None)
+
     # Flattening Value Object Durasi dan Anggaran
     durasi_mulai: date
     durasi_selesai: date
     anggaran_jumlah: float
     anggaran_mata_uang: str = "IDR"
 
-    # Relasi One-to-Many
-    hariPerjalananList: List[HariPerjalanan] = Relationship(back_populates="rencana", sa_relationship_kwargs={"cascade": "all, delete"})
-    pengeluaranList: List[Pengeluaran] = Relationship(back_populates="rencana", sa_relationship_kwargs={"cascade": "all, delete"})
+    # total dan jumlah pengeluaran yang dijaga secara inkremental oleh tambahPengeluaran/hapusPengeluaran
+    # sehingga cek anggaran tidak perlu memuat seluruh pengeluaranList
+    total_pengeluaran: float = Field(default=0.0, sa_column_kwargs={"server_default": "0"})
+    jumlah_pengeluaran: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+    # versi aggregate untuk optimistic concurrency control
+    # setiap perubahan aggregate menaikkan versi, dan UPDATE baris rencana hanya berhasil bila
+    # versi di database masih sama dengan versi yang dibaca (compare-and-swap oleh SQLAlchemy)
+    versi: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+
+    # waktu (UTC) perubahan aggregate terakhir, diperbarui bersama versi
+    diperbarui_pada: datetime = Field(default_factory=waktu_sekarang)
+
+    @declared_attr
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.__table__.c.versi, "version_id_generator": False}
+
+    # Relasi One-to-Many, masing-masing diberi index (tanggal / idPengeluaran) untuk pencarian O(1)
+    # dan melacak tanggal terawal/terakhir untuk cek durasi O(1)
+    hariPerjalananList: List[HariPerjalanan] = Relationship(
+        back_populates="rencana",
+        sa_relationship_kwargs={"cascade": "all, delete", "collection_class": koleksi_terindeks("tanggal")}
+    )
+    pengeluaranList: List[Pengeluaran] = Relationship(
+        back_populates="rencana",
+        sa_relationship_kwargs={"cascade": "all, delete", "collection_class": koleksi_terindeks("idPengeluaran", "tanggalPengeluaran")}
+    )
+
+    # method untuk mengecek apakah koleksi anak perlu dicari lewat SQL:
+    # rencana sudah tersimpan di database dan koleksinya belum dimuat
+    def _cariLewatSql(self, nama_koleksi: str) -> bool:
+        state = inspect(self)
+        return state.persistent and nama_koleksi in state.unloaded
+
+    # method untuk mencari satu anak berdasarkan kunci
+    # memakai index koleksi bila sudah dimuat, atau satu query lewat index tabel anak tanpa memuat koleksi
+    def _cariAnak(self, nama_koleksi: str, model, kolom_kunci, kunci):
+        if self._cariLewatSql(nama_koleksi):
+            query = select(model).where(model.rencana_id == self.id, kolom_kunci == kunci)
+            return object_session(self).execute(query).scalars().first()
+        return getattr(self, nama_koleksi).cari(kunci)
 
-    # method untuk Menghitung total pengeluaran dari list
+    # method untuk mendapatkan (tanggal terawal, tanggal terakhir) anak per koleksi, None bila koleksi kosong
+    # koleksi yang sudah dimuat memakai rentang yang dilacak koleksinya, sedangkan koleksi yang belum dimuat
+    # dihitung dengan MIN/MAX lewat index (rencana_id, tanggal) yang digabung dalam satu query
+    def _rentangTanggalAnak(self, spesifikasi) -> dict:
+        hasil = {}
+        lewat_sql = []
+        for nama_koleksi, model, kolom_tanggal in spesifikasi:
+            if self._cariLewatSql(nama_koleksi):
+                lewat_sql.append((nama_koleksi, model, kolom_tanggal))
+            else:
+                hasil[nama_koleksi] = getattr(self, nama_koleksi).rentang()
+
+        if lewat_sql:
+            kolom = []
+            for _, model, kolom_tanggal in lewat_sql:
+                kolom.append(select(func.min(kolom_tanggal)).where(model.rencana_id == self.id).scalar_subquery())
+                kolom.append(select(func.max(kolom_tanggal)).where(model.rencana_id == self.id).scalar_subquery())
+            baris = object_session(self).execute(select(*kolom)).one()
+            for i, (nama_koleksi, _, _) in enumerate(lewat_sql):
+                terawal, terakhir = baris[2 * i], baris[2 * i + 1]
+                hasil[nama_koleksi] = None if terawal is None else (terawal, terakhir)
+        return hasil
+
+    # method untuk mengambil tanggal anak yang berada di luar durasi, hanya dipanggil saat cek rentang gagal
+    def _tanggalAnakDiLuarDurasi(self, nama_koleksi: str, model, kolom_tanggal, tanggal_mulai: date, tanggal_selesai: date) -> list:
+        if self._cariLewatSql(nama_koleksi):
+            query = (
+                select(kolom_tanggal)
+                .where(model.rencana_id == self.id, or_(kolom_tanggal < tanggal_mulai, kolom_tanggal > tanggal_selesai))
+                .order_by(kolom_tanggal)
+            )
+            return list(object_session(self).execute(query).scalars())
+        nilai_tanggal = getattr(self, nama_koleksi).nilai_rentang
+        return sorted(
+            nilai_tanggal(anak) for anak in getattr(self, nama_koleksi)
+            if not (tanggal_mulai <= nilai_tanggal(anak) <= tanggal_selesai)
+        )
+
+    # method untuk menandai perubahan aggregate dengan menaikkan versi dan mencatat waktu perubahannya
+    def naikkanVersi(self):
+        self.versi = (self.versi or 0) + 1
+        self.diperbarui_pada = waktu_sekarang()
+
+    # method untuk mengecek versi yang diharapkan klien (mis. dari header If-Match)
+    def cekVersi(self, versi_diharapkan: Optional[int]):
+        if versi_diharapkan is not None and versi_diharapkan != self.versi:
+            raise KonflikVersiException(
+                f"Versi rencana perjalanan adalah {self.versi}, bukan {versi_diharapkan}"
+            )
+
+    # method untuk mendapatkan total pengeluaran yang tersimpan
     def totalPengeluaranSaatIni(self):
-        return sum(p.biaya_jumlah for p in self.pengeluaranList)
+        return self.total_pengeluaran
+
+    # method untuk mengecek apakah total tersimpan sama dengan isi pengeluaranList
+    def cekKonsistensiTotalPengeluaran(self) -> bool:
+        total = sum(p.biaya_jumlah for p in self.pengeluaranList)
+        return (
+            math.isclose(self.total_pengeluaran, total, abs_tol=1e-6)
+            and self.jumlah_pengeluaran == len(self.pengeluaranList)
+        )
+
+    # method untuk menghitung ulang total dan jumlah pengeluaran dari pengeluaranList
+    def hitungUlangTotalPengeluaran(self):
+        self.total_pengeluaran = sum(p.biaya_jumlah for p in self.pengeluaranList)
+        self.jumlah_pengeluaran = len(self.pengeluaranList)
+        self.naikkanVersi()
     
     # method untuk membuat dan menambahkan HariPerjalanan baru ke rencana
     def tambahHariPerjalanan(self, tanggal: date) -> HariPerjalanan:
@@ -35,16 +155,22 @@ class RencanaPerjalanan(SQLModel, table=True):
             )
         
         # cek apakah tanggal sudah ada
-        if any(hari.tanggal == tanggal for hari in self.hariPerjalananList):
+        if self.getHariPerjalanan(tanggal) is not None:
             raise ValueError(f"Hari perjalanan dengan tanggal {tanggal} sudah ada")
         
         hari_baru = HariPerjalanan(tanggal=tanggal)
-        self.hariPerjalananList.append(hari_baru)
+        if self._cariLewatSql("hariPerjalananList"):
+            # seperti tambahPengeluaran, relasi diisi dari sisi hari agar hariPerjalananList tidak ikut dimuat
+            hari_baru.rencana = self
+            object_session(self).add(hari_baru)
+        else:
+            self.hariPerjalananList.append(hari_baru)
+        self.naikkanVersi()
         return hari_baru
 
     # method untuk menambahkan item pengeluaran baru ke rencana
     def tambahPengeluaran(self, pengeluaran_baru: Pengeluaran):
-        total_setelah_tambah = self.totalPengeluaranSaatIni() + pengeluaran_baru.biaya_jumlah
+        total_setelah_tambah = self.total_pengeluaran + pengeluaran_baru.biaya_jumlah
 
         # cek apakah pengeluaran melebihi anggaran
         if total_setelah_tambah > self.anggaran_jumlah:
@@ -58,7 +184,47 @@ class RencanaPerjalanan(SQLModel, table=True):
                 f"Tanggal pengeluaran {pengeluaran_baru.tanggalPengeluaran} berada di luar durasi rencana"
             )
         
-        self.pengeluaranList.append(pengeluaran_baru)
+        # relasi diisi dari sisi pengeluaran agar pengeluaranList yang belum dimuat tidak ikut dimuat,
+        # lalu pengeluaran didaftarkan ke session rencana karena backref tidak melakukan cascade
+        pengeluaran_baru.rencana = self
+        session = object_session(self)
+        if session is not None:
+            session.add(pengeluaran_baru)
+        self.total_pengeluaran = total_setelah_tambah
+        self.jumlah_pengeluaran += 1
+        self.naikkanVersi()
+
+    # method untuk mencatat banyak pengeluaran sekaligus dengan satu cek anggaran kumulatif
+    # item berupa pasangan (biaya, tanggal); mengembalikan daftar kesalahan per item (indeks, pesan)
+    # total, jumlah dan versi hanya diperbarui bila seluruh item valid (baris pengeluaran ditulis oleh pemanggil)
+    def tambahPengeluaranBatch(self, item: Sequence[Tuple[float, date]]) -> List[Tuple[int, str]]:
+        kesalahan = []
+        total = self.total_pengeluaran
+        indeks_melebihi_anggaran = None
+
+        for indeks, (biaya, tanggal) in enumerate(item):
+            if not (self.durasi_mulai <= tanggal <= self.durasi_selesai):
+                kesalahan.append((indeks, f"Tanggal pengeluaran {tanggal} berada di luar durasi rencana"))
+                # item yang sudah ditolak tidak ikut dihitung ke total anggaran
+                continue
+            total += biaya
+            if indeks_melebihi_anggaran is None and total > self.anggaran_jumlah:
+                indeks_melebihi_anggaran = indeks
+
+        # cek anggaran kumulatif dilakukan sekali untuk seluruh batch
+        if indeks_melebihi_anggaran is not None:
+            kesalahan.append((
+                indeks_melebihi_anggaran,
+                f"Total pengeluaran ({total}) melebihi anggaran ({self.anggaran_jumlah}) mulai dari item ke-{indeks_melebihi_anggaran}"
+            ))
+
+        if kesalahan or not item:
+            return sorted(kesalahan)
+
+        self.total_pengeluaran = total
+        self.jumlah_pengeluaran += len(item)
+        self.naikkanVersi()
+        return []
 
     # method untuk mengelola anggaran rencana perjalanan
     def setAnggaran(self, jumlah_baru: float, mata_uang: str = "IDR"):
@@ -68,59 +234,72 @@ class RencanaPerjalanan(SQLModel, table=True):
 
         self.anggaran_jumlah = jumlah_baru
         self.anggaran_mata_uang = mata_uang
+        self.naikkanVersi()
 
     # method untuk mengelola durasi rencana perjalanan
+    # cukup membandingkan durasi baru dengan tanggal terawal/terakhir hari dan pengeluaran (O(1));
+    # daftar tanggal yang berada di luar durasi baru hanya diambil bila cek tersebut gagal
     def setDurasi(self, tanggal_mulai: date, tanggal_selesai: date):
-        # cek apakah ada hari yang berada di luar durasi baru
-        hari_di_luar_durasi = [
-            hari for hari in self.hariPerjalananList
-            if not (tanggal_mulai <= hari.tanggal <= tanggal_selesai)
-        ]
-        
-        if hari_di_luar_durasi:
-            tanggal_invalid = [hari.tanggal for hari in hari_di_luar_durasi]
-            raise TanggalDiLuarDurasiException(
-                f"Tidak dapat mengubah durasi: terdapat hari perjalanan di luar durasi baru: {tanggal_invalid}"
-            )
-        
-        # cek apakah ada pengeluaran yang berada di luar durasi baru
-        pengeluaran_di_luar_durasi = [
-            p for p in self.pengeluaranList
-            if not (tanggal_mulai <= p.tanggalPengeluaran <= tanggal_selesai)
-        ]
-        
-        if pengeluaran_di_luar_durasi:
-            tanggal_invalid = [p.tanggalPengeluaran for p in pengeluaran_di_luar_durasi]
+        koleksi = (
+            ("hariPerjalananList", HariPerjalanan, HariPerjalanan.tanggal, "hari perjalanan"),
+            ("pengeluaranList", Pengeluaran, Pengeluaran.tanggalPengeluaran, "pengeluaran"),
+        )
+        rentang = self._rentangTanggalAnak([spesifikasi[:3] for spesifikasi in koleksi])
+
+        # cek apakah ada hari atau pengeluaran yang berada di luar durasi baru
+        for nama_koleksi, model, kolom_tanggal, label in koleksi:
+            rentang_anak = rentang[nama_koleksi]
+            if rentang_anak is None or (tanggal_mulai <= rentang_anak[0] and rentang_anak[1] <= tanggal_selesai):
+                continue
+
+            tanggal_invalid = self._tanggalAnakDiLuarDurasi(nama_koleksi, model, kolom_tanggal, tanggal_mulai, tanggal_selesai)
             raise TanggalDiLuarDurasiException(
-                f"Tidak dapat mengubah durasi: terdapat pengeluaran di luar durasi baru: {tanggal_invalid}"
+                f"Tidak dapat mengubah durasi: terdapat {label} di luar durasi baru: {tanggal_invalid}"
             )
         
         self.durasi_mulai = tanggal_mulai
         self.durasi_selesai = tanggal_selesai
+        self.naikkanVersi()
 
     # method untuk mendapatkan hari perjalanan berdasarkan tanggal
-    def getHariPerjalanan(self, tanggal: date):
-        for hari in self.hariPerjalananList:
-            if hari.tanggal == tanggal:
-                return hari
-        return None
+    def getHariPerjalanan(self, tanggal: date) -> Optional[HariPerjalanan]:
+        return self._cariAnak("hariPerjalananList", HariPerjalanan, HariPerjalanan.tanggal, tanggal)
+
+    # method untuk mendapatkan pengeluaran berdasarkan ID
+    def getPengeluaran(self, id_pengeluaran: UUID) -> Optional[Pengeluaran]:
+        return self._cariAnak("pengeluaranList", Pengeluaran, Pengeluaran.idPengeluaran, id_pengeluaran)
 
     # method untuk menghapus hari perjalanan
     def hapusHariPerjalanan(self, tanggal: date):
         hari = self.getHariPerjalanan(tanggal)
         if hari:
-            self.hariPerjalananList.remove(hari)
+            if self._cariLewatSql("hariPerjalananList"):
+                hari.rencana = None
+            else:
+                self.hariPerjalananList.remove(hari)
+            self.naikkanVersi()
             return True
         return False
 
     # method untuk menghapus pengeluaran berdasarkan ID
     def hapusPengeluaran(self, id_pengeluaran: UUID):
-        pengeluaran = next((p for p in self.pengeluaranList if p.idPengeluaran == id_pengeluaran), None)
+        pengeluaran = self.getPengeluaran(id_pengeluaran)
         if pengeluaran:
-            self.pengeluaranList.remove(pengeluaran)
+            self.lepasPengeluaran(pengeluaran)
             return True
         return False
 
+    # method untuk melepas pengeluaran yang sudah ditemukan (mis. lewat query berdasarkan ID) dari rencana
+    # relasi dilepas dari sisi pengeluaran agar pengeluaranList yang belum dimuat tidak ikut dimuat
+    def lepasPengeluaran(self, pengeluaran: Pengeluaran):
+        if pengeluaran.rencana_id is not None and pengeluaran.rencana_id != self.id:
+            raise ValueError(f"Pengeluaran dengan ID {pengeluaran.idPengeluaran} bukan milik rencana ini")
+
+        pengeluaran.rencana = None
+        self.total_pengeluaran -= pengeluaran.biaya_jumlah
+        self.jumlah_pengeluaran -= 1
+        self.naikkanVersi()
+
     # method untuk mendapatkan total pengeluaran saat ini
     def getTotalPengeluaran(self) -> float:
         return self.totalPengeluaranSaatIni()
@@ -135,5 +314,5 @@ class RencanaPerjalanan(SQLModel, table=True):
 
     # method untuk mendapatkan jumlah pengeluaran
     def getJumlahPengeluaran(self) -> int:
-        return len(self.pengeluaranList)
+        return self.jumlah_pengeluaran
 
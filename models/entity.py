@@ -1,12 +1,13 @@
 # skrip berisikan entity
 
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, JSON, Index
 from sqlalchemy.dialects.postgresql import JSONB
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Tuple, TYPE_CHECKING
 from uuid import UUID, uuid4
 from datetime import time, date
 from models.exception import AktivitasKonflikException
+from bisect import bisect_right
 import os
 
 if TYPE_CHECKING:
@@ -22,6 +23,11 @@ def get_json_column():
 
 # merepresentasikan satu kegiatan terjadwal dalam rencana perjalanan
 class Aktivitas(SQLModel, table=True):
+    # index komposit untuk memuat aktivitas per hari, terurut berdasarkan waktu mulai
+    __table_args__ = (
+        Index("ix_aktivitas_hari_id_waktuMulai", "hari_id", "waktuMulai"),
+    )
+
     idAktivitas: UUID = Field(default_factory=uuid4, primary_key=True)
     waktuMulai: time
     waktuSelesai: time
@@ -41,6 +47,11 @@ class Aktivitas(SQLModel, table=True):
 
 # merepresentasikan pengeluaran uang dalam perjalanan
 class Pengeluaran(SQLModel, table=True):
+    # index komposit untuk memuat pengeluaran per rencana, terurut berdasarkan tanggal
+    __table_args__ = (
+        Index("ix_pengeluaran_rencana_id_tanggalPengeluaran", "rencana_id", "tanggalPengeluaran"),
+    )
+
     idPengeluaran: UUID = Field(default_factory=uuid4, primary_key=True)
     deskripsi: str
     tanggalPengeluaran: date
@@ -55,6 +66,11 @@ class Pengeluaran(SQLModel, table=True):
 
 # merepresentasikan 1 hari dalam rencana perjalanan
 class HariPerjalanan(SQLModel, table=True):
+    # satu rencana hanya boleh memiliki satu hari per tanggal
+    __table_args__ = (
+        Index("ux_hariperjalanan_rencana_id_tanggal", "rencana_id", "tanggal", unique=True),
+    )
+
     idHari: UUID = Field(default_factory=uuid4, primary_key=True)
     tanggal: date
     
@@ -62,16 +78,91 @@ class HariPerjalanan(SQLModel, table=True):
     rencana_id: Optional[UUID] = Field(default=None, foreign_key="rencanaperjalanan.id")
     rencana: Optional['RencanaPerjalanan'] = Relationship(back_populates="hariPerjalananList")
 
-    # Relasi ke Aktivitas
-    aktivitasList: List[Aktivitas] = Relationship(back_populates="hari", sa_relationship_kwargs={"cascade": "all, delete"})
+    # Relasi ke Aktivitas, selalu terurut berdasarkan (waktuMulai, waktuSelesai)
+    # urutan dari database memakai index (hari_id, waktuMulai) dan dijaga oleh tambahAktivitas
+    aktivitasList: List[Aktivitas] = Relationship(
+        back_populates="hari",
+        sa_relationship_kwargs={
+            "cascade": "all, delete",
+            "order_by": "(Aktivitas.waktuMulai, Aktivitas.waktuSelesai)",
+        }
+    )
 
-    # method untuk menambah aktivitas dalam 1 hari
-    def tambahAktivitas(self, aktivitas_baru: Aktivitas):
-        # cek apakah aktivitas yang ingin ditambahkan tumpang tindih
-        for aktivitas in self.aktivitasList:
+    # method untuk memvalidasi rentang waktu aktivitas; dipakai penambahan tunggal maupun batch
+    # bisect pada cariTetanggaAktivitas mengandaikan waktu mulai tidak melebihi waktu selesai
+    @staticmethod
+    def validasiRentangAktivitas(waktu_mulai: time, waktu_selesai: time, deskripsi: str):
+        if waktu_mulai > waktu_selesai:
+            raise ValueError(f"Waktu mulai aktivitas '{deskripsi}' ({waktu_mulai}) melebihi waktu selesai ({waktu_selesai})")
+
+    # method untuk mengecek aktivitas baru terhadap sekumpulan aktivitas (aktivitasList atau kandidat hasil query)
+    def cekKonflikAktivitas(self, aktivitas_baru: Aktivitas, aktivitas_lain: Iterable[Aktivitas]):
+        self.validasiRentangAktivitas(aktivitas_baru.waktuMulai, aktivitas_baru.waktuSelesai, aktivitas_baru.deskripsi)
+        for aktivitas in aktivitas_lain:
             if aktivitas.validasi_konflik(aktivitas_baru):
                 raise AktivitasKonflikException(
                     f"Aktivitas '{aktivitas_baru.deskripsi}' bertabrakan dengan '{aktivitas.deskripsi}'"
                 )
 
-        self.aktivitasList.append(aktivitas_baru)
\ No newline at end of file
+    # method untuk mencari posisi sisip (bisect) dan tetangga yang mungkin bertabrakan dengan rentang waktu baru
+    # aktivitasList terurut dan tidak saling tumpang tindih, sehingga cukup satu aktivitas sebelum posisi sisip
+    # dan aktivitas sesudahnya yang dimulai sebelum rentang baru selesai
+    def cariTetanggaAktivitas(self, waktu_mulai: time, waktu_selesai: time) -> Tuple[int, List[Aktivitas]]:
+        aktivitas_list = self.aktivitasList
+        posisi = bisect_right(
+            aktivitas_list,
+            (waktu_mulai, waktu_selesai),
+            key=lambda aktivitas: (aktivitas.waktuMulai, aktivitas.waktuSelesai)
+        )
+
+        tetangga = aktivitas_list[max(posisi - 1, 0):posisi]
+        for berikutnya in range(posisi, len(aktivitas_list)):
+            if aktivitas_list[berikutnya].waktuMulai >= waktu_selesai:
+                break
+            tetangga.append(aktivitas_list[berikutnya])
+        return posisi, tetangga
+
+    # method untuk menambah aktivitas dalam 1 hari
+    # hanya tetangga hasil bisect yang dicek, sehingga O(log n) untuk hari yang padat
+    def tambahAktivitas(self, aktivitas_baru: Aktivitas):
+        self.validasiRentangAktivitas(aktivitas_baru.waktuMulai, aktivitas_baru.waktuSelesai, aktivitas_baru.deskripsi)
+        posisi, tetangga = self.cariTetanggaAktivitas(aktivitas_baru.waktuMulai, aktivitas_baru.waktuSelesai)
+
+        # cek apakah aktivitas yang ingin ditambahkan tumpang tindih dengan tetangganya
+        self.cekKonflikAktivitas(aktivitas_baru, tetangga)
+
+        self.aktivitasList.insert(posisi, aktivitas_baru)
+
+    # method untuk memvalidasi banyak aktivitas baru sekaligus
+    # item berupa (indeks, waktuMulai, waktuSelesai, deskripsi); mengembalikan daftar kesalahan per item (indeks, pesan)
+    # aktivitas baru diurutkan sekali (O(k log k)), dicek terhadap aktivitasList lewat bisect (O(log n) per item),
+    # lalu di-sweep: tiap aktivitas baru cukup dibandingkan dengan aktivitas baru diterima yang selesai paling akhir
+    # hasilnya sama dengan menambahkan aktivitas baru satu per satu secara berurutan waktu
+    def validasiAktivitasBatch(self, item: Sequence[Tuple[int, time, time, str]]) -> List[Tuple[int, str]]:
+        kesalahan = []
+        baru = []
+        for indeks, waktu_mulai, waktu_selesai, deskripsi in item:
+            try:
+                self.validasiRentangAktivitas(waktu_mulai, waktu_selesai, deskripsi)
+            except ValueError as e:
+                kesalahan.append((indeks, str(e)))
+                continue
+            baru.append((waktu_mulai, waktu_selesai, indeks, deskripsi))
+        baru.sort(key=lambda interval: (interval[0], interval[1], interval[2]))
+
+        aktif = None
+        for waktu_mulai, waktu_selesai, indeks, deskripsi in baru:
+            _, tetangga = self.cariTetanggaAktivitas(waktu_mulai, waktu_selesai)
+            konflik = next(
+                (a.deskripsi for a in tetangga if a.waktuMulai < waktu_selesai and a.waktuSelesai > waktu_mulai),
+                None
+            )
+            if konflik is None and aktif is not None and aktif[0] < waktu_selesai and aktif[1] > waktu_mulai:
+                konflik = aktif[2]
+
+            if konflik is not None:
+                kesalahan.append((indeks, f"Aktivitas '{deskripsi}' bertabrakan dengan '{konflik}'"))
+            elif aktif is None or waktu_selesai > aktif[1]:
+                aktif = (waktu_mulai, waktu_selesai, deskripsi)
+
+        return sorted(kesalahan)
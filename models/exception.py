@@ -10,4 +10,8 @@ class TanggalDiLuarDurasiException(Exception):
 
 # saat ada Aktivitas yang waktunya tumpang tindih dalam satu Hari
 class AktivitasKonflikException(Exception):
+    pass
+
+# saat versi RencanaPerjalanan yang diharapkan klien berbeda dengan versi tersimpan
+class KonflikVersiException(Exception):
     pass
\ No newline at end of file
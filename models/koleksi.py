@@ -0,0 +1,102 @@
+# skrip berisikan collection class untuk relasi one-to-many aggregate yang diberi index berdasarkan kunci
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# list yang menjaga dict kunci -> item agar pencarian satu anak (mis. hari per tanggal) O(1)
+# serta nilai terkecil/terbesar satu atribut (mis. tanggal) agar cek rentang O(1)
+# index dan rentang dibangun sekali saat dibutuhkan (koleksi yang dimuat dari database tidak memicu event)
+# lalu dijaga pada append/insert/remove/pop; perubahan lain cukup mengosongkan keduanya agar dibangun ulang
+class KoleksiTerindeks(list):
+    kunci: Callable[[Any], Any]
+    nilai_rentang: Optional[Callable[[Any], Any]] = None
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._indeks: Optional[Dict[Any, Any]] = None
+        self._rentang: Optional[Tuple[Any, Any]] = None
+
+    # mengembalikan index, dibangun dari isi list bila belum ada
+    def _ambilIndeks(self) -> Dict[Any, Any]:
+        if self._indeks is None:
+            self._indeks = {self.kunci(item): item for item in self}
+        return self._indeks
+
+    # mencari item berdasarkan kunci
+    def cari(self, kunci_item: Any) -> Optional[Any]:
+        return self._ambilIndeks().get(kunci_item)
+
+    # mengembalikan (terkecil, terbesar) dari nilai_rentang seluruh item, atau None bila koleksi kosong
+    def rentang(self) -> Optional[Tuple[Any, Any]]:
+        if self._rentang is None and self:
+            nilai = [self.nilai_rentang(item) for item in self]
+            self._rentang = (min(nilai), max(nilai))
+        return self._rentang
+
+    # memperbarui index dan rentang setelah item ditambahkan
+    def _catatTambah(self, item):
+        if self._indeks is not None:
+            self._indeks[self.kunci(item)] = item
+        if self._rentang is not None:
+            nilai = self.nilai_rentang(item)
+            self._rentang = (min(self._rentang[0], nilai), max(self._rentang[1], nilai))
+
+    # memperbarui index dan rentang setelah item dilepas
+    # rentang hanya dibangun ulang bila item yang dilepas berada di batasnya
+    def _catatLepas(self, item):
+        if self._indeks is not None:
+            self._indeks.pop(self.kunci(item), None)
+        if self._rentang is not None and self.nilai_rentang(item) in self._rentang:
+            self._rentang = None
+
+    def append(self, item):
+        super().append(item)
+        self._catatTambah(item)
+
+    def insert(self, posisi, item):
+        super().insert(posisi, item)
+        self._catatTambah(item)
+
+    def remove(self, item):
+        super().remove(item)
+        self._catatLepas(item)
+
+    def pop(self, posisi=-1):
+        item = super().pop(posisi)
+        self._catatLepas(item)
+        return item
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __setitem__(self, posisi, item):
+        super().__setitem__(posisi, item)
+        self._indeks = None
+        self._rentang = None
+
+    def __delitem__(self, posisi):
+        super().__delitem__(posisi)
+        self._indeks = None
+        self._rentang = None
+
+    def clear(self):
+        super().clear()
+        self._indeks = None
+        self._rentang = None
+
+# membuat collection class yang diberi index berdasarkan nama atribut item
+# atribut_rentang (default sama dengan atribut kunci) menentukan nilai yang dilacak oleh rentang()
+def koleksi_terindeks(atribut: str, atribut_rentang: Optional[str] = None) -> type:
+    atribut_rentang = atribut_rentang or atribut
+    return type(
+        f"KoleksiTerindeks_{atribut}",
+        (KoleksiTerindeks,),
+        {
+            "kunci": staticmethod(lambda item: getattr(item, atribut)),
+            "nilai_rentang": staticmethod(lambda item: getattr(item, atribut_rentang)),
+        }
+    )
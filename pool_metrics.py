@@ -0,0 +1,91 @@
+# skrip berisikan pencatatan statistik connection pool database
+
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# batas atas bucket histogram waktu tunggu koneksi (milidetik)
+BUCKET_WAKTU_TUNGGU_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# menyimpan jumlah checkout, timeout dan histogram waktu tunggu koneksi dari pool
+class StatistikPool:
+    def __init__(self, bucket_ms=BUCKET_WAKTU_TUNGGU_MS):
+        self.bucket_ms = tuple(bucket_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    # mengosongkan semua statistik
+    def reset(self):
+        with self._lock:
+            # bucket terakhir menampung waktu tunggu di atas batas terbesar
+            self._histogram = [0] * (len(self.bucket_ms) + 1)
+            self._jumlah_checkout = 0
+            self._jumlah_timeout = 0
+            self._total_tunggu_ms = 0.0
+            self._maks_tunggu_ms = 0.0
+
+    # mencatat lama waktu tunggu satu checkout koneksi
+    def catat_tunggu(self, detik: float):
+        ms = detik * 1000
+        indeks = next((i for i, batas in enumerate(self.bucket_ms) if ms <= batas), len(self.bucket_ms))
+        with self._lock:
+            self._histogram[indeks] += 1
+            self._jumlah_checkout += 1
+            self._total_tunggu_ms += ms
+            self._maks_tunggu_ms = max(self._maks_tunggu_ms, ms)
+
+    # mencatat checkout yang gagal karena pool_timeout terlampaui
+    def catat_timeout(self):
+        with self._lock:
+            self._jumlah_timeout += 1
+
+    # ringkasan statistik beserta kondisi pool saat ini
+    def snapshot(self, pool=None) -> dict:
+        with self._lock:
+            histogram = {f"<={batas}ms": jumlah for batas, jumlah in zip(self.bucket_ms, self._histogram)}
+            histogram[f">{self.bucket_ms[-1]}ms"] = self._histogram[-1]
+            data = {
+                "jumlah_checkout": self._jumlah_checkout,
+                "jumlah_timeout": self._jumlah_timeout,
+                "rata_rata_tunggu_ms": self._total_tunggu_ms / self._jumlah_checkout if self._jumlah_checkout else 0.0,
+                "maks_tunggu_ms": self._maks_tunggu_ms,
+                "histogram_tunggu": histogram,
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update({
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+# statistik global untuk engine sync dan engine async
+statistik_pool_sync = StatistikPool()
+statistik_pool_async = StatistikPool()
+
+# mixin yang mengukur lama checkout koneksi dari pool
+# disimpan sebagai atribut kelas karena pool dibuat ulang (recreate) tanpa argumen tambahan
+class _PoolTerukurMixin:
+    statistik: StatistikPool
+
+    def _do_get(self):
+        mulai = time.perf_counter()
+        try:
+            koneksi = super()._do_get()
+        except PoolTimeoutError:
+            self.statistik.catat_timeout()
+            raise
+        self.statistik.catat_tunggu(time.perf_counter() - mulai)
+        return koneksi
+
+# QueuePool untuk engine sync dengan pencatatan waktu tunggu
+class QueuePoolTerukur(_PoolTerukurMixin, QueuePool):
+    statistik = statistik_pool_sync
+
+# AsyncAdaptedQueuePool untuk engine async dengan pencatatan waktu tunggu
+class AsyncQueuePoolTerukur(_PoolTerukurMixin, AsyncAdaptedQueuePool):
+    statistik = statistik_pool_async
@@ -0,0 +1,245 @@
+# skrip berisikan query SQL terarah untuk aggregate RencanaPerjalanan
+
+import math
+from typing import Iterable, Optional
+from uuid import UUID
+from datetime import date, time
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session
+from models.aggregate_root import RencanaPerjalanan, waktu_sekarang
+from models.entity import HariPerjalanan, Aktivitas, Pengeluaran
+
+# subquery total dan jumlah pengeluaran per rencana, dihitung langsung dari tabel pengeluaran
+def _subquery_total_pengeluaran():
+    total = (
+        select(func.coalesce(func.sum(Pengeluaran.biaya_jumlah), 0.0))
+        .where(Pengeluaran.rencana_id == RencanaPerjalanan.id)
+        .scalar_subquery()
+    )
+    jumlah = (
+        select(func.count())
+        .select_from(Pengeluaran)
+        .where(Pengeluaran.rencana_id == RencanaPerjalanan.id)
+        .scalar_subquery()
+    )
+    return total, jumlah
+
+# fungsi untuk mencari rencana yang total/jumlah pengeluaran tersimpannya tidak sesuai isi tabel pengeluaran
+def cek_konsistensi_total_pengeluaran(session: Session, rencana_id: Optional[UUID] = None) -> list[UUID]:
+    total, jumlah = _subquery_total_pengeluaran()
+    query = select(
+        RencanaPerjalanan.id,
+        RencanaPerjalanan.total_pengeluaran,
+        RencanaPerjalanan.jumlah_pengeluaran,
+        total,
+        jumlah,
+    )
+    if rencana_id is not None:
+        query = query.where(RencanaPerjalanan.id == rencana_id)
+
+    return [
+        row[0] for row in session.execute(query)
+        if row[2] != row[4] or not math.isclose(row[1], row[3], abs_tol=1e-6)
+    ]
+
+# fungsi untuk menghitung ulang total dan jumlah pengeluaran tersimpan dari tabel pengeluaran
+# mengembalikan pasangan (id, versi baru) rencana yang diperbarui; seperti fungsi lain di sini tidak melakukan commit,
+# pemanggil yang melakukan commit lalu menginvalidasi cache aggregate (cache.invalidasi_rencana) untuk setiap pasangan
+def hitung_ulang_total_pengeluaran(session: Session, rencana_id: Optional[UUID] = None) -> list[tuple[UUID, int]]:
+    total, jumlah = _subquery_total_pengeluaran()
+    statement = update(RencanaPerjalanan).values(
+        total_pengeluaran=total,
+        jumlah_pengeluaran=jumlah,
+        versi=RencanaPerjalanan.versi + 1,
+        diperbarui_pada=waktu_sekarang()
+    )
+    if rencana_id is not None:
+        statement = statement.where(RencanaPerjalanan.id == rencana_id)
+
+    statement = statement.returning(RencanaPerjalanan.id, RencanaPerjalanan.versi)
+    return [tuple(baris) for baris in session.execute(statement.execution_options(synchronize_session="fetch"))]
+
+# fungsi untuk mengambil baris rencana (tanpa koleksi anak) untuk jalur penulisan
+# tidak memakai row lock: konflik antar penulis dideteksi lewat kolom versi saat UPDATE,
+# populate_existing memastikan total dan versi dibaca ulang pada setiap percobaan
+def ambil_rencana(session: Session, rencana_id: UUID) -> Optional[RencanaPerjalanan]:
+    query = (
+        select(RencanaPerjalanan)
+        .where(RencanaPerjalanan.id == rencana_id)
+        .execution_options(populate_existing=True)
+    )
+    return session.execute(query).scalar_one_or_none()
+
+# fungsi untuk menerapkan keyset pagination pada query: urut berdasarkan kolom (naik atau turun),
+# mulai tepat setelah nilai kolom baris terakhir halaman sebelumnya, dan batasi jumlah baris
+def _keyset(query, kolom: tuple, setelah: Optional[tuple], batas: int, menurun: bool = False):
+    if setelah is not None:
+        kunci, nilai = (kolom[0], setelah[0]) if len(kolom) == 1 else (tuple_(*kolom), tuple_(*setelah))
+        query = query.where(kunci < nilai if menurun else kunci > nilai)
+    urutan = [k.desc() for k in kolom] if menurun else list(kolom)
+    return query.order_by(*urutan).limit(batas)
+
+# kolom yang dibaca untuk ringkasan rencana pada daftar rencana (tanpa koleksi anak)
+KOLOM_RINGKASAN_RENCANA = (
+    RencanaPerjalanan.id,
+    RencanaPerjalanan.nama,
+    RencanaPerjalanan.durasi_mulai,
+    RencanaPerjalanan.durasi_selesai,
+    RencanaPerjalanan.anggaran_jumlah,
+    RencanaPerjalanan.anggaran_mata_uang,
+    RencanaPerjalanan.total_pengeluaran,
+    RencanaPerjalanan.jumlah_pengeluaran,
+    RencanaPerjalanan.versi,
+)
+
+# fungsi untuk mengambil satu halaman ringkasan rencana milik seorang pemilik, terurut (durasi_mulai, id)
+# keyset pagination: halaman berikutnya dimulai tepat setelah (durasi_mulai, id) terakhir lewat index
+# (pemilik, durasi_mulai, id), sehingga halaman ke-N sama cepatnya dengan halaman pertama (tanpa OFFSET)
+# filter tanggal memilih rencana yang durasinya beririsan dengan [tanggal_dari, tanggal_sampai]
+def daftar_rencana(
+    session: Session,
+    pemilik: str,
+    batas: int,
+    setelah: Optional[tuple[date, UUID]] = None,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    awalan_nama: Optional[str] = None,
+) -> list:
+    query = select(*KOLOM_RINGKASAN_RENCANA).where(RencanaPerjalanan.pemilik == pemilik)
+    if tanggal_sampai is not None:
+        query = query.where(RencanaPerjalanan.durasi_mulai <= tanggal_sampai)
+    if tanggal_dari is not None:
+        query = query.where(RencanaPerjalanan.durasi_selesai >= tanggal_dari)
+    if awalan_nama:
+        query = query.where(RencanaPerjalanan.nama.startswith(awalan_nama, autoescape=True))
+    query = _keyset(query, (RencanaPerjalanan.durasi_mulai, RencanaPerjalanan.id), setelah, batas)
+    return list(session.execute(query).mappings())
+
+# fungsi untuk mengambil satu halaman pengeluaran sebuah rencana, terurut (tanggalPengeluaran, idPengeluaran)
+# lewat index (rencana_id, tanggalPengeluaran); filter tanggal memakai rentang pada index yang sama
+def daftar_pengeluaran(
+    session: Session,
+    rencana_id: UUID,
+    batas: int,
+    setelah: Optional[tuple[date, UUID]] = None,
+    menurun: bool = False,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+) -> list:
+    query = select(*Pengeluaran.__table__.c).where(Pengeluaran.rencana_id == rencana_id)
+    if tanggal_dari is not None:
+        query = query.where(Pengeluaran.tanggalPengeluaran >= tanggal_dari)
+    if tanggal_sampai is not None:
+        query = query.where(Pengeluaran.tanggalPengeluaran <= tanggal_sampai)
+    query = _keyset(query, (Pengeluaran.tanggalPengeluaran, Pengeluaran.idPengeluaran), setelah, batas, menurun)
+    return list(session.execute(query).mappings())
+
+# fungsi untuk mengambil satu halaman hari sebuah rencana beserta jumlah aktivitasnya, terurut berdasarkan tanggal
+# lewat index unik (rencana_id, tanggal); jumlah aktivitas dihitung per hari lewat index (hari_id, waktuMulai)
+def daftar_hari(
+    session: Session,
+    rencana_id: UUID,
+    batas: int,
+    setelah: Optional[tuple[date]] = None,
+    menurun: bool = False,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+) -> list:
+    jumlah_aktivitas = (
+        select(func.count()).where(Aktivitas.hari_id == HariPerjalanan.idHari).scalar_subquery().label("jumlah_aktivitas")
+    )
+    query = select(*HariPerjalanan.__table__.c, jumlah_aktivitas).where(HariPerjalanan.rencana_id == rencana_id)
+    if tanggal_dari is not None:
+        query = query.where(HariPerjalanan.tanggal >= tanggal_dari)
+    if tanggal_sampai is not None:
+        query = query.where(HariPerjalanan.tanggal <= tanggal_sampai)
+    query = _keyset(query, (HariPerjalanan.tanggal,), setelah, batas, menurun)
+    return list(session.execute(query).mappings())
+
+# fungsi untuk mengambil satu halaman aktivitas sebuah hari, terurut (waktuMulai, idAktivitas)
+# lewat index (hari_id, waktuMulai); filter waktu memilih aktivitas yang beririsan dengan [waktu_dari, waktu_sampai]
+def daftar_aktivitas(
+    session: Session,
+    hari_id: UUID,
+    batas: int,
+    setelah: Optional[tuple[time, UUID]] = None,
+    menurun: bool = False,
+    waktu_dari: Optional[time] = None,
+    waktu_sampai: Optional[time] = None,
+) -> list:
+    query = select(*Aktivitas.__table__.c).where(Aktivitas.hari_id == hari_id)
+    if waktu_dari is not None:
+        query = query.where(Aktivitas.waktuSelesai >= waktu_dari)
+    if waktu_sampai is not None:
+        query = query.where(Aktivitas.waktuMulai <= waktu_sampai)
+    query = _keyset(query, (Aktivitas.waktuMulai, Aktivitas.idAktivitas), setelah, batas, menurun)
+    return list(session.execute(query).mappings())
+
+# fungsi untuk membaca versi rencana saja lewat primary key (untuk conditional GET), None bila tidak ada
+def ambil_versi(session: Session, rencana_id: UUID) -> Optional[int]:
+    return session.execute(select(RencanaPerjalanan.versi).where(RencanaPerjalanan.id == rencana_id)).scalar_one_or_none()
+
+# fungsi untuk mencari hari perjalanan berdasarkan tanggal lewat index unik (rencana_id, tanggal)
+def cari_hari(session: Session, rencana_id: UUID, tanggal: date) -> Optional[HariPerjalanan]:
+    query = select(HariPerjalanan).where(HariPerjalanan.rencana_id == rencana_id, HariPerjalanan.tanggal == tanggal)
+    return session.execute(query).scalar_one_or_none()
+
+# fungsi untuk memuat hari perjalanan pada tanggal-tanggal tertentu beserta aktivitasnya (terurut)
+# hanya hari yang disebut yang dimuat: satu query hari lewat index (rencana_id, tanggal) dan satu query IN aktivitas
+def muat_hari_dengan_aktivitas(session: Session, rencana_id: UUID, tanggal: Iterable[date]) -> dict[date, HariPerjalanan]:
+    query = (
+        select(HariPerjalanan)
+        .where(HariPerjalanan.rencana_id == rencana_id, HariPerjalanan.tanggal.in_(set(tanggal)))
+        .options(selectinload(HariPerjalanan.aktivitasList))
+    )
+    return {hari.tanggal: hari for hari in session.execute(query).scalars()}
+
+# fungsi untuk mencari pengeluaran berdasarkan ID yang dimiliki rencana tertentu
+def cari_pengeluaran(session: Session, rencana_id: UUID, id_pengeluaran: UUID) -> Optional[Pengeluaran]:
+    query = select(Pengeluaran).where(Pengeluaran.idPengeluaran == id_pengeluaran, Pengeluaran.rencana_id == rencana_id)
+    return session.execute(query).scalar_one_or_none()
+
+# fungsi untuk mengambil kandidat aktivitas yang mungkin bertabrakan dengan aktivitas baru
+# aktivitas dalam satu hari tidak saling tumpang tindih, sehingga cukup memeriksa aktivitas terakhir
+# yang dimulai sebelum aktivitas baru selesai (satu seek pada index (hari_id, waktuMulai))
+def cari_kandidat_konflik_aktivitas(session: Session, hari_id: UUID, aktivitas_baru: Aktivitas) -> list[Aktivitas]:
+    query = (
+        select(Aktivitas)
+        .where(Aktivitas.hari_id == hari_id, Aktivitas.waktuMulai < aktivitas_baru.waktuSelesai)
+        .order_by(Aktivitas.waktuMulai.desc(), Aktivitas.waktuSelesai.desc())
+        .limit(1)
+    )
+    return list(session.execute(query).scalars())
+
+# fungsi untuk menghapus hari perjalanan beserta aktivitasnya tanpa memuat koleksi aktivitas
+# mengembalikan jumlah aktivitas yang ikut terhapus
+def hapus_hari(session: Session, hari: HariPerjalanan) -> int:
+    result = session.execute(
+        delete(Aktivitas).where(Aktivitas.hari_id == hari.idHari).execution_options(synchronize_session=False)
+    )
+    session.execute(
+        delete(HariPerjalanan).where(HariPerjalanan.idHari == hari.idHari).execution_options(synchronize_session=False)
+    )
+    session.expunge(hari)
+    return result.rowcount
+
+# fungsi untuk menyisipkan banyak baris pengeluaran dengan satu executemany (tanpa membuat objek ORM)
+def sisipkan_pengeluaran(session: Session, baris: list[dict]) -> None:
+    if baris:
+        session.execute(insert(Pengeluaran), baris)
+
+# fungsi untuk menyisipkan banyak baris aktivitas dengan satu executemany (tanpa membuat objek ORM)
+def sisipkan_aktivitas(session: Session, baris: list[dict]) -> None:
+    if baris:
+        session.execute(insert(Aktivitas), baris)
+
+# fungsi untuk menyisipkan banyak baris rencana dengan satu executemany (tanpa membuat objek ORM)
+def sisipkan_rencana(session: Session, baris: list[dict]) -> None:
+    if baris:
+        session.execute(insert(RencanaPerjalanan), baris)
+
+# fungsi untuk menyisipkan banyak baris hari perjalanan dengan satu executemany (tanpa membuat objek ORM)
+def sisipkan_hari(session: Session, baris: list[dict]) -> None:
+    if baris:
+        session.execute(insert(HariPerjalanan), baris)
@@ -1,4 +1,8 @@
 from router.router import router
 from router.auth_router import router as auth_router
+from router.async_router import router as async_router
+from router.monitoring_router import router as monitoring_router
+from router.ekspor_router import router as ekspor_router
+from router.impor_router import router as impor_router
 
-__all__ = ["router", "auth_router"]
\ No newline at end of file
+__all__ = ["router", "auth_router", "async_router", "monitoring_router", "ekspor_router", "impor_router"]
\ No newline at end of file
@@ -0,0 +1,172 @@
+# skrip berisikan versi async dari router perencanaan perjalanan
+# logika tiap endpoint tetap milik router sync dan dijalankan lewat AsyncSession.run_sync,
+# sehingga I/O database di-await melalui driver async tanpa menahan worker threadpool
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from typing import List, Optional
+from datetime import date, time
+
+# API Schema
+from schema import RencanaPerjalananCreate, HariPerjalananCreate, PengeluaranCreate, AktivitasCreate, AktivitasBatchCreate, AnggaranUpdate, DurasiUpdate
+from schema import RencanaPerjalananRead, RencanaPerjalananDasar, HalamanRencanaPerjalanan, HalamanHariPerjalanan, HalamanPengeluaran, HalamanAktivitas
+from schema import PengeluaranDitambahkan, PengeluaranBatchDitambahkan, AktivitasDitambahkan, AktivitasBatchDitambahkan, HariDihapus, PengeluaranDihapus
+
+# import security
+from security import get_current_user
+
+# import Database
+from database import get_async_session
+
+# import serializer response
+from serialisasi import ResponseJSON
+
+# endpoint sync yang logikanya dipakai ulang
+from router.router import (
+    create_rencana_perjalanan as _create_rencana_perjalanan,
+    list_rencana_perjalanan as _list_rencana_perjalanan,
+    get_rencana_perjalanan as _get_rencana_perjalanan,
+    list_hari_perjalanan as _list_hari_perjalanan,
+    list_pengeluaran as _list_pengeluaran,
+    list_aktivitas as _list_aktivitas,
+    add_hari_perjalanan_ke_rencana as _add_hari_perjalanan_ke_rencana,
+    add_pengeluaran_ke_rencana as _add_pengeluaran_ke_rencana,
+    add_pengeluaran_batch_ke_rencana as _add_pengeluaran_batch_ke_rencana,
+    add_aktivitas_ke_hari as _add_aktivitas_ke_hari,
+    add_aktivitas_batch_ke_rencana as _add_aktivitas_batch_ke_rencana,
+    update_anggaran_rencana as _update_anggaran_rencana,
+    update_durasi_rencana as _update_durasi_rencana,
+    delete_hari_perjalanan as _delete_hari_perjalanan,
+    delete_pengeluaran as _delete_pengeluaran,
+)
+
+# router async dengan prefix dan tag yang sama dengan router sync
+router = APIRouter(
+    prefix="/perencanaan",
+    tags=["Perencanaan Perjalanan"],
+    default_response_class=ResponseJSON
+)
+
+# Helper function untuk menjalankan endpoint sync di dalam greenlet AsyncSession
+async def _jalankan(session: AsyncSession, handler, *args):
+    return await session.run_sync(lambda sync_session: handler(*args, sync_session))
+
+# API untuk membuat RencanaPerjalanan baru
+@router.post("/", status_code=201)
+async def create_rencana_perjalanan(request: RencanaPerjalananCreate, response: Response, current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _create_rencana_perjalanan, request, response, current_user)
+
+# API untuk mendapatkan daftar RencanaPerjalanan milik user dengan keyset pagination
+@router.get("/", response_model=HalamanRencanaPerjalanan)
+async def list_rencana_perjalanan(
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    nama: Optional[str] = Query(None, description="Awalan nama rencana"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await _jalankan(session, _list_rencana_perjalanan, tanggal_dari, tanggal_sampai, nama, batas, cursor, current_user)
+
+# API untuk mendapatkan RencanaPerjalanan berdasarkan ID, dengan pilihan kolom (?fields=), koleksi (?include=)
+# dan conditional GET (If-None-Match)
+@router.get("/{rencana_id}", response_model=None, responses={200: {"model": RencanaPerjalananRead}, 304: {"description": "Tidak berubah"}})
+async def get_rencana_perjalanan(
+    rencana_id: UUID,
+    fields: Optional[str] = Query(None, description="Kolom rencana dipisah koma"),
+    include: Optional[str] = Query(None, description="Koleksi dipisah koma: hari,aktivitas,pengeluaran"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await _jalankan(session, _get_rencana_perjalanan, rencana_id, fields, include, if_none_match, current_user)
+
+# API untuk mendapatkan daftar HariPerjalanan sebuah rencana dengan keyset pagination
+@router.get("/{rencana_id}/hari", response_model=HalamanHariPerjalanan)
+async def list_hari_perjalanan(
+    rencana_id: UUID,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    urutan: str = Query("naik", pattern="^(naik|turun)$"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await _jalankan(session, _list_hari_perjalanan, rencana_id, tanggal_dari, tanggal_sampai, urutan, batas, cursor, current_user)
+
+# API untuk mendapatkan daftar Pengeluaran sebuah rencana dengan keyset pagination
+@router.get("/{rencana_id}/pengeluaran", response_model=HalamanPengeluaran)
+async def list_pengeluaran(
+    rencana_id: UUID,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    urutan: str = Query("naik", pattern="^(naik|turun)$"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await _jalankan(session, _list_pengeluaran, rencana_id, tanggal_dari, tanggal_sampai, urutan, batas, cursor, current_user)
+
+# API untuk mendapatkan daftar Aktivitas pada satu HariPerjalanan dengan keyset pagination
+@router.get("/{rencana_id}/hari/{tanggal}/aktivitas", response_model=HalamanAktivitas)
+async def list_aktivitas(
+    rencana_id: UUID,
+    tanggal: date,
+    waktu_dari: Optional[time] = None,
+    waktu_sampai: Optional[time] = None,
+    urutan: str = Query("naik", pattern="^(naik|turun)$"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await _jalankan(session, _list_aktivitas, rencana_id, tanggal, waktu_dari, waktu_sampai, urutan, batas, cursor, current_user)
+
+# API untuk menambahkan HariPerjalanan ke RencanaPerjalanan
+@router.post("/{rencana_id}/hari", response_model=RencanaPerjalananDasar)
+async def add_hari_perjalanan_ke_rencana(rencana_id: UUID, request: HariPerjalananCreate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _add_hari_perjalanan_ke_rencana, rencana_id, request, response, if_match, current_user)
+
+# API untuk menambahkan Pengeluaran ke RencanaPerjalanan
+@router.post("/{rencana_id}/pengeluaran", response_model=PengeluaranDitambahkan)
+async def add_pengeluaran_ke_rencana(rencana_id: UUID, request: PengeluaranCreate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _add_pengeluaran_ke_rencana, rencana_id, request, response, if_match, current_user)
+
+# API untuk menambahkan banyak Pengeluaran sekaligus ke RencanaPerjalanan
+@router.post("/{rencana_id}/pengeluaran/batch", response_model=PengeluaranBatchDitambahkan)
+async def add_pengeluaran_batch_ke_rencana(rencana_id: UUID, request: List[PengeluaranCreate], response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _add_pengeluaran_batch_ke_rencana, rencana_id, request, response, if_match, current_user)
+
+# API untuk menambahkan Aktivitas ke HariPerjalanan
+@router.post("/{rencana_id}/hari/{tanggal}/aktivitas", response_model=AktivitasDitambahkan)
+async def add_aktivitas_ke_hari(rencana_id: UUID, tanggal: date, request: AktivitasCreate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _add_aktivitas_ke_hari, rencana_id, tanggal, request, response, if_match, current_user)
+
+# API untuk menambahkan banyak Aktivitas sekaligus ke beberapa HariPerjalanan
+@router.post("/{rencana_id}/aktivitas/batch", response_model=AktivitasBatchDitambahkan)
+async def add_aktivitas_batch_ke_rencana(rencana_id: UUID, request: List[AktivitasBatchCreate], response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _add_aktivitas_batch_ke_rencana, rencana_id, request, response, if_match, current_user)
+
+# API untuk mengupdate Anggaran RencanaPerjalanan
+@router.put("/{rencana_id}/anggaran", response_model=RencanaPerjalananDasar)
+async def update_anggaran_rencana(rencana_id: UUID, request: AnggaranUpdate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _update_anggaran_rencana, rencana_id, request, response, if_match, current_user)
+
+# API untuk mengupdate Durasi RencanaPerjalanan
+@router.put("/{rencana_id}/durasi", response_model=RencanaPerjalananDasar)
+async def update_durasi_rencana(rencana_id: UUID, request: DurasiUpdate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _update_durasi_rencana, rencana_id, request, response, if_match, current_user)
+
+# API untuk menghapus HariPerjalanan dari Rencana Perjalanan
+@router.delete("/{rencana_id}/hari/{tanggal}", response_model=HariDihapus)
+async def delete_hari_perjalanan(rencana_id: UUID, tanggal: date, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _delete_hari_perjalanan, rencana_id, tanggal, response, if_match, current_user)
+
+# API untuk menghapus Pengeluaran dari RencanaPerjalanan
+@router.delete("/{rencana_id}/pengeluaran/{id_pengeluaran}", response_model=PengeluaranDihapus)
+async def delete_pengeluaran(rencana_id: UUID, id_pengeluaran: UUID, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: AsyncSession = Depends(get_async_session)):
+    return await _jalankan(session, _delete_pengeluaran, rencana_id, id_pengeluaran, response, if_match, current_user)
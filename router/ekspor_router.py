@@ -0,0 +1,58 @@
+# skrip berisikan endpoint ekspor data rencana perjalanan
+
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+# import security
+from security import get_current_user
+
+# import Database
+from database import get_session
+
+# import ekspor
+from ekspor import batas_ekspor, iter_rencana_ndjson
+from ekspor_pengeluaran import iter_ekspor_pengeluaran, format_tersedia, MEDIA_TYPE_FORMAT, EKSTENSI_FORMAT
+
+router = APIRouter(tags=["Ekspor"])
+
+# API untuk mengekspor seluruh rencana milik user sebagai NDJSON (satu rencana lengkap per baris)
+# response dialirkan per batch cursor; header X-Waktu-Ekspor dipakai sebagai diperbarui_sejak pada ekspor berikutnya
+# (diperbarui_pada terbesar yang dialirkan dikurangi EKSPOR_OVERLAP_DETIK, lihat batas_ekspor)
+@router.get("/rencana", response_class=StreamingResponse, responses={200: {"content": {"application/x-ndjson": {}}}})
+def ekspor_rencana_perjalanan(
+    diperbarui_sejak: Optional[datetime] = Query(None, description="Hanya rencana yang berubah sejak waktu ini (ISO 8601)"),
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    batas, cursor = batas_ekspor(session, diperbarui_sejak=diperbarui_sejak, pemilik=current_user)
+    return StreamingResponse(
+        iter_rencana_ndjson(session, diperbarui_sejak=diperbarui_sejak, diperbarui_sampai=batas, pemilik=current_user),
+        media_type="application/x-ndjson",
+        headers={"X-Waktu-Ekspor": cursor.isoformat()} if cursor is not None else None
+    )
+
+# API untuk mengekspor pengeluaran seluruh rencana milik user dalam format kolumnar untuk analitik
+# csv selalu tersedia; parquet dan arrow (IPC stream) membutuhkan pyarrow
+@router.get(
+    "/pengeluaran",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in MEDIA_TYPE_FORMAT.values()}}}
+)
+def ekspor_pengeluaran(
+    format: Literal["csv", "parquet", "arrow"] = "csv",
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    if format not in format_tersedia():
+        raise HTTPException(status_code=400, detail=f"Format {format} tidak tersedia di server ini")
+    return StreamingResponse(
+        iter_ekspor_pengeluaran(session, format, pemilik=current_user, tanggal_dari=tanggal_dari, tanggal_sampai=tanggal_sampai),
+        media_type=MEDIA_TYPE_FORMAT[format],
+        headers={"Content-Disposition": f'attachment; filename="pengeluaran.{EKSTENSI_FORMAT[format]}"'}
+    )
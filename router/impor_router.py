@@ -0,0 +1,45 @@
+# skrip berisikan endpoint impor data rencana perjalanan
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+# import security
+from security import get_current_user
+
+# import Database
+from database import get_session
+
+# import impor
+from impor import PengimporNdjson, aiter_baris
+from schema import LaporanImpor
+
+router = APIRouter(tags=["Impor"])
+
+# API untuk mengimpor rencana perjalanan dari body NDJSON (satu rencana lengkap per baris, bentuk sama dengan ekspor)
+# body dibaca sebagai stream dan ditulis per chunk; chunk yang sudah di-commit tetap tersimpan bila koneksi terputus
+# baris tanpa id mendapat id turunan dari isi dan nomor barisnya, sehingga mengirim ulang body yang sama tidak
+# menggandakan rencana (rencana yang sudah tersimpan dilewati); mulai_baris hanya mempercepat pengiriman ulang
+@router.post("/rencana", response_model=LaporanImpor, openapi_extra={"requestBody": {"content": {"application/x-ndjson": {}}}})
+async def impor_rencana_perjalanan(
+    request: Request,
+    mulai_baris: int = Query(0, ge=0, description="Jumlah baris awal yang dilewati (sudah diimpor sebelumnya)"),
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    # rencana selalu dimiliki user yang mengimpor
+    pengimpor = PengimporNdjson(session, pemilik=current_user, baris_awal=mulai_baris)
+    chunk = []
+    nomor = 0
+    async for baris in aiter_baris(request.stream()):
+        nomor += 1
+        if nomor <= mulai_baris:
+            continue
+        chunk.append(baris)
+        if len(chunk) == pengimpor.ukuran_chunk:
+            # validasi dan penulisan chunk berjalan di threadpool agar event loop tidak terblokir
+            await run_in_threadpool(pengimpor.impor_chunk, chunk)
+            chunk = []
+    if chunk:
+        await run_in_threadpool(pengimpor.impor_chunk, chunk)
+    return pengimpor.laporan()
@@ -0,0 +1,24 @@
+# skrip berisikan endpoint monitoring aplikasi
+
+from fastapi import APIRouter, Depends
+
+# import security
+from security import get_current_user
+
+# import Database
+from database import get_statistik_pool
+
+# import cache aggregate
+from cache import get_statistik_cache
+
+router = APIRouter(tags=["Monitoring"])
+
+# API untuk melihat statistik connection pool database
+@router.get("/pool")
+def get_statistik_pool_database(current_user: str = Depends(get_current_user)):
+    return get_statistik_pool()
+
+# API untuk melihat statistik cache aggregate (hit, miss, eviksi dan pemakaian memori)
+@router.get("/cache")
+def get_statistik_cache_aggregate(current_user: str = Depends(get_current_user)):
+    return get_statistik_cache()
\ No newline at end of file
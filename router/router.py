@@ -1,34 +1,78 @@
 # skrip berisikan router & endpoint API
 
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Response
 from sqlmodel import Session, select
-from uuid import UUID
-from typing import List
-from datetime import date
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from uuid import UUID, uuid4
+from typing import List, Iterable, Optional
+from datetime import date, time
+import base64
+import json
+import zlib
 
 # model domain
 from models.aggregate_root import RencanaPerjalanan
 from models.entity import HariPerjalanan, Aktivitas, Pengeluaran
-from models.exception import AnggaranTerlampauiException, AktivitasKonflikException, TanggalDiLuarDurasiException
+from models.exception import AnggaranTerlampauiException, AktivitasKonflikException, TanggalDiLuarDurasiException, KonflikVersiException
 
 # API Schema
-from schema import RencanaPerjalananCreate, HariPerjalananCreate, PengeluaranCreate, AktivitasCreate, AnggaranUpdate, DurasiUpdate, RencanaPerjalananCreate
+from schema import RencanaPerjalananCreate, HariPerjalananCreate, PengeluaranCreate, AktivitasCreate, AktivitasBatchCreate, AnggaranUpdate, DurasiUpdate, RencanaPerjalananCreate, RencanaPerjalananRead
+from schema import RencanaPerjalananRingkas, HalamanRencanaPerjalanan, HariPerjalananRingkas, HalamanHariPerjalanan, HalamanPengeluaran, HalamanAktivitas
+from schema import RencanaPerjalananDasar, PengeluaranRead, AktivitasRead, PengeluaranDitambahkan, PengeluaranBatchDitambahkan, AktivitasDitambahkan, AktivitasBatchDitambahkan, HariDihapus, PengeluaranDihapus
+
+# query SQL terarah untuk jalur penulisan
+import repository
 
 # import security
 from security import get_current_user
 
+# import cache aggregate
+import cache
+
+# import sufiks ETag dari middleware kompresi
+from kompresi import etag_tanpa_encoding
+
+# import serializer response
+from serialisasi import ResponseJSON, ADAPTER_DAFTAR_HARI, ADAPTER_DAFTAR_HARI_DASAR, ADAPTER_DAFTAR_PENGELUARAN, ke_python, serialisasi_rencana
+
 # import Database
-from database import get_session, get_db
+from database import get_session, get_db, refresh_kolom_server, MAKS_PERCOBAAN_TULIS
 
 # router utama
 router = APIRouter(
     prefix="/perencanaan",
-    tags=["Perencanaan Perjalanan"]
+    tags=["Perencanaan Perjalanan"],
+    default_response_class=ResponseJSON
 )
 
-# Helper function untuk mendapatkan rencana dari database
-def _get_rencana_dari_db(rencana_id: UUID, session: Session) -> RencanaPerjalanan:
-    rencana = session.get(RencanaPerjalanan, rencana_id)
+# koleksi aggregate yang dapat dimuat sekaligus: "hari", "aktivitas" (termasuk hari) dan "pengeluaran"
+MUAT_SEMUA = ("hari", "aktivitas", "pengeluaran")
+
+# kolom rencana yang dapat dipilih lewat ?fields= pada GET aggregate
+KOLOM_RENCANA = tuple(nama for nama in RencanaPerjalananRead.model_fields if not nama.endswith("List"))
+
+# Helper function untuk menyusun opsi eager loading sesuai kedalaman yang diminta
+# hari di-join ke query rencana (jumlahnya dibatasi durasi), sedangkan aktivitas dan pengeluaran
+# dimuat dengan satu query IN per koleksi agar tidak terjadi produk kartesian antar koleksi
+def _opsi_muat_rencana(muat: Iterable[str]) -> list:
+    muat = set(muat)
+    opsi = []
+    if "aktivitas" in muat:
+        opsi.append(joinedload(RencanaPerjalanan.hariPerjalananList).selectinload(HariPerjalanan.aktivitasList))
+    elif "hari" in muat:
+        opsi.append(joinedload(RencanaPerjalanan.hariPerjalananList))
+    if "pengeluaran" in muat:
+        opsi.append(selectinload(RencanaPerjalanan.pengeluaranList))
+    return opsi
+
+# Helper function untuk mendapatkan rencana dari database beserta koleksi pada parameter muat
+# bila kolom diberikan, hanya kolom tersebut (ditambah id dan versi) yang di-SELECT dari tabel rencana
+def _get_rencana_dari_db(rencana_id: UUID, session: Session, muat: Iterable[str] = (), kolom: Optional[Iterable[str]] = None) -> RencanaPerjalanan:
+    opsi = _opsi_muat_rencana(muat)
+    if kolom is not None:
+        opsi.append(load_only(*(getattr(RencanaPerjalanan, nama) for nama in {"id", "versi", *kolom})))
+    rencana = session.get(RencanaPerjalanan, rencana_id, options=opsi)
     if not rencana:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -36,15 +80,172 @@ def _get_rencana_dari_db(rencana_id: UUID, session: Session) -> RencanaPerjalana
         )
     return rencana
 
+# Helper function untuk mengambil baris rencana (tanpa koleksi anak) pada jalur penulisan terarah
+def _ambil_rencana_dari_db(rencana_id: UUID, session: Session) -> RencanaPerjalanan:
+    rencana = repository.ambil_rencana(session, rencana_id)
+    if not rencana:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Rencana Perjalanan dengan ID {rencana_id} tidak ditemukan"
+        )
+    return rencana
+
+# Helper function untuk mencari hari perjalanan pada tanggal tertentu lewat index
+def _get_hari_dari_db(rencana_id: UUID, tanggal: date, session: Session) -> HariPerjalanan:
+    hari = repository.cari_hari(session, rencana_id, tanggal)
+    if not hari:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Hari perjalanan pada tanggal {tanggal} tidak ditemukan dalam rencana perjalanan"
+        )
+    return hari
+
+# ETag rencana diturunkan dari kolom versi
+def etag_rencana(rencana: RencanaPerjalanan) -> str:
+    return f'"{rencana.versi}"'
+
+# ETag kuat untuk satu tampilan GET aggregate: versi rencana, ditambah penanda pilihan fields/include
+# bila response bukan aggregate lengkap, karena isi response berbeda untuk setiap tampilan
+def etag_tampilan_rencana(versi: int, kolom: Iterable[str] = KOLOM_RENCANA, muat: Iterable[str] = MUAT_SEMUA) -> str:
+    kolom, muat = sorted(kolom), sorted(muat)
+    if kolom == sorted(KOLOM_RENCANA) and muat == sorted(MUAT_SEMUA):
+        return f'"{versi}"'
+    varian = zlib.crc32(f"{','.join(kolom)}|{','.join(muat)}".encode())
+    return f'"{versi}-{varian:08x}"'
+
+# Helper function untuk mencocokkan ETag dengan header If-None-Match (perbandingan lemah sesuai RFC 9110)
+# sufiks encoding dari middleware kompresi ("2-gzip") dilepas lebih dulu
+def _cocok_if_none_match(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in (etag_tanpa_encoding(tag.strip().removeprefix("W/")) for tag in if_none_match.split(","))
+
+# Helper function untuk membaca versi yang diharapkan dari header If-Match
+# tanpa header atau "*" berarti tanpa syarat; If-Match memakai perbandingan kuat sehingga ETag lemah (W/) ditolak,
+# sufiks encoding dilepas, dan ETag tampilan sebagian ("versi-varian") dibandingkan berdasarkan versinya
+def _versi_dari_if_match(if_match: Optional[str]) -> Optional[int]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.split(",")[0].strip()
+    if tag.startswith("W/"):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"If-Match {if_match} harus berupa ETag kuat"
+        )
+    tag = etag_tanpa_encoding(tag).strip('"').split("-")[0]
+    try:
+        return int(tag)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"If-Match {if_match} bukan ETag rencana perjalanan"
+        )
+
+# Helper function untuk mencocokkan versi rencana dengan header If-Match
+def _cek_if_match(rencana: RencanaPerjalanan, if_match: Optional[str]):
+    try:
+        rencana.cekVersi(_versi_dari_if_match(if_match))
+    except KonflikVersiException as e:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=str(e))
+
+# Helper function untuk menyusun cursor keyset pagination dari nilai kolom urutan baris terakhir
+def _encode_cursor(*nilai) -> str:
+    return base64.urlsafe_b64encode(json.dumps([str(n) for n in nilai]).encode()).decode().rstrip("=")
+
+# Helper function untuk membaca cursor menjadi nilai kolom urutan sesuai tipe yang diberikan
+# cursor yang dapat didekode namun bentuknya bukan list string sepanjang tipe (misalnya {} atau [1, 2]) juga ditolak
+def _decode_cursor(cursor: str, *tipe) -> tuple:
+    try:
+        nilai = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(nilai, list) or len(nilai) != len(tipe) or not all(isinstance(n, str) for n in nilai):
+            raise ValueError(cursor)
+        return tuple(t(n) for t, n in zip(tipe, nilai))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor {cursor} tidak valid"
+        )
+
+# Helper function untuk memotong hasil query (batas + 1 baris) menjadi satu halaman beserta cursor berikutnya
+# baris ke-(batas + 1) hanya menandakan masih ada halaman berikutnya
+def _potong_halaman(baris: list, batas: int, kolom_cursor: tuple) -> tuple[list, Optional[str]]:
+    if len(baris) <= batas:
+        return baris, None
+    baris = baris[:batas]
+    return baris, _encode_cursor(*(baris[-1][k] for k in kolom_cursor))
+
+# Helper function untuk membaca parameter daftar dipisah koma (mis. ?fields= dan ?include=)
+# None berarti parameter tidak dikirim sehingga dipakai nilai bawaan; string kosong berarti daftar kosong
+def _parse_daftar(nilai: Optional[str], diizinkan: Iterable[str], bawaan: Iterable[str], nama_parameter: str) -> tuple:
+    if nilai is None:
+        return tuple(bawaan)
+    daftar = tuple(dict.fromkeys(bagian.strip() for bagian in nilai.split(",") if bagian.strip()))
+    tidak_dikenal = [bagian for bagian in daftar if bagian not in diizinkan]
+    if tidak_dikenal:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Nilai {nama_parameter} tidak dikenal: {tidak_dikenal}. Pilihan: {list(diizinkan)}"
+        )
+    return daftar
+
+# Helper function untuk menyusun response aggregate yang hanya berisi kolom dan koleksi yang diminta
+# hanya atribut yang sudah dimuat yang dibaca, sehingga tidak ada lazy load saat serialisasi
+def _rencana_sebagian(rencana: RencanaPerjalanan, kolom: Iterable[str], muat: Iterable[str]) -> dict:
+    muat = set(muat)
+    hasil = {nama: getattr(rencana, nama) for nama in ("id", *kolom)}
+    if "aktivitas" in muat:
+        hasil["hariPerjalananList"] = ke_python(ADAPTER_DAFTAR_HARI, rencana.hariPerjalananList)
+    elif "hari" in muat:
+        hasil["hariPerjalananList"] = ke_python(ADAPTER_DAFTAR_HARI_DASAR, rencana.hariPerjalananList)
+    if "pengeluaran" in muat:
+        hasil["pengeluaranList"] = ke_python(ADAPTER_DAFTAR_PENGELUARAN, rencana.pengeluaranList)
+    return hasil
+
+# Helper function untuk menjalankan penulisan dengan retry terbatas
+# saat UPDATE compare-and-swap pada kolom versi gagal (rencana diubah request lain di antara baca dan tulis),
+# transaksi dibatalkan lalu seluruh penulisan diulang dengan data terbaru
+# setelah berhasil, entri rencana di cache aggregate diinvalidasi (write-through) dan diterbitkan ke worker lain
+def _tulis_dengan_retry(session: Session, rencana_id: UUID, tulis):
+    for _ in range(MAKS_PERCOBAAN_TULIS):
+        try:
+            hasil = tulis()
+            cache.invalidasi_rencana(rencana_id, hasil.versi)
+            return hasil
+        except StaleDataError:
+            session.rollback()
+            session.expunge_all()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Rencana perjalanan sedang diubah oleh request lain, silakan coba lagi"
+    )
+
+# Helper function untuk GET aggregate penuh lewat cache aggregate
+# hit dilayani langsung dari JSON tersimpan tanpa query; miss memuat dari database lalu menyimpan hasil serialisasinya
+# If-None-Match dicek terhadap versi entri cache, sehingga 304 untuk rencana yang panas juga tanpa query
+def _get_rencana_lewat_cache(rencana_id: UUID, if_none_match: Optional[str], session: Session) -> Response:
+    entri = cache.cache_aggregate.ambil(rencana_id)
+    if entri is None:
+        rencana = _get_rencana_dari_db(rencana_id, session, muat=MUAT_SEMUA)
+        entri = (rencana.versi, serialisasi_rencana(rencana))
+        cache.cache_aggregate.simpan(rencana_id, *entri)
+
+    versi, isi = entri
+    etag = etag_tampilan_rencana(versi)
+    if if_none_match is not None and _cocok_if_none_match(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return ResponseJSON(content=isi, headers={"ETag": etag})
+
 # API untuk membuat RencanaPerjalanan baru
 @router.post("/", status_code=201)
 def create_rencana_perjalanan(
     request: RencanaPerjalananCreate,
+    response: Response,
     current_user: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     rencana = RencanaPerjalanan(
         nama=request.nama,
+        pemilik=current_user,
         durasi_mulai=request.durasi.tanggalMulai,
         durasi_selesai=request.durasi.tanggalSelesai,
         anggaran_jumlah=request.anggaran.jumlah,
@@ -54,7 +255,8 @@ def create_rencana_perjalanan(
     # Menyimpan ke database
     db.add(rencana)
     db.commit()
-    db.refresh(rencana)
+    refresh_kolom_server(db, rencana)
+    response.headers["ETag"] = etag_rencana(rencana)
     
     return {
         "id": rencana.id,
@@ -66,163 +268,470 @@ def create_rencana_perjalanan(
         "anggaran": {
             "jumlah": rencana.anggaran_jumlah,
             "mata_uang": rencana.anggaran_mata_uang
-        }
+        },
+        "versi": rencana.versi
     }
 
+# API untuk mendapatkan daftar RencanaPerjalanan milik user, berupa ringkasan tanpa koleksi anak
+# terurut berdasarkan (durasi_mulai, id) dengan keyset pagination: kirim cursor_berikutnya sebagai ?cursor=
+@router.get("/", response_model=HalamanRencanaPerjalanan)
+def list_rencana_perjalanan(
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    nama: Optional[str] = Query(None, description="Awalan nama rencana"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    setelah = _decode_cursor(cursor, date.fromisoformat, UUID) if cursor else None
+    baris = repository.daftar_rencana(
+        session, current_user, batas + 1,
+        setelah=setelah, tanggal_dari=tanggal_dari, tanggal_sampai=tanggal_sampai, awalan_nama=nama
+    )
+
+    baris, cursor_berikutnya = _potong_halaman(baris, batas, ("durasi_mulai", "id"))
+    return HalamanRencanaPerjalanan(
+        data=[RencanaPerjalananRingkas.model_validate(dict(b)) for b in baris],
+        cursor_berikutnya=cursor_berikutnya
+    )
+
 # API untuk mendapatkan RencanaPerjalanan berdasarkan ID
-@router.get("/{rencana_id}")
-def get_rencana_perjalanan(rencana_id: UUID, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
-    return _get_rencana_dari_db(rencana_id, session)
+# ?fields= memilih kolom rencana dan ?include= memilih koleksi yang dimuat (hari, aktivitas, pengeluaran);
+# keduanya diteruskan ke query sehingga tampilan header saja cukup satu SELECT kolom yang diminta
+# dengan If-None-Match, versi dicek lebih dulu lewat primary key dan 304 dikirim tanpa memuat/serialisasi aggregate
+# bila CACHE_AGGREGATE aktif, tampilan penuh (tanpa fields/include) dilayani dari cache aggregate
+@router.get("/{rencana_id}", response_model=None, responses={200: {"model": RencanaPerjalananRead}, 304: {"description": "Tidak berubah"}})
+def get_rencana_perjalanan(
+    rencana_id: UUID,
+    fields: Optional[str] = Query(None, description=f"Kolom rencana dipisah koma: {','.join(KOLOM_RENCANA)}"),
+    include: Optional[str] = Query(None, description="Koleksi dipisah koma: hari,aktivitas,pengeluaran"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    kolom = _parse_daftar(fields, KOLOM_RENCANA, KOLOM_RENCANA, "fields")
+    muat = _parse_daftar(include, MUAT_SEMUA, MUAT_SEMUA, "include")
+
+    if fields is None and include is None and cache.cache_aggregate is not None:
+        return _get_rencana_lewat_cache(rencana_id, if_none_match, session)
+
+    if if_none_match is not None:
+        versi = repository.ambil_versi(session, rencana_id)
+        if versi is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Rencana Perjalanan dengan ID {rencana_id} tidak ditemukan"
+            )
+        etag = etag_tampilan_rencana(versi, kolom, muat)
+        if _cocok_if_none_match(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    if fields is None and include is None:
+        rencana = _get_rencana_dari_db(rencana_id, session, muat=MUAT_SEMUA)
+        return ResponseJSON(content=serialisasi_rencana(rencana), headers={"ETag": etag_tampilan_rencana(rencana.versi)})
+
+    rencana = _get_rencana_dari_db(rencana_id, session, muat=muat, kolom=kolom)
+    etag = etag_tampilan_rencana(rencana.versi, kolom, muat)
+    return ResponseJSON(content=_rencana_sebagian(rencana, kolom, muat), headers={"ETag": etag})
+
+# API untuk mendapatkan daftar HariPerjalanan sebuah rencana (tanpa aktivitas) dengan keyset pagination
+@router.get("/{rencana_id}/hari", response_model=HalamanHariPerjalanan)
+def list_hari_perjalanan(
+    rencana_id: UUID,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    urutan: str = Query("naik", pattern="^(naik|turun)$"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    rencana = _get_rencana_dari_db(rencana_id, session, kolom=())
+    setelah = _decode_cursor(cursor, date.fromisoformat) if cursor else None
+    baris = repository.daftar_hari(
+        session, rencana.id, batas + 1,
+        setelah=setelah, menurun=urutan == "turun", tanggal_dari=tanggal_dari, tanggal_sampai=tanggal_sampai
+    )
+
+    baris, cursor_berikutnya = _potong_halaman(baris, batas, ("tanggal",))
+    return HalamanHariPerjalanan(
+        data=[HariPerjalananRingkas.model_validate(dict(b)) for b in baris],
+        cursor_berikutnya=cursor_berikutnya
+    )
+
+# API untuk mendapatkan daftar Pengeluaran sebuah rencana dengan keyset pagination
+@router.get("/{rencana_id}/pengeluaran", response_model=HalamanPengeluaran)
+def list_pengeluaran(
+    rencana_id: UUID,
+    tanggal_dari: Optional[date] = None,
+    tanggal_sampai: Optional[date] = None,
+    urutan: str = Query("naik", pattern="^(naik|turun)$"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    rencana = _get_rencana_dari_db(rencana_id, session, kolom=())
+    setelah = _decode_cursor(cursor, date.fromisoformat, UUID) if cursor else None
+    baris = repository.daftar_pengeluaran(
+        session, rencana.id, batas + 1,
+        setelah=setelah, menurun=urutan == "turun", tanggal_dari=tanggal_dari, tanggal_sampai=tanggal_sampai
+    )
+
+    baris, cursor_berikutnya = _potong_halaman(baris, batas, ("tanggalPengeluaran", "idPengeluaran"))
+    return HalamanPengeluaran(
+        data=[PengeluaranRead.model_validate(dict(b)) for b in baris],
+        cursor_berikutnya=cursor_berikutnya
+    )
+
+# API untuk mendapatkan daftar Aktivitas pada satu HariPerjalanan dengan keyset pagination
+@router.get("/{rencana_id}/hari/{tanggal}/aktivitas", response_model=HalamanAktivitas)
+def list_aktivitas(
+    rencana_id: UUID,
+    tanggal: date,
+    waktu_dari: Optional[time] = None,
+    waktu_sampai: Optional[time] = None,
+    urutan: str = Query("naik", pattern="^(naik|turun)$"),
+    batas: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session: Session = Depends(get_session)
+):
+    hari = _get_hari_dari_db(rencana_id, tanggal, session)
+    setelah = _decode_cursor(cursor, time.fromisoformat, UUID) if cursor else None
+    baris = repository.daftar_aktivitas(
+        session, hari.idHari, batas + 1,
+        setelah=setelah, menurun=urutan == "turun", waktu_dari=waktu_dari, waktu_sampai=waktu_sampai
+    )
+
+    baris, cursor_berikutnya = _potong_halaman(baris, batas, ("waktuMulai", "idAktivitas"))
+    return HalamanAktivitas(
+        data=[AktivitasRead.model_validate(dict(b)) for b in baris],
+        cursor_berikutnya=cursor_berikutnya
+    )
 
 # API untuk menambahkan HariPerjalanan ke RencanaPerjalanan
-@router.post("/{rencana_id}/hari")
-def add_hari_perjalanan_ke_rencana(rencana_id: UUID, request: HariPerjalananCreate, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
-    rencana = _get_rencana_dari_db(rencana_id, session)
+# hariPerjalananList tidak dimuat: cek tanggal duplikat diselesaikan aggregate dengan satu query lewat index (rencana_id, tanggal)
+@router.post("/{rencana_id}/hari", response_model=RencanaPerjalananDasar)
+def add_hari_perjalanan_ke_rencana(rencana_id: UUID, request: HariPerjalananCreate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
 
-    try:
-        rencana.tambahHariPerjalanan(tanggal=request.tanggal)
-        session.add(rencana)
-        session.commit()
-        session.refresh(rencana)
-        
-        return rencana
-        
-    except TanggalDiLuarDurasiException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        try:
+            rencana.tambahHariPerjalanan(tanggal=request.tanggal)
+            session.commit()
+
+            return rencana
+
+        except StaleDataError:
+            raise
+        except TanggalDiLuarDurasiException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    rencana = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = etag_rencana(rencana)
+    return rencana
 
 # API untuk menambahkan Pengeluaran ke RencanaPerjalanan
-@router.post("/{rencana_id}/pengeluaran")
-def add_pengeluaran_ke_rencana(rencana_id: UUID, request: PengeluaranCreate, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):  # pragma: no cover
-    rencana = _get_rencana_dari_db(rencana_id, session)
+# hanya baris rencana yang dibaca; cek anggaran memakai total tersimpan dan dijaga CAS pada kolom versi
+@router.post("/{rencana_id}/pengeluaran", response_model=PengeluaranDitambahkan)
+def add_pengeluaran_ke_rencana(rencana_id: UUID, request: PengeluaranCreate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
 
-    try:
-        pengeluaran_baru = Pengeluaran(
-            deskripsi=request.deskripsi,
-            biaya_jumlah=request.biaya_jumlah,
-            biaya_mata_uang=request.biaya_mata_uang,
-            tanggalPengeluaran=request.tanggalPengeluaran
-        )
+        try:
+            pengeluaran_baru = Pengeluaran(
+                deskripsi=request.deskripsi,
+                biaya_jumlah=request.biaya.jumlah,
+                biaya_mata_uang=request.biaya.mata_uang,
+                tanggalPengeluaran=request.tanggalPengeluaran
+            )
+
+            rencana.tambahPengeluaran(pengeluaran_baru)
+            session.commit()
+
+            return PengeluaranDitambahkan(
+                rencana_id=rencana.id,
+                pengeluaran=PengeluaranRead.model_validate(pengeluaran_baru),
+                total_pengeluaran=rencana.total_pengeluaran,
+                jumlah_pengeluaran=rencana.jumlah_pengeluaran,
+                sisa_anggaran=rencana.getSisaAnggaran(),
+                versi=rencana.versi
+            )
 
-        rencana.tambahPengeluaran(pengeluaran_baru)
-        session.add(rencana)
+        except StaleDataError:
+            raise
+        except AnggaranTerlampauiException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except TanggalDiLuarDurasiException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    hasil = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = f'"{hasil.versi}"'
+    return hasil
+
+# API untuk menambahkan banyak Pengeluaran sekaligus ke RencanaPerjalanan
+# tanggal dan anggaran kumulatif divalidasi sekali oleh aggregate, lalu seluruh baris disisipkan dengan
+# satu executemany dalam satu transaksi; bila ada item yang tidak valid, tidak ada yang disimpan
+@router.post("/{rencana_id}/pengeluaran/batch", response_model=PengeluaranBatchDitambahkan)
+def add_pengeluaran_batch_ke_rencana(rencana_id: UUID, request: List[PengeluaranCreate], response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
+
+        kesalahan = rencana.tambahPengeluaranBatch([(item.biaya.jumlah, item.tanggalPengeluaran) for item in request])
+        if kesalahan:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "pesan": f"{len(kesalahan)} item pengeluaran tidak valid, tidak ada pengeluaran yang disimpan",
+                    "kesalahan": [{"indeks": indeks, "pesan": pesan} for indeks, pesan in kesalahan]
+                }
+            )
+
+        baris = [
+            {
+                "idPengeluaran": uuid4(),
+                "deskripsi": item.deskripsi,
+                "biaya_jumlah": item.biaya.jumlah,
+                "biaya_mata_uang": item.biaya.mata_uang,
+                "tanggalPengeluaran": item.tanggalPengeluaran,
+                "rencana_id": rencana.id
+            }
+            for item in request
+        ]
+        repository.sisipkan_pengeluaran(session, baris)
         session.commit()
-        session.refresh(rencana)
-        
-        return rencana
-
-    except AnggaranTerlampauiException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except TanggalDiLuarDurasiException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-# API untuk menambahkan Aktivitas ke HariPerjalanan
-@router.post("/{rencana_id}/hari/{tanggal}/aktivitas")
-def add_aktivitas_ke_hari(rencana_id: UUID, tanggal: date, request: AktivitasCreate, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):  # pragma: no cover
-    rencana = _get_rencana_dari_db(rencana_id, session)
-    
-    hari = rencana.getHariPerjalanan(tanggal)
-    if not hari:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Hari perjalanan pada tanggal {tanggal} tidak ditemukan dalam rencana perjalanan"
+        return PengeluaranBatchDitambahkan(
+            rencana_id=rencana.id,
+            jumlah_ditambahkan=len(baris),
+            idPengeluaranList=[b["idPengeluaran"] for b in baris],
+            total_pengeluaran=rencana.total_pengeluaran,
+            jumlah_pengeluaran=rencana.jumlah_pengeluaran,
+            sisa_anggaran=rencana.getSisaAnggaran(),
+            versi=rencana.versi
         )
-    
-    try:
-        aktivitas_baru = Aktivitas(
-            waktuMulai=request.waktuMulai,
-            waktuSelesai=request.waktuSelesai,
-            lokasi=request.lokasi,
-            deskripsi=request.deskripsi
-        )
-        
-        hari.tambahAktivitas(aktivitas_baru)
-        session.add(rencana)
+
+    hasil = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = f'"{hasil.versi}"'
+    return hasil
+
+# API untuk menambahkan Aktivitas ke HariPerjalanan
+# cek tumpang tindih hanya terhadap kandidat dari index (hari_id, waktuMulai), bukan seluruh aktivitasList
+@router.post("/{rencana_id}/hari/{tanggal}/aktivitas", response_model=AktivitasDitambahkan)
+def add_aktivitas_ke_hari(rencana_id: UUID, tanggal: date, request: AktivitasCreate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
+        hari = _get_hari_dari_db(rencana.id, tanggal, session)
+
+        try:
+            aktivitas_baru = Aktivitas(
+                waktuMulai=request.waktuMulai,
+                waktuSelesai=request.waktuSelesai,
+                lokasi=request.lokasi.model_dump(),
+                deskripsi=request.deskripsi
+            )
+
+            hari.cekKonflikAktivitas(aktivitas_baru, repository.cari_kandidat_konflik_aktivitas(session, hari.idHari, aktivitas_baru))
+            aktivitas_baru.hari_id = hari.idHari
+            session.add(aktivitas_baru)
+            # versi dinaikkan agar penambahan aktivitas yang bersamaan pada rencana ini saling terdeteksi
+            rencana.naikkanVersi()
+            session.commit()
+
+            return AktivitasDitambahkan(
+                rencana_id=rencana.id,
+                tanggal=tanggal,
+                aktivitas=AktivitasRead.model_validate(aktivitas_baru),
+                versi=rencana.versi
+            )
+
+        except StaleDataError:
+            raise
+        except AktivitasKonflikException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    hasil = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = f'"{hasil.versi}"'
+    return hasil
+
+# API untuk menambahkan banyak Aktivitas sekaligus ke beberapa HariPerjalanan
+# hanya hari yang disebut yang dimuat, konflik dicek per hari dengan satu sort-and-sweep, lalu seluruh baris
+# disisipkan dengan satu executemany dalam satu transaksi; bila ada item yang tidak valid, tidak ada yang disimpan
+@router.post("/{rencana_id}/aktivitas/batch", response_model=AktivitasBatchDitambahkan)
+def add_aktivitas_batch_ke_rencana(rencana_id: UUID, request: List[AktivitasBatchCreate], response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
+
+        hari_per_tanggal = repository.muat_hari_dengan_aktivitas(session, rencana.id, (item.tanggal for item in request))
+
+        kesalahan = []
+        item_per_hari = {}
+        for indeks, item in enumerate(request):
+            if item.tanggal not in hari_per_tanggal:
+                kesalahan.append((indeks, f"Hari perjalanan pada tanggal {item.tanggal} tidak ditemukan dalam rencana perjalanan"))
+            else:
+                item_per_hari.setdefault(item.tanggal, []).append((indeks, item.waktuMulai, item.waktuSelesai, item.deskripsi))
+
+        for tanggal, item_hari in item_per_hari.items():
+            kesalahan.extend(hari_per_tanggal[tanggal].validasiAktivitasBatch(item_hari))
+
+        if kesalahan:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "pesan": f"{len(kesalahan)} item aktivitas tidak valid, tidak ada aktivitas yang disimpan",
+                    "kesalahan": [{"indeks": indeks, "pesan": pesan} for indeks, pesan in sorted(kesalahan)]
+                }
+            )
+
+        baris = [
+            {
+                "idAktivitas": uuid4(),
+                "waktuMulai": item.waktuMulai,
+                "waktuSelesai": item.waktuSelesai,
+                "deskripsi": item.deskripsi,
+                "lokasi": item.lokasi.model_dump(),
+                "hari_id": hari_per_tanggal[item.tanggal].idHari
+            }
+            for item in request
+        ]
+        repository.sisipkan_aktivitas(session, baris)
+        if baris:
+            rencana.naikkanVersi()
         session.commit()
-        session.refresh(rencana)
-        
-        return rencana
-        
-    except AktivitasKonflikException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+        return AktivitasBatchDitambahkan(
+            rencana_id=rencana.id,
+            jumlah_ditambahkan=len(baris),
+            idAktivitasList=[b["idAktivitas"] for b in baris],
+            versi=rencana.versi
+        )
+
+    hasil = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = f'"{hasil.versi}"'
+    return hasil
 
 # API untuk mengupdate Anggaran RencanaPerjalanan
-@router.put("/{rencana_id}/anggaran")
-def update_anggaran_rencana(rencana_id: UUID, request: AnggaranUpdate, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):  # pragma: no cover
-    rencana = _get_rencana_dari_db(rencana_id, session)
-    
-    try:
-        rencana.setAnggaran(request.jumlah, request.mata_uang)
-        session.add(rencana)
-        session.commit()
-        session.refresh(rencana)
-        return rencana
-        
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+@router.put("/{rencana_id}/anggaran", response_model=RencanaPerjalananDasar)
+def update_anggaran_rencana(rencana_id: UUID, request: AnggaranUpdate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
+
+        try:
+            rencana.setAnggaran(request.anggaranBaru.jumlah, request.anggaranBaru.mata_uang)
+            session.commit()
+            return rencana
+
+        except StaleDataError:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    rencana = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = etag_rencana(rencana)
+    return rencana
 
 # API untuk mengupdate Durasi RencanaPerjalanan
-@router.put("/{rencana_id}/durasi")
-def update_durasi_rencana(rencana_id: UUID, request: DurasiUpdate, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):  # pragma: no cover
-    rencana = _get_rencana_dari_db(rencana_id, session)
-    
-    try:
-        rencana.setDurasi(request.tanggal_mulai, request.tanggal_selesai)
-        session.add(rencana)
-        session.commit()
-        session.refresh(rencana)
-        return rencana
-        
-    except TanggalDiLuarDurasiException as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+# koleksi anak tidak dimuat: durasi baru dicek terhadap MIN/MAX tanggal hari dan pengeluaran dalam satu query
+@router.put("/{rencana_id}/durasi", response_model=RencanaPerjalananDasar)
+def update_durasi_rencana(rencana_id: UUID, request: DurasiUpdate, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
 
-# API untuk menghapus HariPerjalanan dari Rencana Perjalanan
-@router.delete("/{rencana_id}/hari/{tanggal}")
-def delete_hari_perjalanan(rencana_id: UUID, tanggal: date, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
-    rencana = _get_rencana_dari_db(rencana_id, session)
-    
-    hari_perjalanan = rencana.hapusHariPerjalanan(tanggal)
-    
-    if not hari_perjalanan:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Hari perjalanan dengan tanggal {tanggal} tidak ditemukan"
-        )
-    
-    session.add(rencana)
-    session.commit()
-    session.refresh(rencana)
+        try:
+            rencana.setDurasi(request.durasiBaru.tanggalMulai, request.durasiBaru.tanggalSelesai)
+            session.commit()
+            return rencana
 
+        except StaleDataError:
+            raise
+        except TanggalDiLuarDurasiException as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    rencana = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = etag_rencana(rencana)
     return rencana
 
+# API untuk menghapus HariPerjalanan dari Rencana Perjalanan
+# hari dicari lewat index (rencana_id, tanggal) dan aktivitasnya dihapus dengan satu DELETE
+@router.delete("/{rencana_id}/hari/{tanggal}", response_model=HariDihapus)
+def delete_hari_perjalanan(rencana_id: UUID, tanggal: date, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
+
+        hari_perjalanan = repository.cari_hari(session, rencana.id, tanggal)
+
+        if not hari_perjalanan:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Hari perjalanan dengan tanggal {tanggal} tidak ditemukan"
+            )
+
+        jumlah_aktivitas = repository.hapus_hari(session, hari_perjalanan)
+        rencana.naikkanVersi()
+        session.commit()
+
+        return HariDihapus(rencana_id=rencana_id, tanggal=tanggal, jumlah_aktivitas_dihapus=jumlah_aktivitas, versi=rencana.versi)
+
+    hasil = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = f'"{hasil.versi}"'
+    return hasil
+
 # API untuk menghapus Pengeluaran dari RencanaPerjalanan
-@router.delete("/{rencana_id}/pengeluaran/{id_pengeluaran}")
-def delete_pengeluaran(rencana_id: UUID, id_pengeluaran: UUID, current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
-    rencana = _get_rencana_dari_db(rencana_id, session)
-    
-    pengeluaran = rencana.hapusPengeluaran(id_pengeluaran)
-    
-    if not pengeluaran:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Pengeluaran dengan ID {id_pengeluaran} tidak ditemukan"
+# pengeluaran dicari berdasarkan primary key lalu total rencana dikurangi tanpa memuat pengeluaranList
+@router.delete("/{rencana_id}/pengeluaran/{id_pengeluaran}", response_model=PengeluaranDihapus)
+def delete_pengeluaran(rencana_id: UUID, id_pengeluaran: UUID, response: Response, if_match: Optional[str] = Header(None), current_user: str = Depends(get_current_user), session: Session = Depends(get_session)):
+    def tulis():
+        rencana = _ambil_rencana_dari_db(rencana_id, session)
+        _cek_if_match(rencana, if_match)
+
+        pengeluaran = repository.cari_pengeluaran(session, rencana.id, id_pengeluaran)
+
+        if not pengeluaran:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Pengeluaran dengan ID {id_pengeluaran} tidak ditemukan"
+            )
+
+        rencana.lepasPengeluaran(pengeluaran)
+        session.delete(pengeluaran)
+        session.commit()
+
+        return PengeluaranDihapus(
+            rencana_id=rencana_id,
+            idPengeluaran=id_pengeluaran,
+            total_pengeluaran=rencana.total_pengeluaran,
+            jumlah_pengeluaran=rencana.jumlah_pengeluaran,
+            sisa_anggaran=rencana.getSisaAnggaran(),
+            versi=rencana.versi
         )
-    
-    session.add(rencana)
-    session.commit()
-    session.refresh(rencana)
 
-    return rencana
\ No newline at end of file
+    hasil = _tulis_dengan_retry(session, rencana_id, tulis)
+    response.headers["ETag"] = f'"{hasil.versi}"'
+    return hasil
@@ -1,7 +1,9 @@
 # skrip berisikan skema Pydantic untuk Request/Response API
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date, time
+from uuid import UUID
+from typing import Any, Dict, List, Optional
 from models.value_objects import Uang, Durasi, Lokasi
 
 # === Skema untuk Model ===
@@ -29,6 +31,10 @@ class AktivitasCreate(BaseModel):
     lokasi: Lokasi
     deskripsi: str
 
+# untuk menambahkan banyak Aktivitas sekaligus, masing-masing ke HariPerjalanan pada tanggal tertentu
+class AktivitasBatchCreate(AktivitasCreate):
+    tanggal: date
+
 # untuk memperbarui anggaran RencanaPerjalanan
 class AnggaranUpdate(BaseModel):
     anggaranBaru: Uang
@@ -37,6 +43,201 @@ class AnggaranUpdate(BaseModel):
 class DurasiUpdate(BaseModel):
     durasiBaru: Durasi
 
+# === Skema untuk Response Aggregate ===
+
+# untuk Aktivitas di dalam response HariPerjalanan
+class AktivitasRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    idAktivitas: UUID
+    waktuMulai: time
+    waktuSelesai: time
+    deskripsi: str
+    lokasi: Dict[str, Any]
+    hari_id: Optional[UUID] = None
+
+# kolom HariPerjalanan tanpa aktivitas
+class HariPerjalananDasar(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    idHari: UUID
+    tanggal: date
+    rencana_id: Optional[UUID] = None
+
+# untuk HariPerjalanan di dalam response RencanaPerjalanan
+class HariPerjalananRead(HariPerjalananDasar):
+    aktivitasList: List[AktivitasRead] = []
+
+# untuk Pengeluaran di dalam response RencanaPerjalanan
+class PengeluaranRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    idPengeluaran: UUID
+    deskripsi: str
+    tanggalPengeluaran: date
+    biaya_jumlah: float
+    biaya_mata_uang: str
+    rencana_id: Optional[UUID] = None
+
+# untuk response RencanaPerjalanan lengkap dengan hari, aktivitas dan pengeluaran
+class RencanaPerjalananRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    nama: str
+    durasi_mulai: date
+    durasi_selesai: date
+    anggaran_jumlah: float
+    anggaran_mata_uang: str
+    versi: int
+    hariPerjalananList: List[HariPerjalananRead] = []
+    pengeluaranList: List[PengeluaranRead] = []
+
+# ringkasan RencanaPerjalanan (tanpa koleksi anak) untuk daftar rencana
+class RencanaPerjalananRingkas(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    nama: str
+    durasi_mulai: date
+    durasi_selesai: date
+    anggaran_jumlah: float
+    anggaran_mata_uang: str
+    total_pengeluaran: float
+    jumlah_pengeluaran: int
+    versi: int
+
+# kolom RencanaPerjalanan tanpa koleksi anak, untuk response endpoint penulisan yang mengubah rencana
+class RencanaPerjalananDasar(RencanaPerjalananRingkas):
+    pemilik: Optional[str] = None
+
+# satu halaman daftar RencanaPerjalanan; cursor_berikutnya None berarti halaman terakhir
+class HalamanRencanaPerjalanan(BaseModel):
+    data: List[RencanaPerjalananRingkas]
+    cursor_berikutnya: Optional[str] = None
+
+# ringkasan HariPerjalanan (tanpa aktivitas) untuk daftar hari
+class HariPerjalananRingkas(HariPerjalananDasar):
+    jumlah_aktivitas: int
+
+# satu halaman daftar HariPerjalanan
+class HalamanHariPerjalanan(BaseModel):
+    data: List[HariPerjalananRingkas]
+    cursor_berikutnya: Optional[str] = None
+
+# satu halaman daftar Pengeluaran
+class HalamanPengeluaran(BaseModel):
+    data: List[PengeluaranRead]
+    cursor_berikutnya: Optional[str] = None
+
+# satu halaman daftar Aktivitas dalam satu HariPerjalanan
+class HalamanAktivitas(BaseModel):
+    data: List[AktivitasRead]
+    cursor_berikutnya: Optional[str] = None
+
+# === Skema untuk Response Penulisan Ringkas ===
+
+# hasil penambahan Pengeluaran beserta total terbaru rencana
+class PengeluaranDitambahkan(BaseModel):
+    rencana_id: UUID
+    pengeluaran: PengeluaranRead
+    total_pengeluaran: float
+    jumlah_pengeluaran: int
+    sisa_anggaran: float
+    versi: int
+
+# hasil penambahan banyak Pengeluaran sekaligus
+class PengeluaranBatchDitambahkan(BaseModel):
+    rencana_id: UUID
+    jumlah_ditambahkan: int
+    idPengeluaranList: List[UUID]
+    total_pengeluaran: float
+    jumlah_pengeluaran: int
+    sisa_anggaran: float
+    versi: int
+
+# hasil penambahan Aktivitas ke HariPerjalanan
+class AktivitasDitambahkan(BaseModel):
+    rencana_id: UUID
+    tanggal: date
+    aktivitas: AktivitasRead
+    versi: int
+
+# hasil penambahan banyak Aktivitas sekaligus
+class AktivitasBatchDitambahkan(BaseModel):
+    rencana_id: UUID
+    jumlah_ditambahkan: int
+    idAktivitasList: List[UUID]
+    versi: int
+
+# hasil penghapusan HariPerjalanan beserta jumlah aktivitas yang ikut terhapus
+class HariDihapus(BaseModel):
+    rencana_id: UUID
+    tanggal: date
+    jumlah_aktivitas_dihapus: int
+    versi: int
+
+# hasil penghapusan Pengeluaran beserta total terbaru rencana
+class PengeluaranDihapus(BaseModel):
+    rencana_id: UUID
+    idPengeluaran: UUID
+    total_pengeluaran: float
+    jumlah_pengeluaran: int
+    sisa_anggaran: float
+    versi: int
+
+# === Skema untuk Impor ===
+
+# aktivitas pada satu baris impor NDJSON (bentuk sama dengan baris ekspor)
+class AktivitasImpor(BaseModel):
+    idAktivitas: Optional[UUID] = None
+    waktuMulai: time
+    waktuSelesai: time
+    deskripsi: str
+    lokasi: Lokasi
+
+# hari perjalanan pada satu baris impor NDJSON
+class HariPerjalananImpor(BaseModel):
+    idHari: Optional[UUID] = None
+    tanggal: date
+    aktivitasList: List[AktivitasImpor] = []
+
+# pengeluaran pada satu baris impor NDJSON
+class PengeluaranImpor(BaseModel):
+    idPengeluaran: Optional[UUID] = None
+    deskripsi: str
+    tanggalPengeluaran: date
+    biaya_jumlah: float
+    biaya_mata_uang: str = "IDR"
+
+# satu baris impor NDJSON; kolom turunan pada baris ekspor (versi, total, diperbarui_pada) diabaikan
+class RencanaPerjalananImpor(BaseModel):
+    id: Optional[UUID] = None
+    nama: str
+    pemilik: Optional[str] = None
+    durasi_mulai: date
+    durasi_selesai: date
+    anggaran_jumlah: float
+    anggaran_mata_uang: str = "IDR"
+    hariPerjalananList: List[HariPerjalananImpor] = []
+    pengeluaranList: List[PengeluaranImpor] = []
+
+# kesalahan satu baris impor
+class KesalahanImpor(BaseModel):
+    baris: int
+    id: Optional[UUID] = None
+    pesan: str
+
+# laporan akhir impor; baris_diproses dipakai sebagai titik lanjut (mulai_baris) bila impor terputus
+class LaporanImpor(BaseModel):
+    baris_diproses: int
+    jumlah_berhasil: int
+    jumlah_gagal: int
+    jumlah_dilewati: int = 0
+    durasi_detik: float
+    rencana_per_detik: float
+    kesalahan: List[KesalahanImpor]
+
 # === Skema untuk Autentikasi ===
 
 # untuk JWT
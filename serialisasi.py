@@ -0,0 +1,36 @@
+# skrip berisikan serializer JSON untuk aggregate RencanaPerjalanan
+# TypeAdapter dibangun sekali saat import sehingga validasi dari atribut ORM dan penulisan JSON
+# berjalan di pydantic-core tanpa melewati jsonable_encoder untuk setiap relasi
+
+from typing import Any, List
+
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from models.aggregate_root import RencanaPerjalanan
+from schema import RencanaPerjalananRead, HariPerjalananDasar, HariPerjalananRead, PengeluaranRead
+
+# response JSON berbasis orjson; isi berupa bytes (hasil serializer di bawah) diteruskan apa adanya
+class ResponseJSON(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
+# serializer aggregate lengkap dan koleksi anaknya
+ADAPTER_RENCANA = TypeAdapter(RencanaPerjalananRead)
+ADAPTER_DAFTAR_HARI = TypeAdapter(List[HariPerjalananRead])
+ADAPTER_DAFTAR_HARI_DASAR = TypeAdapter(List[HariPerjalananDasar])
+ADAPTER_DAFTAR_PENGELUARAN = TypeAdapter(List[PengeluaranRead])
+
+# memvalidasi nilai dari atribut objek ORM lalu menuliskannya sebagai JSON bytes
+def ke_json(adapter: TypeAdapter, nilai: Any) -> bytes:
+    return adapter.dump_json(adapter.validate_python(nilai, from_attributes=True))
+
+# sama dengan ke_json tetapi menghasilkan struktur Python yang siap ditulis orjson (UUID/tanggal sebagai string)
+def ke_python(adapter: TypeAdapter, nilai: Any) -> Any:
+    return adapter.dump_python(adapter.validate_python(nilai, from_attributes=True), mode="json")
+
+# JSON aggregate lengkap dengan hari, aktivitas dan pengeluaran
+def serialisasi_rencana(rencana: RencanaPerjalanan) -> bytes:
+    return ke_json(ADAPTER_RENCANA, rencana)
@@ -1,8 +1,10 @@
 # skrip konfigurasi fixture untuk testing
 
 import pytest
+import pytest_asyncio
 import os
 import sys
+from contextlib import asynccontextmanager
 from pathlib import Path
 from datetime import timedelta
 
@@ -16,9 +18,15 @@ sys.path.insert(0, str(project_root))
 
 from sqlmodel import Session, create_engine, SQLModel
 from sqlmodel.pool import StaticPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import event
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
+from httpx import AsyncClient, ASGITransport
 from main import app
-from database import get_session
+from database import get_session, get_async_session, DB_EXPIRE_ON_COMMIT
+from router import auth_router, async_router
 from security.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 
 # ==================== Database Fixtures ====================
@@ -33,12 +41,34 @@ def session_fixture():
     )
     SQLModel.metadata.create_all(engine)
     
-    with Session(engine) as session:
+    # mode session disamakan dengan get_session aplikasi
+    with Session(engine, expire_on_commit=DB_EXPIRE_ON_COMMIT) as session:
         yield session
     
     SQLModel.metadata.drop_all(engine)
     engine.dispose()
 
+# database SQLite berbasis file untuk menguji CLI yang membuka Session(engine) sendiri
+@pytest.fixture(name="engine_file", scope="function")
+def engine_file_fixture(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/cli.db")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+# mencatat setiap statement SQL yang dikirim ke database session test
+@pytest.fixture(name="executed_queries", scope="function")
+def executed_queries_fixture(session: Session):
+    engine = session.get_bind()
+    statements = []
+
+    def catat_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", catat_statement)
+    yield statements
+    event.remove(engine, "before_cursor_execute", catat_statement)
+
 @pytest.fixture(name="client", scope="function")
 def client_fixture(session: Session):
     def get_session_override():
@@ -51,6 +81,42 @@ def client_fixture(session: Session):
     
     app.dependency_overrides.clear()
 
+# client untuk router async dengan database SQLite in-memory via aiosqlite
+# membuat AsyncClient untuk aplikasi berisi router async di atas async_engine yang diberikan
+@asynccontextmanager
+async def _buka_async_client(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    async_app = FastAPI()
+    async_app.include_router(auth_router, prefix="/api/auth")
+    async_app.include_router(async_router, prefix="/api")
+    async_app.dependency_overrides[get_async_session] = get_async_session_override
+
+    async with AsyncClient(transport=ASGITransport(app=async_app), base_url="http://test") as client:
+        yield client
+
+    await async_engine.dispose()
+
+@pytest_asyncio.fixture(name="async_client", scope="function")
+async def async_client_fixture():
+    async_engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+    )
+    async with _buka_async_client(async_engine) as client:
+        yield client
+
+# router async di atas file SQLite (tmp_path/async.db) agar test dapat menulis lewat koneksi terpisah ke file yang sama
+@pytest_asyncio.fixture(name="async_client_file", scope="function")
+async def async_client_file_fixture(tmp_path):
+    async with _buka_async_client(create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")) as client:
+        yield client
+
 # ==================== Authentication Fixtures ====================
 
 @pytest.fixture
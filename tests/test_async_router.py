@@ -0,0 +1,135 @@
+# skrip untuk test router async (AsyncSession)
+import importlib
+import pytest
+from uuid import UUID, uuid4
+from sqlmodel import Session, create_engine, select
+from models import Pengeluaran
+
+from tests.test_concurrency import sisipkan_penulis_lain
+
+router_modul = importlib.import_module("router.router")
+
+# test membuat dan mendapatkan RencanaPerjalanan lewat router async
+@pytest.mark.asyncio
+async def test_async_create_dan_get_rencana(async_client, sample_rencana_data, auth_headers):
+    create_response = await async_client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    assert create_response.status_code == 201
+    rencana_id = create_response.json()["id"]
+
+    response = await async_client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["nama"] == sample_rencana_data["nama"]
+
+# test mendapatkan RencanaPerjalanan yang tidak ada lewat router async
+@pytest.mark.asyncio
+async def test_async_get_rencana_not_found(async_client, auth_headers):
+    response = await async_client.get(f"/api/perencanaan/{uuid4()}", headers=auth_headers)
+    assert response.status_code == 404
+
+# test menambahkan dan menghapus HariPerjalanan lewat router async
+@pytest.mark.asyncio
+async def test_async_tambah_dan_hapus_hari(async_client, sample_rencana_data, auth_headers):
+    create_response = await async_client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+
+    response = await async_client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-03"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    # tanggal di luar durasi
+    response = await async_client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-15"}, headers=auth_headers)
+    assert response.status_code == 400
+
+    response = await async_client.delete(f"/api/perencanaan/{rencana_id}/hari/2024-12-03", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = await async_client.delete(f"/api/perencanaan/{rencana_id}/hari/2024-12-03", headers=auth_headers)
+    assert response.status_code == 404
+
+# test menambahkan dan menghapus Pengeluaran lewat router async
+@pytest.mark.asyncio
+async def test_async_tambah_dan_hapus_pengeluaran(async_client, sample_rencana_data, auth_headers):
+    create_response = await async_client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+
+    pengeluaran_data = {"deskripsi": "Hotel", "biaya": {"jumlah": 1000000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"}
+    response = await async_client.post(f"/api/perencanaan/{rencana_id}/pengeluaran", json=pengeluaran_data, headers=auth_headers)
+    assert response.status_code == 200
+    pengeluaran_id = response.json()["pengeluaran"]["idPengeluaran"]
+
+    response = await async_client.delete(f"/api/perencanaan/{rencana_id}/pengeluaran/{pengeluaran_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["jumlah_pengeluaran"] == 0
+
+# test If-Match pada penulisan lewat router async: versi lama ditolak 412 tanpa mengubah data
+@pytest.mark.asyncio
+async def test_async_if_match(async_client, sample_rencana_data, auth_headers):
+    create_response = await async_client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    anggaran = {"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}}
+
+    response = await async_client.put(f"/api/perencanaan/{rencana_id}/anggaran", json=anggaran, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+    pengeluaran_data = {"deskripsi": "Hotel", "biaya": {"jumlah": 1000000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"}
+    response = await async_client.post(f"/api/perencanaan/{rencana_id}/pengeluaran", json=pengeluaran_data, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 412
+    response = await async_client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert (response.json()["versi"], response.json()["pengeluaranList"]) == (2, [])
+
+# test penulisan lewat router async diulang saat penulis lain lebih dulu menaikkan versi (StaleDataError),
+# dan menghasilkan 409 bila konflik terus terjadi sampai batas percobaan
+@pytest.mark.asyncio
+async def test_async_retry_konflik_versi(async_client_file, tmp_path, monkeypatch, sample_rencana_data, auth_headers):
+    engine_file = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    create_response = await async_client_file.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    pengeluaran_data = {"deskripsi": "Hotel", "biaya": {"jumlah": 1000000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-03"}
+
+    versi_terbaca = sisipkan_penulis_lain(monkeypatch, engine_file, biaya=200, berapa_kali=1)
+    response = await async_client_file.post(f"/api/perencanaan/{rencana_id}/pengeluaran", json=pengeluaran_data, headers=auth_headers)
+    assert response.status_code == 200
+    assert versi_terbaca == [1, 2]
+    assert (response.json()["total_pengeluaran"], response.json()["versi"]) == (1000200.0, 3)
+
+    monkeypatch.setattr(router_modul, "MAKS_PERCOBAAN_TULIS", 2)
+    versi_terbaca = sisipkan_penulis_lain(monkeypatch, engine_file, biaya=10, berapa_kali=5)
+    response = await async_client_file.post(f"/api/perencanaan/{rencana_id}/pengeluaran", json=pengeluaran_data, headers=auth_headers)
+    assert response.status_code == 409
+    assert len(versi_terbaca) == 2
+
+    # hanya pengeluaran penulis lain dan satu pengeluaran yang berhasil yang tersimpan
+    with Session(engine_file) as session:
+        biaya = session.exec(select(Pengeluaran.biaya_jumlah).where(Pengeluaran.rencana_id == UUID(rencana_id))).all()
+    assert sorted(biaya) == [10.0, 10.0, 200.0, 1000000.0]
+    engine_file.dispose()
+
+# test endpoint batch pengeluaran lewat router async: sukses, lalu item tidak valid membatalkan seluruh batch
+@pytest.mark.asyncio
+async def test_async_tambah_pengeluaran_batch(async_client, sample_rencana_data, auth_headers):
+    create_response = await async_client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    url = f"/api/perencanaan/{rencana_id}/pengeluaran/batch"
+
+    items = [{"deskripsi": f"Struk {i}", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"} for i in range(50)]
+    response = await async_client.post(url, json=items, headers=auth_headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["jumlah_ditambahkan"], result["total_pengeluaran"], result["versi"]) == (50, 50000.0, 2)
+    assert response.headers["ETag"] == '"2"'
+
+    items = [
+        {"deskripsi": "Tiket", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-15"},
+        {"deskripsi": "Hotel", "biaya": {"jumlah": 6000000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-03"},
+    ]
+    response = await async_client.post(url, json=items, headers=auth_headers)
+    assert response.status_code == 400
+    assert [k["indeks"] for k in response.json()["detail"]["kesalahan"]] == [0, 1]
+    response = await async_client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert (response.json()["versi"], len(response.json()["pengeluaranList"])) == (2, 50)
+
+# test router async tanpa autentikasi
+@pytest.mark.asyncio
+async def test_async_unauthorized(async_client):
+    response = await async_client.get(f"/api/perencanaan/{uuid4()}")
+    assert response.status_code == 401
@@ -0,0 +1,134 @@
+# skrip untuk test cache aggregate in-process
+import pytest
+from uuid import uuid4
+
+import cache
+from cache import CacheAggregate, OVERHEAD_ENTRI_BYTE
+
+# jam palsu untuk menguji TTL tanpa menunggu
+class Jam:
+    def __init__(self):
+        self.sekarang = 0.0
+
+    def __call__(self):
+        return self.sekarang
+
+@pytest.fixture(name="cache_aktif")
+def cache_aktif_fixture(monkeypatch):
+    cache_uji = CacheAggregate(ttl=60, maks_byte=1024 * 1024)
+    monkeypatch.setattr(cache, "cache_aggregate", cache_uji)
+    return cache_uji
+
+def test_hit_miss_dan_lru():
+    cache_uji = CacheAggregate(ttl=60, maks_byte=2 * (10 + OVERHEAD_ENTRI_BYTE))
+    a, b, c = uuid4(), uuid4(), uuid4()
+
+    assert cache_uji.ambil(a) is None
+    cache_uji.simpan(a, 1, b"a" * 10)
+    cache_uji.simpan(b, 1, b"b" * 10)
+    assert cache_uji.ambil(a) == (1, b"a" * 10)
+
+    # b paling lama tidak dipakai sehingga dikeluarkan saat batas memori terlampaui
+    cache_uji.simpan(c, 1, b"c" * 10)
+    assert cache_uji.ambil(b) is None
+    assert cache_uji.ambil(a) is not None
+    assert cache_uji.ambil(c) is not None
+
+    data = cache_uji.snapshot()
+    assert data["jumlah_entri"] == 2
+    assert data["ukuran_byte"] == 2 * (10 + OVERHEAD_ENTRI_BYTE)
+    assert (data["hit"], data["miss"], data["eviksi"]) == (3, 2, 1)
+
+def test_entri_kedaluwarsa_setelah_ttl():
+    jam = Jam()
+    cache_uji = CacheAggregate(ttl=30, maks_byte=1024, waktu=jam)
+    rencana_id = uuid4()
+    cache_uji.simpan(rencana_id, 1, b"{}")
+
+    jam.sekarang = 29
+    assert cache_uji.ambil(rencana_id) is not None
+    jam.sekarang = 30
+    assert cache_uji.ambil(rencana_id) is None
+
+    data = cache_uji.snapshot()
+    assert data["kedaluwarsa"] == 1
+    assert data["ukuran_byte"] == 0
+
+def test_entri_melebihi_batas_tidak_disimpan():
+    cache_uji = CacheAggregate(ttl=60, maks_byte=100)
+    assert not cache_uji.simpan(uuid4(), 1, b"x" * 100)
+    assert cache_uji.snapshot()["jumlah_entri"] == 0
+
+def test_invalidasi_menolak_versi_basi():
+    cache_uji = CacheAggregate(ttl=60, maks_byte=1024)
+    rencana_id = uuid4()
+    cache_uji.simpan(rencana_id, 1, b"v1")
+
+    # penulis menaikkan versi ke 2; pembaca yang masih membawa versi 1 tidak boleh mengisi ulang cache
+    cache_uji.invalidasi(rencana_id, 2)
+    assert cache_uji.ambil(rencana_id) is None
+    assert not cache_uji.simpan(rencana_id, 1, b"v1")
+    assert cache_uji.simpan(rencana_id, 2, b"v2")
+    assert not cache_uji.simpan(rencana_id, 1, b"v1")
+    assert cache_uji.ambil(rencana_id) == (2, b"v2")
+    assert cache_uji.snapshot()["invalidasi"] == 1
+
+# test entri yang lebih baru tidak ditimpa versi lama, dan penanda versi minimal dibatasi jumlahnya
+def test_simpan_versi_dan_batas_penanda(monkeypatch):
+    monkeypatch.setattr(cache, "MAKS_PENANDA_INVALIDASI", 2)
+    cache_uji = CacheAggregate(ttl=60, maks_byte=1024)
+    rencana_id = uuid4()
+    assert cache_uji.simpan(rencana_id, 2, b"v2")
+    assert not cache_uji.simpan(rencana_id, 1, b"v1")
+    assert cache_uji.simpan(rencana_id, 3, b"v3")
+    assert cache_uji.ambil(rencana_id) == (3, b"v3")
+    assert cache_uji.snapshot()["ukuran_byte"] == 2 + OVERHEAD_ENTRI_BYTE
+
+    # penanda tertua dikeluarkan sehingga versi lama rencana itu kembali dapat disimpan
+    a, b, c = uuid4(), uuid4(), uuid4()
+    for lain in (a, b, c):
+        cache_uji.invalidasi(lain, 5)
+    assert cache_uji.simpan(a, 1, b"a")
+    assert not cache_uji.simpan(b, 1, b"b")
+
+# test GET aggregate penuh dilayani dari cache tanpa query dan diinvalidasi oleh penulisan
+def test_get_rencana_lewat_cache(client, cache_aktif, executed_queries, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    url = f"/api/perencanaan/{rencana_id}"
+    client.post(f"{url}/hari", json={"tanggal": "2024-12-02"}, headers=auth_headers)
+
+    pertama = client.get(url, headers=auth_headers)
+    assert pertama.status_code == 200
+    assert pertama.headers["ETag"] == '"2"'
+
+    executed_queries.clear()
+    kedua = client.get(url, headers=auth_headers)
+    assert executed_queries == []
+    assert kedua.json() == pertama.json()
+    assert kedua.headers["ETag"] == '"2"'
+    assert client.get(url, headers={**auth_headers, "If-None-Match": '"2"'}).status_code == 304
+    assert executed_queries == []
+
+    # penulisan menginvalidasi entri sehingga GET berikutnya membaca versi terbaru dari database
+    client.post(f"{url}/pengeluaran", json={"deskripsi": "Tiket", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"}, headers=auth_headers)
+    ketiga = client.get(url, headers=auth_headers)
+    assert ketiga.headers["ETag"] == '"3"'
+    assert len(ketiga.json()["pengeluaranList"]) == 1
+
+    data = cache_aktif.snapshot()
+    assert (data["hit"], data["miss"], data["invalidasi"]) == (2, 2, 2)
+
+    # tampilan sebagian tetap dibaca dari database
+    executed_queries.clear()
+    assert client.get(url, params={"fields": "nama", "include": ""}, headers=auth_headers).json()["nama"] == sample_rencana_data["nama"]
+    assert executed_queries != []
+
+# test statistik cache di endpoint monitoring
+def test_monitoring_cache(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(cache, "cache_aggregate", None)
+    assert client.get("/api/monitoring/cache", headers=auth_headers).json() == {"aktif": False}
+
+    monkeypatch.setattr(cache, "cache_aggregate", CacheAggregate(ttl=60, maks_byte=1024))
+    data = client.get("/api/monitoring/cache", headers=auth_headers).json()
+    assert data["aktif"] is True
+    assert data["maks_byte"] == 1024
@@ -0,0 +1,156 @@
+# skrip untuk test optimistic concurrency control (kolom versi, CAS, retry, If-Match/ETag)
+import importlib
+import pytest
+from datetime import date
+from fastapi import HTTPException, Response
+from sqlmodel import Session, SQLModel, create_engine
+from models import RencanaPerjalanan, Pengeluaran, KonflikVersiException
+from schema import PengeluaranCreate
+import repository
+
+router_modul = importlib.import_module("router.router")
+
+# database SQLite berbasis file agar dua session benar-benar memakai transaksi terpisah
+@pytest.fixture
+def engine_file(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+# membuat rencana dengan anggaran 1000
+def buat_rencana(engine) -> RencanaPerjalanan:
+    with Session(engine, expire_on_commit=False) as session:
+        rencana = RencanaPerjalanan(
+            nama="Test",
+            durasi_mulai=date(2024, 12, 1),
+            durasi_selesai=date(2024, 12, 7),
+            anggaran_jumlah=1000,
+            anggaran_mata_uang="IDR"
+        )
+        session.add(rencana)
+        session.commit()
+        return rencana
+
+# mengganti repository.ambil_rencana agar request lain menambah pengeluaran tepat setelah rencana dibaca
+def sisipkan_penulis_lain(monkeypatch, engine, biaya, berapa_kali):
+    ambil_asli = repository.ambil_rencana
+    versi_terbaca = []
+
+    def ambil_lalu_disalip(session, rencana_id):
+        rencana = ambil_asli(session, rencana_id)
+        versi_terbaca.append(rencana.versi)
+        if len(versi_terbaca) <= berapa_kali:
+            with Session(engine) as session_lain:
+                rencana_lain = session_lain.get(RencanaPerjalanan, rencana_id)
+                rencana_lain.tambahPengeluaran(Pengeluaran(deskripsi="Lain", biaya_jumlah=biaya, tanggalPengeluaran=date(2024, 12, 2)))
+                session_lain.commit()
+        return rencana
+
+    monkeypatch.setattr(repository, "ambil_rencana", ambil_lalu_disalip)
+    return versi_terbaca
+
+# test versi naik pada setiap perubahan aggregate
+def test_versi_naik_saat_aggregate_berubah():
+    rencana = RencanaPerjalanan(nama="Test", durasi_mulai=date(2024, 12, 1), durasi_selesai=date(2024, 12, 7), anggaran_jumlah=1000)
+    assert rencana.versi == 1
+
+    rencana.tambahHariPerjalanan(date(2024, 12, 2))
+    rencana.tambahPengeluaran(Pengeluaran(deskripsi="Makan", biaya_jumlah=100, tanggalPengeluaran=date(2024, 12, 2)))
+    rencana.setAnggaran(2000)
+    assert rencana.versi == 4
+
+    rencana.cekVersi(4)
+    rencana.cekVersi(None)
+    with pytest.raises(KonflikVersiException):
+        rencana.cekVersi(3)
+
+# test dua penulis bersamaan tidak dapat melampaui anggaran: percobaan pertama gagal CAS,
+# percobaan ulang membaca total terbaru dan menolak pengeluaran
+def test_cas_retry_mencegah_anggaran_terlampaui(engine_file, monkeypatch):
+    rencana = buat_rencana(engine_file)
+    versi_terbaca = sisipkan_penulis_lain(monkeypatch, engine_file, biaya=700, berapa_kali=1)
+    request = PengeluaranCreate(deskripsi="Hotel", biaya={"jumlah": 500, "mata_uang": "IDR"}, tanggalPengeluaran=date(2024, 12, 3))
+
+    with Session(engine_file, expire_on_commit=False) as session:
+        with pytest.raises(HTTPException) as exc:
+            router_modul.add_pengeluaran_ke_rencana(rencana.id, request, Response(), None, "johndoe", session)
+
+    assert exc.value.status_code == 400
+    assert versi_terbaca == [1, 2]
+    with Session(engine_file) as session:
+        tersimpan = session.get(RencanaPerjalanan, rencana.id)
+        assert tersimpan.total_pengeluaran == 700
+        assert tersimpan.versi == 2
+        assert repository.cek_konsistensi_total_pengeluaran(session, rencana.id) == []
+
+# test penulisan berhasil pada percobaan ulang bila masih dalam anggaran
+def test_cas_retry_berhasil(engine_file, monkeypatch):
+    rencana = buat_rencana(engine_file)
+    sisipkan_penulis_lain(monkeypatch, engine_file, biaya=200, berapa_kali=1)
+    request = PengeluaranCreate(deskripsi="Hotel", biaya={"jumlah": 500, "mata_uang": "IDR"}, tanggalPengeluaran=date(2024, 12, 3))
+
+    response = Response()
+    with Session(engine_file, expire_on_commit=False) as session:
+        hasil = router_modul.add_pengeluaran_ke_rencana(rencana.id, request, response, None, "johndoe", session)
+
+    assert hasil.total_pengeluaran == 700
+    assert hasil.versi == 3
+    assert response.headers["ETag"] == '"3"'
+
+# test konflik terus-menerus menghasilkan 409 setelah batas percobaan
+def test_cas_retry_terbatas(engine_file, monkeypatch):
+    rencana = buat_rencana(engine_file)
+    monkeypatch.setattr(router_modul, "MAKS_PERCOBAAN_TULIS", 2)
+    versi_terbaca = sisipkan_penulis_lain(monkeypatch, engine_file, biaya=10, berapa_kali=5)
+    request = PengeluaranCreate(deskripsi="Hotel", biaya={"jumlah": 5, "mata_uang": "IDR"}, tanggalPengeluaran=date(2024, 12, 3))
+
+    with Session(engine_file, expire_on_commit=False) as session:
+        with pytest.raises(HTTPException) as exc:
+            router_modul.add_pengeluaran_ke_rencana(rencana.id, request, Response(), None, "johndoe", session)
+
+    assert exc.value.status_code == 409
+    assert len(versi_terbaca) == 2
+
+# test ETag dan If-Match pada endpoint API
+def test_if_match_dan_etag(client, sample_rencana_data, auth_headers):
+    create_response = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    assert create_response.headers["ETag"] == '"1"'
+
+    etag = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers).headers["ETag"]
+
+    # If-Match sesuai versi saat ini
+    response = client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-03"}, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+    # If-Match dengan versi lama ditolak tanpa mengubah data
+    response = client.put(
+        f"/api/perencanaan/{rencana_id}/anggaran",
+        json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}},
+        headers={**auth_headers, "If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers).json()["anggaran_jumlah"] == 5000000.0
+
+    # If-Match "*" diterima, ETag lemah ditolak karena If-Match memakai perbandingan kuat
+    response = client.delete(f"/api/perencanaan/{rencana_id}/hari/2024-12-03", headers={**auth_headers, "If-Match": "*"})
+    assert response.status_code == 200
+    response = client.put(
+        f"/api/perencanaan/{rencana_id}/anggaran",
+        json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}},
+        headers={**auth_headers, "If-Match": 'W/"3"'}
+    )
+    assert response.status_code == 412
+    response = client.put(
+        f"/api/perencanaan/{rencana_id}/anggaran",
+        json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}},
+        headers={**auth_headers, "If-Match": '"3"'}
+    )
+    assert response.status_code == 200
+    assert response.json()["versi"] == 4
+
+    # If-Match yang bukan ETag rencana
+    response = client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-04"}, headers={**auth_headers, "If-Match": '"abc"'})
+    assert response.status_code == 412
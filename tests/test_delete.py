@@ -26,7 +26,10 @@ def test_delete_hari_perjalanan_success(client, sample_rencana_data, auth_header
     )
     
     assert response.status_code == 200
-    # Don't check response structure - just verify deletion succeeded
+    assert response.json()["tanggal"] == "2024-12-03"
+
+    get_response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert get_response.json()["hariPerjalananList"] == []
 
 # test menghapus HariPerjalanan yang tidak ada
 def test_delete_hari_perjalanan_not_found(client, sample_rencana_data, auth_headers):
@@ -68,17 +71,8 @@ def test_delete_pengeluaran_success(client, sample_rencana_data, auth_headers):
         headers=auth_headers
     )
     
-    if add_response.status_code != 200:
-        pytest.skip("Cannot add pengeluaran - schema mismatch")
-    
-    # Get the pengeluaran ID from response
-    response_data = add_response.json()
-    
-    # The response is the full rencana object
-    if "pengeluaranList" in response_data and len(response_data["pengeluaranList"]) > 0:
-        pengeluaran_id = response_data["pengeluaranList"][0]["idPengeluaran"]
-    else:
-        pytest.skip("Response doesn't contain pengeluaranList")
+    assert add_response.status_code == 200
+    pengeluaran_id = add_response.json()["pengeluaran"]["idPengeluaran"]
     
     # Hapus pengeluaran
     response = client.delete(
@@ -87,6 +81,12 @@ def test_delete_pengeluaran_success(client, sample_rencana_data, auth_headers):
     )
     
     assert response.status_code == 200
+    assert response.json()["total_pengeluaran"] == 0.0
+    assert response.json()["jumlah_pengeluaran"] == 0
+
+    # pengeluaran benar-benar terhapus dari rencana
+    get_response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert get_response.json()["pengeluaranList"] == []
 
 # test menghapus Pengeluaran yang tidak ada
 def test_delete_pengeluaran_not_found(client, sample_rencana_data, auth_headers):
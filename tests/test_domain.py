@@ -353,4 +353,311 @@ def test_tambah_pengeluaran_success():
     rencana.tambahPengeluaran(p1)
     
     assert len(rencana.pengeluaranList) == 1
-    assert rencana.totalPengeluaranSaatIni() == 1000000.0
\ No newline at end of file
+    assert rencana.totalPengeluaranSaatIni() == 1000000.0
+def test_total_pengeluaran_inkremental_saat_hapus():
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 7),
+        anggaran_jumlah=5000000.0,
+        anggaran_mata_uang="IDR"
+    )
+
+    p1 = Pengeluaran(deskripsi="Hotel", biaya_jumlah=1000000.0, biaya_mata_uang="IDR", tanggalPengeluaran=date(2024, 12, 2))
+    p2 = Pengeluaran(deskripsi="Makan", biaya_jumlah=250000.0, biaya_mata_uang="IDR", tanggalPengeluaran=date(2024, 12, 3))
+    rencana.tambahPengeluaran(p1)
+    rencana.tambahPengeluaran(p2)
+    assert rencana.getTotalPengeluaran() == 1250000.0
+    assert rencana.getJumlahPengeluaran() == 2
+
+    rencana.hapusPengeluaran(p1.idPengeluaran)
+    assert rencana.getTotalPengeluaran() == 250000.0
+    assert rencana.getJumlahPengeluaran() == 1
+    assert rencana.cekKonsistensiTotalPengeluaran() is True
+
+def test_hitung_ulang_total_pengeluaran():
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 7),
+        anggaran_jumlah=5000000.0,
+        anggaran_mata_uang="IDR"
+    )
+
+    p1 = Pengeluaran(deskripsi="Hotel", biaya_jumlah=1000000.0, biaya_mata_uang="IDR", tanggalPengeluaran=date(2024, 12, 2))
+    rencana.tambahPengeluaran(p1)
+
+    # total tersimpan rusak
+    rencana.total_pengeluaran = 0.0
+    assert rencana.cekKonsistensiTotalPengeluaran() is False
+
+    rencana.hitungUlangTotalPengeluaran()
+    assert rencana.total_pengeluaran == 1000000.0
+    assert rencana.cekKonsistensiTotalPengeluaran() is True
+
+
+def test_tambah_pengeluaran_batch():
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 7),
+        anggaran_jumlah=1000,
+        anggaran_mata_uang="IDR"
+    )
+
+    # item di luar durasi dan item yang membuat total melebihi anggaran dilaporkan per indeks
+    kesalahan = rencana.tambahPengeluaranBatch([(400, date(2024, 12, 2)), (100, date(2024, 12, 9)), (700, date(2024, 12, 3))])
+    assert [indeks for indeks, _ in kesalahan] == [1, 2]
+
+    # item yang ditolak karena tanggalnya tidak ikut dihitung ke total anggaran
+    kesalahan = rencana.tambahPengeluaranBatch([(400, date(2024, 12, 2)), (100, date(2024, 12, 9)), (600, date(2024, 12, 3))])
+    assert [indeks for indeks, _ in kesalahan] == [1]
+    assert "durasi" in kesalahan[0][1]
+    assert rencana.getTotalPengeluaran() == 0
+    assert rencana.versi == 1
+
+    assert rencana.tambahPengeluaranBatch([(400, date(2024, 12, 2)), (600, date(2024, 12, 3))]) == []
+    assert rencana.getTotalPengeluaran() == 1000
+    assert rencana.getJumlahPengeluaran() == 2
+    assert rencana.versi == 2
+
+
+def test_aktivitas_tetap_terurut_dan_cek_tetangga():
+    hari = HariPerjalanan(tanggal=date(2024, 12, 3))
+    for jam in (14, 9, 11, 7):
+        hari.tambahAktivitas(Aktivitas(waktuMulai=time(jam), waktuSelesai=time(jam + 1), deskripsi=f"Jam {jam}", lokasi={}))
+
+    assert [a.waktuMulai.hour for a in hari.aktivitasList] == [7, 9, 11, 14]
+
+    # bertabrakan dengan aktivitas sebelum dan sesudah posisi sisipan
+    with pytest.raises(AktivitasKonflikException, match="Jam 9"):
+        hari.tambahAktivitas(Aktivitas(waktuMulai=time(9, 30), waktuSelesai=time(10, 30), deskripsi="Baru", lokasi={}))
+    with pytest.raises(AktivitasKonflikException, match="Jam 11"):
+        hari.tambahAktivitas(Aktivitas(waktuMulai=time(10, 30), waktuSelesai=time(11, 30), deskripsi="Baru", lokasi={}))
+    with pytest.raises(AktivitasKonflikException, match="Jam 9"):
+        hari.tambahAktivitas(Aktivitas(waktuMulai=time(8, 30), waktuSelesai=time(13), deskripsi="Baru", lokasi={}))
+
+    # berbatasan tepat tidak dianggap konflik
+    hari.tambahAktivitas(Aktivitas(waktuMulai=time(10), waktuSelesai=time(11), deskripsi="Baru", lokasi={}))
+    assert [a.waktuMulai.hour for a in hari.aktivitasList] == [7, 9, 10, 11, 14]
+
+# test aktivitas tunggal dengan waktu mulai melebihi waktu selesai ditolak seperti pada batch
+def test_tambah_aktivitas_waktu_terbalik():
+    hari = HariPerjalanan(tanggal=date(2024, 12, 3))
+    hari.tambahAktivitas(Aktivitas(waktuMulai=time(9), waktuSelesai=time(10), deskripsi="Lama", lokasi={}))
+    terbalik = Aktivitas(waktuMulai=time(17), waktuSelesai=time(16), deskripsi="Terbalik", lokasi={})
+
+    with pytest.raises(ValueError, match="melebihi waktu selesai"):
+        hari.tambahAktivitas(terbalik)
+    with pytest.raises(ValueError, match="melebihi waktu selesai"):
+        hari.cekKonflikAktivitas(terbalik, [])
+    assert len(hari.aktivitasList) == 1
+
+def test_aktivitas_bisect_sama_dengan_cek_seluruh_list():
+    import random
+    acak = random.Random(0)
+
+    for _ in range(20):
+        hari = HariPerjalanan(tanggal=date(2024, 12, 3))
+        semua = []
+        for _ in range(60):
+            mulai = acak.randrange(0, 24 * 60 - 1)
+            selesai = acak.randrange(mulai, min(mulai + 90, 24 * 60 - 1) + 1)
+            baru = Aktivitas(waktuMulai=time(mulai // 60, mulai % 60), waktuSelesai=time(selesai // 60, selesai % 60), deskripsi="X", lokasi={})
+
+            konflik = any(a.validasi_konflik(baru) for a in semua)
+            if konflik:
+                with pytest.raises(AktivitasKonflikException):
+                    hari.tambahAktivitas(baru)
+            else:
+                hari.tambahAktivitas(baru)
+                semua.append(baru)
+
+        assert sorted(semua, key=lambda a: (a.waktuMulai, a.waktuSelesai)) == hari.aktivitasList
+
+def test_validasi_aktivitas_batch():
+    hari = HariPerjalanan(tanggal=date(2024, 12, 3))
+    hari.tambahAktivitas(Aktivitas(waktuMulai=time(9), waktuSelesai=time(10), deskripsi="Lama", lokasi={}))
+
+    kesalahan = hari.validasiAktivitasBatch([
+        (0, time(13), time(14), "Makan siang"),
+        (1, time(9, 30), time(11), "Bentrok lama"),
+        (2, time(13, 30), time(15), "Bentrok baru"),
+        (3, time(17), time(16), "Terbalik"),
+        (4, time(10), time(11), "Berbatasan"),
+    ])
+
+    assert [indeks for indeks, _ in kesalahan] == [1, 2, 3]
+    assert "Lama" in kesalahan[0][1]
+    assert "Makan siang" in kesalahan[1][1]
+    assert "melebihi" in kesalahan[2][1]
+    # validasi tidak mengubah aktivitasList
+    assert len(hari.aktivitasList) == 1
+
+def test_validasi_aktivitas_batch_sama_dengan_tambah_berurutan():
+    import random
+    acak = random.Random(1)
+
+    def ke_waktu(menit):
+        return time(menit // 60, menit % 60)
+
+    for _ in range(20):
+        hari = HariPerjalanan(tanggal=date(2024, 12, 3))
+        for _ in range(30):
+            mulai = acak.randrange(0, 24 * 60 - 1)
+            try:
+                hari.tambahAktivitas(Aktivitas(waktuMulai=ke_waktu(mulai), waktuSelesai=ke_waktu(min(mulai + 30, 24 * 60 - 1)), deskripsi="Lama", lokasi={}))
+            except AktivitasKonflikException:
+                pass
+
+        item = []
+        for indeks in range(40):
+            mulai = acak.randrange(0, 24 * 60 - 1)
+            selesai = acak.randrange(mulai, min(mulai + 60, 24 * 60 - 1) + 1)
+            item.append((indeks, ke_waktu(mulai), ke_waktu(selesai), f"Baru {indeks}"))
+
+        ditolak = {indeks for indeks, _ in hari.validasiAktivitasBatch(item)}
+
+        # pembanding: tambahkan satu per satu dalam urutan waktu
+        harapan = set()
+        for indeks, mulai, selesai, deskripsi in sorted(item, key=lambda i: (i[1], i[2], i[0])):
+            try:
+                hari.tambahAktivitas(Aktivitas(waktuMulai=mulai, waktuSelesai=selesai, deskripsi=deskripsi, lokasi={}))
+            except AktivitasKonflikException:
+                harapan.add(indeks)
+
+        assert ditolak == harapan
+
+def test_index_koleksi_tetap_sinkron():
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 7),
+        anggaran_jumlah=5000000.0,
+        anggaran_mata_uang="IDR"
+    )
+    for hari_ke in range(1, 8):
+        rencana.tambahHariPerjalanan(date(2024, 12, hari_ke))
+    pengeluaran = [Pengeluaran(deskripsi=f"Biaya {i}", biaya_jumlah=100.0, tanggalPengeluaran=date(2024, 12, 2)) for i in range(5)]
+    for p in pengeluaran:
+        rencana.tambahPengeluaran(p)
+
+    assert rencana.getHariPerjalanan(date(2024, 12, 3)).tanggal == date(2024, 12, 3)
+    assert rencana.getPengeluaran(pengeluaran[2].idPengeluaran) is pengeluaran[2]
+
+    rencana.hapusHariPerjalanan(date(2024, 12, 3))
+    rencana.hapusPengeluaran(pengeluaran[2].idPengeluaran)
+    assert rencana.getHariPerjalanan(date(2024, 12, 3)) is None
+    assert rencana.getPengeluaran(pengeluaran[2].idPengeluaran) is None
+
+    # tanggal yang sudah dihapus dapat ditambahkan kembali, tanggal lain tetap terdeteksi duplikat
+    rencana.tambahHariPerjalanan(date(2024, 12, 3))
+    with pytest.raises(ValueError):
+        rencana.tambahHariPerjalanan(date(2024, 12, 4))
+
+    # perubahan list secara langsung tetap tercermin pada index
+    hari = rencana.hariPerjalananList.pop(0)
+    assert rencana.getHariPerjalanan(hari.tanggal) is None
+    del rencana.hariPerjalananList[0]
+    assert len(rencana.hariPerjalananList) == 5
+    assert all(rencana.getHariPerjalanan(h.tanggal) is h for h in rencana.hariPerjalananList)
+
+# memastikan index dan rentang koleksi sama dengan hasil yang dibangun ulang dari isi list
+def cek_koleksi(koleksi):
+    assert all(koleksi.cari(item.kode) is item for item in koleksi)
+    assert len(koleksi._ambilIndeks()) == len(koleksi)
+    assert koleksi.rentang() == ((min(i.tanggal for i in koleksi), max(i.tanggal for i in koleksi)) if koleksi else None)
+
+def test_koleksi_terindeks_setiap_perubahan_list():
+    from types import SimpleNamespace
+    from models.koleksi import KoleksiTerindeks, koleksi_terindeks
+
+    item = [SimpleNamespace(kode=f"k{hari}", tanggal=date(2024, 12, hari)) for hari in range(1, 11)]
+    koleksi = koleksi_terindeks("kode", "tanggal")(item[2:5])
+    assert isinstance(koleksi, KoleksiTerindeks)
+    cek_koleksi(koleksi)
+
+    # penambahan memperluas rentang yang sudah dibangun tanpa membangun ulang
+    koleksi.append(item[8])
+    koleksi.insert(0, item[0])
+    assert koleksi._rentang == (date(2024, 12, 1), date(2024, 12, 9))
+    cek_koleksi(koleksi)
+    koleksi.extend([item[5], item[9]])
+    cek_koleksi(koleksi)
+    koleksi += [item[1]]
+    assert isinstance(koleksi, KoleksiTerindeks)
+    cek_koleksi(koleksi)
+
+    # melepas item di tengah rentang mempertahankan rentang, melepas batasnya membangun ulang
+    assert koleksi.pop(koleksi.index(item[3])) is item[3]
+    assert koleksi.cari("k4") is None
+    cek_koleksi(koleksi)
+    koleksi.pop()
+    assert koleksi.rentang() == (date(2024, 12, 1), date(2024, 12, 10))
+    koleksi.remove(item[0])
+    assert koleksi.cari("k1") is None
+    cek_koleksi(koleksi)
+    koleksi.remove(item[9])
+    cek_koleksi(koleksi)
+    assert koleksi.rentang() == (date(2024, 12, 3), date(2024, 12, 9))
+
+    # penggantian dan penghapusan lewat posisi (termasuk slice) membangun ulang index dan rentang
+    koleksi[0] = item[6]
+    assert koleksi.cari("k3") is None and koleksi.cari("k7") is item[6]
+    cek_koleksi(koleksi)
+    koleksi[1:3] = [item[0], item[9]]
+    cek_koleksi(koleksi)
+    del koleksi[koleksi.index(item[0])]
+    assert koleksi.cari("k1") is None
+    cek_koleksi(koleksi)
+    del koleksi[:2]
+    cek_koleksi(koleksi)
+
+    koleksi.clear()
+    assert koleksi.cari("k9") is None
+    cek_koleksi(koleksi)
+    koleksi.append(item[4])
+    assert koleksi.rentang() == (date(2024, 12, 5), date(2024, 12, 5))
+    cek_koleksi(koleksi)
+
+def test_set_durasi_memakai_rentang_tanggal():
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 31),
+        anggaran_jumlah=5000000.0,
+        anggaran_mata_uang="IDR"
+    )
+    for hari_ke in (3, 10, 20):
+        rencana.tambahHariPerjalanan(date(2024, 12, hari_ke))
+    rencana.tambahPengeluaran(Pengeluaran(deskripsi="Hotel", biaya_jumlah=100.0, tanggalPengeluaran=date(2024, 12, 25)))
+
+    assert rencana.hariPerjalananList.rentang() == (date(2024, 12, 3), date(2024, 12, 20))
+    assert rencana.pengeluaranList.rentang() == (date(2024, 12, 25), date(2024, 12, 25))
+
+    with pytest.raises(TanggalDiLuarDurasiException, match="hari perjalanan"):
+        rencana.setDurasi(date(2024, 12, 5), date(2024, 12, 31))
+    with pytest.raises(TanggalDiLuarDurasiException, match="pengeluaran"):
+        rencana.setDurasi(date(2024, 12, 1), date(2024, 12, 20))
+
+    # menghapus hari terawal menggeser rentang sehingga durasi dapat dipersempit
+    rencana.hapusHariPerjalanan(date(2024, 12, 3))
+    assert rencana.hariPerjalananList.rentang() == (date(2024, 12, 10), date(2024, 12, 20))
+    rencana.setDurasi(date(2024, 12, 10), date(2024, 12, 25))
+    assert (rencana.durasi_mulai, rencana.durasi_selesai) == (date(2024, 12, 10), date(2024, 12, 25))
+
+
+def test_naikkan_versi_mencatat_waktu_perubahan():
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 7),
+        anggaran_jumlah=1000,
+        anggaran_mata_uang="IDR"
+    )
+    dibuat = rencana.diperbarui_pada
+    assert dibuat.tzinfo is None
+
+    rencana.setAnggaran(2000)
+    assert rencana.versi == 2
+    assert rencana.diperbarui_pada >= dibuat
@@ -0,0 +1,142 @@
+# skrip untuk test ekspor NDJSON rencana perjalanan
+import io
+import json
+import sys
+from datetime import date, datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlmodel import Session
+
+import ekspor
+from models.aggregate_root import RencanaPerjalanan
+from security.security import create_access_token
+from ekspor import ekspor_ke_file, iter_rencana_ndjson
+
+LOKASI = {"namaLokasi": "Amed", "alamat": "Karangasem, Bali", "latitude": -8.34, "longitude": 115.65}
+
+# membuat rencana dengan satu hari berisi aktivitas dan satu pengeluaran, mengembalikan id
+def buat_rencana_lengkap(client, sample_rencana_data, headers, nama="Liburan ke Bali"):
+    rencana_id = client.post("/api/perencanaan/", json={**sample_rencana_data, "nama": nama}, headers=headers).json()["id"]
+    url = f"/api/perencanaan/{rencana_id}"
+    client.post(f"{url}/hari", json={"tanggal": "2024-12-02"}, headers=headers)
+    client.post(
+        f"{url}/hari/2024-12-02/aktivitas",
+        json={"waktuMulai": "09:00:00", "waktuSelesai": "10:00:00", "deskripsi": "Snorkeling", "lokasi": LOKASI},
+        headers=headers,
+    )
+    client.post(
+        f"{url}/pengeluaran",
+        json={"deskripsi": "Tiket", "biaya": {"jumlah": 150000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"},
+        headers=headers,
+    )
+    return rencana_id
+
+# test ekspor NDJSON berisi rencana milik user beserta seluruh koleksi anaknya
+def test_ekspor_rencana_ndjson(client, sample_rencana_data, auth_headers):
+    rencana_id = buat_rencana_lengkap(client, sample_rencana_data, auth_headers)
+    headers_alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    buat_rencana_lengkap(client, sample_rencana_data, headers_alice, nama="Rencana Alice")
+
+    response = client.get("/api/ekspor/rencana", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "X-Waktu-Ekspor" in response.headers
+
+    baris = [json.loads(b) for b in response.text.splitlines()]
+    assert len(baris) == 1
+    rencana = baris[0]
+    assert rencana["id"] == rencana_id
+    assert rencana["pemilik"] == "johndoe"
+    assert rencana["versi"] == 4
+    assert rencana["hariPerjalananList"][0]["aktivitasList"][0]["lokasi"] == LOKASI
+    assert rencana["pengeluaranList"][0]["biaya_jumlah"] == 150000.0
+
+    # bentuk baris sama dengan response GET aggregate untuk kolom yang dimiliki keduanya
+    aggregate = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers).json()
+    assert {kunci: rencana[kunci] for kunci in aggregate} == aggregate
+
+# test ekspor inkremental berisi rencana yang berubah sejak cursor ekspor sebelumnya
+def test_ekspor_inkremental(client, session, sample_rencana_data, auth_headers, monkeypatch):
+    # belum ada rencana yang dialirkan sehingga belum ada cursor
+    assert "X-Waktu-Ekspor" not in client.get("/api/ekspor/rencana", headers=auth_headers).headers
+
+    lama = buat_rencana_lengkap(client, sample_rencana_data, auth_headers, nama="Lama")
+    baru = buat_rencana_lengkap(client, sample_rencana_data, auth_headers, nama="Baru")
+
+    # cursor = diperbarui_pada terbesar yang dialirkan dikurangi jendela tumpang tindih
+    response = client.get("/api/ekspor/rencana", headers=auth_headers)
+    terakhir = datetime.fromisoformat(json.loads(response.text.splitlines()[-1])["diperbarui_pada"])
+    sejak = response.headers["X-Waktu-Ekspor"]
+    assert datetime.fromisoformat(sejak) == terakhir - timedelta(seconds=ekspor.EKSPOR_OVERLAP_DETIK)
+
+    # penulisan yang dicatat sebelum ekspor tetapi baru di-commit setelahnya tetap masuk ekspor berikutnya,
+    # sedangkan rencana dalam jendela tumpang tindih terekspor ulang (konsumen menghapus duplikat berdasarkan id)
+    telat = buat_rencana_lengkap(client, sample_rencana_data, auth_headers, nama="Telat")
+    session.execute(update(RencanaPerjalanan).where(RencanaPerjalanan.id == UUID(telat)).values(diperbarui_pada=terakhir - timedelta(seconds=1)))
+    session.commit()
+    response = client.get("/api/ekspor/rencana", params={"diperbarui_sejak": sejak}, headers=auth_headers)
+    assert [json.loads(b)["id"] for b in response.text.splitlines()] == [telat, lama, baru]
+
+    # tanpa tumpang tindih hanya rencana pada cursor dan yang berubah setelahnya yang diekspor
+    monkeypatch.setattr(ekspor, "EKSPOR_OVERLAP_DETIK", 0)
+    sejak = client.get("/api/ekspor/rencana", headers=auth_headers).headers["X-Waktu-Ekspor"]
+    client.put(f"/api/perencanaan/{lama}/anggaran", json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}}, headers=auth_headers)
+    response = client.get("/api/ekspor/rencana", params={"diperbarui_sejak": sejak}, headers=auth_headers)
+    assert [json.loads(b)["id"] for b in response.text.splitlines()] == [baru, lama]
+
+    # timestamp dengan zona waktu dikonversi ke UTC
+    sejak_wib = (datetime.fromisoformat(sejak) + timedelta(hours=7)).isoformat() + "+07:00"
+    response = client.get("/api/ekspor/rencana", params={"diperbarui_sejak": sejak_wib}, headers=auth_headers)
+    assert [json.loads(b)["id"] for b in response.text.splitlines()] == [baru, lama]
+    assert telat not in response.text
+
+# test koleksi anak tetap terpasang pada rencana yang benar saat ekspor dibagi beberapa batch
+def test_ekspor_per_batch(client, session, sample_rencana_data, auth_headers):
+    rencana_ids = {buat_rencana_lengkap(client, sample_rencana_data, auth_headers, nama=f"Rencana {i}") for i in range(5)}
+
+    berkas = io.BytesIO()
+    assert ekspor_ke_file(session, berkas, ukuran_batch=2) == 5
+    baris = [json.loads(b) for b in berkas.getvalue().splitlines()]
+    assert {b["id"] for b in baris} == rencana_ids
+    for rencana in baris:
+        assert [p["rencana_id"] for p in rencana["pengeluaranList"]] == [rencana["id"]]
+        assert [h["rencana_id"] for h in rencana["hariPerjalananList"]] == [rencana["id"]]
+        assert len(rencana["hariPerjalananList"][0]["aktivitasList"]) == 1
+
+    assert len(list(iter_rencana_ndjson(session, pemilik="alice"))) == 0
+
+# menjalankan CLI ekspor dengan argumen baris perintah, mengembalikan (stdout, stderr)
+def jalankan_ekspor(monkeypatch, capsys, *argumen):
+    monkeypatch.setattr(sys, "argv", ["ekspor.py", *map(str, argumen)])
+    ekspor.main()
+    return capsys.readouterr()
+
+# test CLI ekspor menulis file NDJSON dan mencetak cursor untuk ekspor inkremental berikutnya
+def test_cli_ekspor(engine_file, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ekspor, "engine", engine_file)
+    with Session(engine_file) as session:
+        for nama, pemilik in (("Bali", "johndoe"), ("Lombok", "johndoe"), ("Flores", "alice")):
+            session.add(RencanaPerjalanan(
+                nama=nama, pemilik=pemilik, durasi_mulai=date(2024, 12, 1), durasi_selesai=date(2024, 12, 5), anggaran_jumlah=1000000.0
+            ))
+        session.commit()
+
+    keluaran = tmp_path / "rencana.ndjson"
+    stderr = jalankan_ekspor(monkeypatch, capsys, "--output", keluaran, "--batch", "2").err
+    baris = [json.loads(b) for b in keluaran.read_bytes().splitlines()]
+    assert [b["nama"] for b in baris] == ["Bali", "Lombok", "Flores"]
+    assert "3 rencana diekspor" in stderr
+    sejak = stderr.split("ekspor berikutnya: --sejak ")[1].strip()
+    assert datetime.fromisoformat(sejak) == datetime.fromisoformat(baris[-1]["diperbarui_pada"]) - timedelta(seconds=ekspor.EKSPOR_OVERLAP_DETIK)
+
+    # ekspor inkremental milik satu pemilik ke stdout
+    hasil = jalankan_ekspor(monkeypatch, capsys, "--sejak", sejak, "--pemilik", "johndoe")
+    assert [json.loads(b)["nama"] for b in hasil.out.splitlines()] == ["Bali", "Lombok"]
+    assert "2 rencana diekspor" in hasil.err
+
+    # tanpa rencana yang diekspor tidak ada cursor baru
+    stderr = jalankan_ekspor(monkeypatch, capsys, "--output", keluaran, "--pemilik", "bukan_siapa_siapa").err
+    assert "0 rencana diekspor" in stderr
+    assert "ekspor berikutnya" not in stderr
+    assert keluaran.read_bytes() == b""
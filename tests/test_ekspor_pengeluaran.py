@@ -0,0 +1,135 @@
+# skrip untuk test ekspor kolumnar pengeluaran
+import csv
+import io
+import sys
+from datetime import date
+
+import pytest
+from sqlmodel import Session
+
+import ekspor_pengeluaran
+from ekspor_pengeluaran import ekspor_pengeluaran_ke_file
+from models.aggregate_root import RencanaPerjalanan
+from models.entity import Pengeluaran
+from security.security import create_access_token
+from tests.test_ekspor import buat_rencana_lengkap
+
+# membuat dua rencana milik johndoe (total 4 pengeluaran) dan satu rencana milik alice
+def buat_data_pengeluaran(client, sample_rencana_data, auth_headers):
+    rencana_ids = [buat_rencana_lengkap(client, sample_rencana_data, auth_headers, nama=f"Rencana {i}") for i in range(2)]
+    client.post(
+        f"/api/perencanaan/{rencana_ids[1]}/pengeluaran/batch",
+        json=[{"deskripsi": f"Makan, hari {i}", "biaya": {"jumlah": 50000.0 * i, "mata_uang": "IDR"}, "tanggalPengeluaran": f"2024-12-0{i}"} for i in (1, 3)],
+        headers=auth_headers,
+    )
+    headers_alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    buat_rencana_lengkap(client, sample_rencana_data, headers_alice, nama="Rencana Alice")
+    return rencana_ids
+
+# test ekspor csv berisi pengeluaran milik user dengan filter tanggal
+def test_ekspor_pengeluaran_csv(client, sample_rencana_data, auth_headers):
+    rencana_ids = buat_data_pengeluaran(client, sample_rencana_data, auth_headers)
+
+    response = client.get("/api/ekspor/pengeluaran", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="pengeluaran.csv"'
+
+    baris = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(baris[0]) == ["idPengeluaran", "rencana_id", "tanggalPengeluaran", "biaya_jumlah", "biaya_mata_uang", "deskripsi"]
+    assert len(baris) == 4
+    assert {b["rencana_id"] for b in baris} == set(rencana_ids)
+    makan = next(b for b in baris if b["deskripsi"] == "Makan, hari 3")
+    assert makan == {**makan, "rencana_id": rencana_ids[1], "tanggalPengeluaran": "2024-12-03", "biaya_jumlah": "150000.0", "biaya_mata_uang": "IDR"}
+
+    response = client.get("/api/ekspor/pengeluaran", params={"tanggal_dari": "2024-12-02", "tanggal_sampai": "2024-12-02"}, headers=auth_headers)
+    assert [b["deskripsi"] for b in csv.DictReader(io.StringIO(response.text))] == ["Tiket", "Tiket"]
+
+# test format kolumnar ditolak bila pyarrow tidak terpasang
+def test_ekspor_pengeluaran_tanpa_pyarrow(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ekspor_pengeluaran, "pyarrow", None)
+    assert client.get("/api/ekspor/pengeluaran", params={"format": "parquet"}, headers=auth_headers).status_code == 400
+    assert client.get("/api/ekspor/pengeluaran", params={"format": "xlsx"}, headers=auth_headers).status_code == 422
+    with pytest.raises(ValueError):
+        ekspor_pengeluaran_ke_file(None, io.BytesIO(), format="arrow")
+
+# test parquet dan arrow berisi baris yang sama dengan csv, satu row group / record batch per batch cursor
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_ekspor_pengeluaran_kolumnar(client, session, sample_rencana_data, auth_headers, format):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    buat_data_pengeluaran(client, sample_rencana_data, auth_headers)
+    csv_baris = list(csv.DictReader(io.StringIO(client.get("/api/ekspor/pengeluaran", headers=auth_headers).text)))
+
+    response = client.get("/api/ekspor/pengeluaran", params={"format": format}, headers=auth_headers)
+    assert response.status_code == 200
+    if format == "parquet":
+        tabel = pyarrow.parquet.read_table(pyarrow.BufferReader(response.content))
+    else:
+        tabel = pyarrow.ipc.open_stream(response.content).read_all()
+    assert tabel.schema.field("tanggalPengeluaran").type == pyarrow.date32()
+    assert tabel.schema.field("biaya_jumlah").type == pyarrow.float64()
+    assert tabel.column("idPengeluaran").to_pylist() == [b["idPengeluaran"] for b in csv_baris]
+    assert tabel.column("biaya_jumlah").to_pylist() == [float(b["biaya_jumlah"]) for b in csv_baris]
+
+    # ekspor seluruh pemilik lewat CLI/fungsi dengan batch kecil
+    berkas = io.BytesIO()
+    assert ekspor_pengeluaran_ke_file(session, berkas, format=format, ukuran_batch=2) == 5
+    if format == "parquet":
+        assert pyarrow.parquet.ParquetFile(pyarrow.BufferReader(berkas.getvalue())).metadata.num_row_groups == 3
+    else:
+        assert [len(b) for b in pyarrow.ipc.open_stream(berkas.getvalue())] == [2, 2, 1]
+
+# menjalankan CLI ekspor pengeluaran dengan argumen baris perintah
+def jalankan_ekspor_pengeluaran(monkeypatch, *argumen):
+    monkeypatch.setattr(sys, "argv", ["ekspor_pengeluaran.py", *map(str, argumen)])
+    ekspor_pengeluaran.main()
+
+# mengisi database CLI dengan dua rencana berisi tiga pengeluaran
+def isi_database_cli(engine):
+    with Session(engine) as session:
+        for pemilik, hari in (("johndoe", (1, 2)), ("alice", (3,))):
+            rencana = RencanaPerjalanan(
+                nama=f"Rencana {pemilik}", pemilik=pemilik, durasi_mulai=date(2024, 12, 1), durasi_selesai=date(2024, 12, 5), anggaran_jumlah=1000000.0
+            )
+            for h in hari:
+                rencana.tambahPengeluaran(Pengeluaran(deskripsi=f"Biaya {h}", biaya_jumlah=1000.0 * h, tanggalPengeluaran=date(2024, 12, h)))
+            session.add(rencana)
+        session.commit()
+
+# test CLI ekspor pengeluaran ke file csv dengan filter pemilik dan tanggal
+def test_cli_ekspor_pengeluaran_csv(engine_file, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ekspor_pengeluaran, "engine", engine_file)
+    isi_database_cli(engine_file)
+    keluaran = tmp_path / "pengeluaran.csv"
+
+    jalankan_ekspor_pengeluaran(monkeypatch, "--output", keluaran, "--batch", "2")
+    baris = list(csv.DictReader(io.StringIO(keluaran.read_text())))
+    assert sorted(b["deskripsi"] for b in baris) == ["Biaya 1", "Biaya 2", "Biaya 3"]
+    assert "3 pengeluaran diekspor ke csv" in capsys.readouterr().err
+
+    jalankan_ekspor_pengeluaran(monkeypatch, "--pemilik", "johndoe", "--dari", "2024-12-02", "--sampai", "2024-12-03")
+    hasil = capsys.readouterr()
+    assert [b["deskripsi"] for b in csv.DictReader(io.StringIO(hasil.out))] == ["Biaya 2"]
+    assert "1 pengeluaran diekspor" in hasil.err
+
+# test CLI menolak format kolumnar tanpa pyarrow dan menulis parquet bila pyarrow tersedia
+def test_cli_ekspor_pengeluaran_kolumnar(engine_file, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ekspor_pengeluaran, "engine", engine_file)
+    isi_database_cli(engine_file)
+    keluaran = tmp_path / "pengeluaran.parquet"
+
+    with monkeypatch.context() as m:
+        m.setattr(ekspor_pengeluaran, "pyarrow", None)
+        with pytest.raises(SystemExit) as keluar:
+            jalankan_ekspor_pengeluaran(monkeypatch, "--format", "parquet", "--output", keluaran)
+        assert keluar.value.code == 2
+        assert "membutuhkan pyarrow" in capsys.readouterr().err
+    assert not keluaran.exists()
+
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    jalankan_ekspor_pengeluaran(monkeypatch, "--format", "parquet", "--output", keluaran)
+    assert pyarrow.parquet.read_table(keluaran).num_rows == 3
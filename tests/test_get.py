@@ -1,6 +1,9 @@
 # skrip untuk test GET API endpoints
+import base64
+import json
+
 import pytest
-from uuid import uuid4
+from uuid import uuid4, UUID
 
 # test mendapatkan RencanaPerjalanan - sukses
 def test_get_rencana_perjalanan_success(client, sample_rencana_data, auth_headers):
@@ -42,4 +45,262 @@ def test_get_rencana_perjalanan_unauthorized(client, sample_rencana_data, auth_h
 # test mendapatkan RencanaPerjalanan dengan ID invalid
 def test_get_rencana_perjalanan_invalid_id(client, auth_headers):
     response = client.get("/api/perencanaan/invalid-uuid", headers=auth_headers)
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+# test mendapatkan RencanaPerjalanan lengkap dengan hari, aktivitas dan pengeluaran
+def test_get_rencana_perjalanan_aggregate_lengkap(client, session, sample_rencana_data, auth_headers):
+    from datetime import date, time
+    from models import RencanaPerjalanan, Aktivitas, Pengeluaran
+
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    rencana = session.get(RencanaPerjalanan, UUID(rencana_id))
+    hari = rencana.tambahHariPerjalanan(date(2024, 12, 2))
+    hari.tambahAktivitas(Aktivitas(waktuMulai=time(9), waktuSelesai=time(10), deskripsi="Snorkeling", lokasi={"namaLokasi": "Amed"}))
+    rencana.tambahPengeluaran(Pengeluaran(deskripsi="Hotel", biaya_jumlah=1000.0, tanggalPengeluaran=date(2024, 12, 2)))
+    session.commit()
+
+    response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hariPerjalananList"][0]["tanggal"] == "2024-12-02"
+    assert data["hariPerjalananList"][0]["aktivitasList"][0]["deskripsi"] == "Snorkeling"
+    assert data["pengeluaranList"][0]["biaya_jumlah"] == 1000.0
+
+# test jumlah query GET RencanaPerjalanan tidak bergantung pada jumlah hari
+def test_get_rencana_perjalanan_jumlah_query_tetap(client, session, executed_queries, auth_headers):
+    from datetime import date, time, timedelta
+    from models import RencanaPerjalanan, Aktivitas, Pengeluaran
+
+    data = {
+        "nama": "Keliling Eropa",
+        "durasi": {"tanggalMulai": "2024-06-01", "tanggalSelesai": "2024-06-30"},
+        "anggaran": {"jumlah": 1e9, "mata_uang": "IDR"}
+    }
+    rencana_id = client.post("/api/perencanaan/", json=data, headers=auth_headers).json()["id"]
+    rencana = session.get(RencanaPerjalanan, UUID(rencana_id))
+    for i in range(30):
+        hari = rencana.tambahHariPerjalanan(date(2024, 6, 1) + timedelta(days=i))
+        hari.tambahAktivitas(Aktivitas(waktuMulai=time(9), waktuSelesai=time(10), deskripsi="Tur", lokasi={}))
+        rencana.tambahPengeluaran(Pengeluaran(deskripsi="Makan", biaya_jumlah=100.0, tanggalPengeluaran=hari.tanggal))
+    session.commit()
+    session.expunge_all()
+
+    executed_queries.clear()
+    response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["hariPerjalananList"]) == 30
+    # rencana + hari (join), aktivitas, pengeluaran
+    assert len(executed_queries) == 3
+
+# test daftar RencanaPerjalanan dengan keyset pagination - semua halaman lengkap tanpa duplikat
+def test_list_rencana_perjalanan_keyset(client, auth_headers):
+    for i in range(7):
+        data = {
+            "nama": f"Trip {i}",
+            "durasi": {"tanggalMulai": f"2024-12-{(i % 3) + 1:02d}", "tanggalSelesai": "2024-12-20"},
+            "anggaran": {"jumlah": 1000000.0, "mata_uang": "IDR"}
+        }
+        client.post("/api/perencanaan/", json=data, headers=auth_headers)
+
+    halaman, cursor = [], None
+    while True:
+        params = {"batas": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/perencanaan/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        hasil = response.json()
+        halaman.append(hasil["data"])
+        cursor = hasil["cursor_berikutnya"]
+        if cursor is None:
+            break
+
+    assert [len(h) for h in halaman] == [3, 3, 1]
+    semua = [r for h in halaman for r in h]
+    assert len({r["id"] for r in semua}) == 7
+    assert [(r["durasi_mulai"], r["id"]) for r in semua] == sorted((r["durasi_mulai"], r["id"]) for r in semua)
+    # ringkasan tanpa koleksi anak
+    assert "hariPerjalananList" not in semua[0]
+    assert semua[0]["total_pengeluaran"] == 0.0
+
+# test daftar RencanaPerjalanan hanya berisi milik user dan mendukung filter tanggal serta awalan nama
+def test_list_rencana_perjalanan_pemilik_dan_filter(client, auth_headers):
+    from security import create_access_token
+    headers_alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+
+    rencana = [
+        ("Bali Santai", "2024-12-01", "2024-12-05", auth_headers),
+        ("Bali Diving", "2025-01-10", "2025-01-15", auth_headers),
+        ("Lombok 100%", "2024-12-20", "2024-12-25", auth_headers),
+        ("Bali Alice", "2024-12-01", "2024-12-05", headers_alice),
+    ]
+    for nama, mulai, selesai, headers in rencana:
+        data = {"nama": nama, "durasi": {"tanggalMulai": mulai, "tanggalSelesai": selesai}, "anggaran": {"jumlah": 1000.0, "mata_uang": "IDR"}}
+        client.post("/api/perencanaan/", json=data, headers=headers)
+
+    def nama_rencana(params, headers=auth_headers):
+        response = client.get("/api/perencanaan/", params=params, headers=headers)
+        assert response.status_code == 200
+        return [r["nama"] for r in response.json()["data"]]
+
+    assert nama_rencana({}) == ["Bali Santai", "Lombok 100%", "Bali Diving"]
+    assert nama_rencana({}, headers_alice) == ["Bali Alice"]
+    assert nama_rencana({"nama": "Bali"}) == ["Bali Santai", "Bali Diving"]
+    assert nama_rencana({"nama": "Lombok 100%"}) == ["Lombok 100%"]
+    assert nama_rencana({"nama": "Lombok 1000"}) == []
+    # rencana yang durasinya beririsan dengan rentang filter
+    assert nama_rencana({"tanggal_dari": "2024-12-04", "tanggal_sampai": "2024-12-21"}) == ["Bali Santai", "Lombok 100%"]
+    assert nama_rencana({"tanggal_dari": "2025-01-01"}) == ["Bali Diving"]
+
+# test daftar RencanaPerjalanan dengan cursor tidak valid
+def test_list_rencana_perjalanan_cursor_invalid(client, auth_headers):
+    response = client.get("/api/perencanaan/", params={"cursor": "bukan-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+
+    # cursor yang dapat didekode namun bentuknya salah: {}, {"a": 1, "b": 2}, [1, 2], ["2024-12-01"], 5
+    for isi in [{}, {"a": 1, "b": 2}, [1, 2], ["2024-12-01"], 5]:
+        cursor = base64.urlsafe_b64encode(json.dumps(isi).encode()).decode().rstrip("=")
+        response = client.get("/api/perencanaan/", params={"cursor": cursor}, headers=auth_headers)
+        assert response.status_code == 400, isi
+    assert client.get("/api/perencanaan/", params={"cursor": "e30="}, headers=auth_headers).status_code == 400
+
+# mengambil seluruh halaman dari endpoint daftar dengan keyset pagination
+def ambil_semua_halaman(client, url, params, headers):
+    halaman, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200
+        halaman.append(response.json()["data"])
+        cursor = response.json()["cursor_berikutnya"]
+        if cursor is None:
+            return halaman
+
+# test daftar Pengeluaran dengan keyset pagination, urutan turun dan filter tanggal
+def test_list_pengeluaran(client, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    items = [
+        {"deskripsi": f"Struk {i}", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": f"2024-12-0{i % 5 + 1}"}
+        for i in range(12)
+    ]
+    client.post(f"/api/perencanaan/{rencana_id}/pengeluaran/batch", json=items, headers=auth_headers)
+    url = f"/api/perencanaan/{rencana_id}/pengeluaran"
+
+    halaman = ambil_semua_halaman(client, url, {"batas": 5}, auth_headers)
+    assert [len(h) for h in halaman] == [5, 5, 2]
+    semua = [p for h in halaman for p in h]
+    assert len({p["idPengeluaran"] for p in semua}) == 12
+    assert [p["tanggalPengeluaran"] for p in semua] == sorted(p["tanggalPengeluaran"] for p in semua)
+
+    halaman = ambil_semua_halaman(client, url, {"batas": 2, "urutan": "turun", "tanggal_dari": "2024-12-02", "tanggal_sampai": "2024-12-03"}, auth_headers)
+    semua = [p for h in halaman for p in h]
+    assert len(semua) == 5
+    assert [p["tanggalPengeluaran"] for p in semua] == ["2024-12-03"] * 2 + ["2024-12-02"] * 3
+    assert [(p["tanggalPengeluaran"], p["idPengeluaran"]) for p in semua] == sorted(((p["tanggalPengeluaran"], p["idPengeluaran"]) for p in semua), reverse=True)
+
+# test daftar HariPerjalanan dan Aktivitas dengan keyset pagination
+def test_list_hari_dan_aktivitas(client, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    for hari_ke in range(1, 6):
+        client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": f"2024-12-0{hari_ke}"}, headers=auth_headers)
+    lokasi = {"namaLokasi": "Pantai Kuta", "alamat": "Kuta, Bali", "latitude": -8.72, "longitude": 115.17}
+    items = [
+        {"tanggal": "2024-12-02", "waktuMulai": f"{jam:02d}:00:00", "waktuSelesai": f"{jam:02d}:30:00", "deskripsi": f"Jam {jam}", "lokasi": lokasi}
+        for jam in range(8, 15)
+    ]
+    client.post(f"/api/perencanaan/{rencana_id}/aktivitas/batch", json=items, headers=auth_headers)
+
+    halaman = ambil_semua_halaman(client, f"/api/perencanaan/{rencana_id}/hari", {"batas": 2, "urutan": "turun"}, auth_headers)
+    assert [[h["tanggal"] for h in hal] for hal in halaman] == [["2024-12-05", "2024-12-04"], ["2024-12-03", "2024-12-02"], ["2024-12-01"]]
+    assert halaman[1][1]["jumlah_aktivitas"] == 7
+    assert "aktivitasList" not in halaman[1][1]
+
+    url = f"/api/perencanaan/{rencana_id}/hari/2024-12-02/aktivitas"
+    halaman = ambil_semua_halaman(client, url, {"batas": 3}, auth_headers)
+    assert [[a["deskripsi"] for a in hal] for hal in halaman] == [["Jam 8", "Jam 9", "Jam 10"], ["Jam 11", "Jam 12", "Jam 13"], ["Jam 14"]]
+
+    halaman = ambil_semua_halaman(client, url, {"waktu_dari": "10:15:00", "waktu_sampai": "12:00:00"}, auth_headers)
+    assert [a["deskripsi"] for a in halaman[0]] == ["Jam 10", "Jam 11", "Jam 12"]
+
+    assert client.get(f"/api/perencanaan/{rencana_id}/hari/2024-12-07/aktivitas", headers=auth_headers).status_code == 404
+    assert client.get(f"/api/perencanaan/{uuid4()}/pengeluaran", headers=auth_headers).status_code == 404
+
+# test GET aggregate dengan ?fields= dan ?include= - kolom dan koleksi yang tidak diminta tidak di-query
+def test_get_rencana_perjalanan_fields_dan_include(client, session, executed_queries, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-02"}, headers=auth_headers)
+    lokasi = {"namaLokasi": "Pantai Kuta", "alamat": "Kuta, Bali", "latitude": -8.72, "longitude": 115.17}
+    client.post(
+        f"/api/perencanaan/{rencana_id}/hari/2024-12-02/aktivitas",
+        json={"waktuMulai": "09:00:00", "waktuSelesai": "10:00:00", "deskripsi": "Snorkeling", "lokasi": lokasi},
+        headers=auth_headers
+    )
+    client.post(
+        f"/api/perencanaan/{rencana_id}/pengeluaran",
+        json={"deskripsi": "Hotel", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"},
+        headers=auth_headers
+    )
+
+    # header saja: satu SELECT sempit tanpa koleksi
+    session.expunge_all()
+    executed_queries.clear()
+    response = client.get(f"/api/perencanaan/{rencana_id}", params={"fields": "nama,durasi_mulai", "include": ""}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": rencana_id, "nama": sample_rencana_data["nama"], "durasi_mulai": "2024-12-01"}
+    assert response.headers["ETag"].startswith('"4-')
+    assert len(executed_queries) == 1
+    assert "anggaran_jumlah" not in executed_queries[0]
+
+    # hanya hari tanpa aktivitas
+    session.expunge_all()
+    executed_queries.clear()
+    data = client.get(f"/api/perencanaan/{rencana_id}", params={"include": "hari"}, headers=auth_headers).json()
+    assert data["anggaran_jumlah"] == sample_rencana_data["anggaran"]["jumlah"]
+    assert [h["tanggal"] for h in data["hariPerjalananList"]] == ["2024-12-02"]
+    assert "aktivitasList" not in data["hariPerjalananList"][0]
+    assert "pengeluaranList" not in data
+    assert len(executed_queries) == 1
+
+    # aktivitas (termasuk hari) dan pengeluaran
+    data = client.get(f"/api/perencanaan/{rencana_id}", params={"fields": "versi", "include": "aktivitas,pengeluaran"}, headers=auth_headers).json()
+    assert set(data) == {"id", "versi", "hariPerjalananList", "pengeluaranList"}
+    assert data["hariPerjalananList"][0]["aktivitasList"][0]["deskripsi"] == "Snorkeling"
+    assert data["pengeluaranList"][0]["deskripsi"] == "Hotel"
+
+    # nilai yang tidak dikenal
+    assert client.get(f"/api/perencanaan/{rencana_id}", params={"fields": "password"}, headers=auth_headers).status_code == 400
+    assert client.get(f"/api/perencanaan/{rencana_id}", params={"include": "semua"}, headers=auth_headers).status_code == 400
+
+# test conditional GET: 304 bila ETag sama, cukup satu query versi tanpa memuat aggregate
+def test_get_rencana_perjalanan_if_none_match(client, session, executed_queries, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    url = f"/api/perencanaan/{rencana_id}"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    assert etag == '"1"'
+
+    session.expunge_all()
+    executed_queries.clear()
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+    assert len(executed_queries) == 1
+    assert "versi" in executed_queries[0] and "hariperjalanan" not in executed_queries[0]
+
+    # ETag lemah, daftar ETag dan "*" juga cocok
+    assert client.get(url, headers={**auth_headers, "If-None-Match": f'"0", W/{etag}'}).status_code == 304
+    assert client.get(url, headers={**auth_headers, "If-None-Match": "*"}).status_code == 304
+
+    # setelah rencana berubah, response lengkap dengan ETag baru
+    client.post(f"{url}/hari", json={"tanggal": "2024-12-02"}, headers=auth_headers)
+    response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+    assert len(response.json()["hariPerjalananList"]) == 1
+
+    # ETag tampilan sebagian berbeda dari ETag aggregate lengkap, tetapi tetap dapat dipakai untuk If-Match
+    etag_header = client.get(url, params={"fields": "nama", "include": ""}, headers=auth_headers).headers["ETag"]
+    assert etag_header != '"2"'
+    assert client.get(url, params={"fields": "nama", "include": ""}, headers={**auth_headers, "If-None-Match": etag_header}).status_code == 304
+    assert client.get(url, headers={**auth_headers, "If-None-Match": etag_header}).status_code == 200
+    response = client.put(f"{url}/anggaran", json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}}, headers={**auth_headers, "If-Match": etag_header})
+    assert response.status_code == 200
+
+    assert client.get(f"/api/perencanaan/{uuid4()}", headers={**auth_headers, "If-None-Match": etag}).status_code == 404
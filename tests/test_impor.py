@@ -0,0 +1,216 @@
+# skrip untuk test impor NDJSON rencana perjalanan
+import io
+import json
+import sys
+
+import pytest
+from sqlmodel import Session, select
+
+import impor
+import repository
+
+from models.aggregate_root import RencanaPerjalanan
+from security.security import create_access_token
+from impor import PengimporNdjson, impor_ndjson, aiter_baris, baca_checkpoint
+from tests.test_ekspor import buat_rencana_lengkap, LOKASI
+
+# menghapus seluruh id dari baris ekspor agar dapat diimpor sebagai rencana baru pada database yang sama
+def tanpa_id(rencana: dict) -> dict:
+    return {
+        **{k: v for k, v in rencana.items() if k != "id"},
+        "hariPerjalananList": [
+            {"tanggal": h["tanggal"], "aktivitasList": [{k: v for k, v in a.items() if k != "idAktivitas"} for a in h["aktivitasList"]]}
+            for h in rencana["hariPerjalananList"]
+        ],
+        "pengeluaranList": [{k: v for k, v in p.items() if k != "idPengeluaran"} for p in rencana["pengeluaranList"]],
+    }
+
+def rencana_sederhana(nama: str, **kolom) -> dict:
+    return {"nama": nama, "durasi_mulai": "2024-12-01", "durasi_selesai": "2024-12-05", "anggaran_jumlah": 100000.0, **kolom}
+
+def ke_ndjson(*rencana) -> bytes:
+    return b"".join(json.dumps(r).encode() + b"\n" for r in rencana)
+
+# test hasil ekspor diimpor kembali lewat endpoint dengan baris tidak valid dicatat per baris
+def test_impor_rencana_ndjson(client, sample_rencana_data, auth_headers):
+    rencana_id = buat_rencana_lengkap(client, sample_rencana_data, auth_headers)
+    ekspor = json.loads(client.get("/api/ekspor/rencana", headers=auth_headers).text)
+
+    body = ke_ndjson(tanpa_id(ekspor)) + b"\n" + ke_ndjson(
+        rencana_sederhana("Durasi terbalik", durasi_mulai="2024-12-06"),
+        rencana_sederhana("Boros", pengeluaranList=[{"deskripsi": "Hotel", "tanggalPengeluaran": "2024-12-02", "biaya_jumlah": 200000.0}]),
+        rencana_sederhana("Tanpa lokasi", hariPerjalananList=[{"tanggal": "2024-12-02", "aktivitasList": [{"waktuMulai": "09:00:00", "waktuSelesai": "10:00:00", "deskripsi": "Pantai", "lokasi": {"namaLokasi": "Kuta"}}]}]),
+        rencana_sederhana("Bentrok", hariPerjalananList=[{"tanggal": "2024-12-02", "aktivitasList": [
+            {"waktuMulai": "09:00:00", "waktuSelesai": "11:00:00", "deskripsi": "Pantai", "lokasi": LOKASI},
+            {"waktuMulai": "10:00:00", "waktuSelesai": "12:00:00", "deskripsi": "Pura", "lokasi": LOKASI},
+        ]}]),
+    ) + b"{bukan json"
+
+    headers_alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    response = client.post("/api/impor/rencana", content=body, headers={**headers_alice, "Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    laporan = response.json()
+    assert laporan["baris_diproses"] == 7
+    assert (laporan["jumlah_berhasil"], laporan["jumlah_gagal"]) == (1, 5)
+    kesalahan = {k["baris"]: k["pesan"] for k in laporan["kesalahan"]}
+    assert "Tanggal mulai tidak boleh melebihi tanggal selesai" in kesalahan[3]
+    assert "melebihi anggaran" in kesalahan[4]
+    assert "lokasi.alamat" in kesalahan[5]
+    assert "bertabrakan" in kesalahan[6]
+    assert 7 in kesalahan
+
+    # rencana hasil impor dimiliki user yang mengimpor dan isinya sama dengan rencana asal
+    halaman = client.get("/api/perencanaan/", headers=headers_alice).json()["data"]
+    assert len(halaman) == 1
+    asal = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers).json()
+    baru = client.get(f"/api/perencanaan/{halaman[0]['id']}", headers=headers_alice).json()
+    assert baru["versi"] == 1
+    assert baru["hariPerjalananList"][0]["aktivitasList"][0]["lokasi"] == asal["hariPerjalananList"][0]["aktivitasList"][0]["lokasi"]
+    assert [p["biaya_jumlah"] for p in baru["pengeluaranList"]] == [p["biaya_jumlah"] for p in asal["pengeluaranList"]]
+    assert halaman[0]["total_pengeluaran"] == 150000.0
+
+# test rencana yang sudah ada atau id yang berulang ditolak tanpa menggagalkan rencana lain
+def test_impor_menolak_id_yang_sudah_ada(client, session, sample_rencana_data, auth_headers):
+    buat_rencana_lengkap(client, sample_rencana_data, auth_headers)
+    ekspor = json.loads(client.get("/api/ekspor/rencana", headers=auth_headers).text)
+    baru = rencana_sederhana("Baru", id="00000000-0000-0000-0000-000000000001")
+
+    laporan = impor_ndjson(session, io.BytesIO(ke_ndjson(ekspor, baru, baru)))
+    assert (laporan.jumlah_berhasil, laporan.jumlah_gagal) == (1, 2)
+    assert [(k.baris, str(k.id)) for k in laporan.kesalahan] == [
+        (3, "00000000-0000-0000-0000-000000000001"),
+        (1, ekspor["id"]),
+    ]
+
+    # id pengeluaran yang bentrok dengan data lama hanya menggagalkan rencananya sendiri dalam chunk tersebut
+    bentrok = tanpa_id(ekspor)
+    bentrok["pengeluaranList"][0]["idPengeluaran"] = ekspor["pengeluaranList"][0]["idPengeluaran"]
+    laporan = impor_ndjson(session, io.BytesIO(ke_ndjson(rencana_sederhana("Lain"), bentrok)))
+    assert (laporan.jumlah_berhasil, laporan.jumlah_gagal) == (1, 1)
+    assert laporan.kesalahan[0].baris == 2
+    assert session.exec(select(RencanaPerjalanan).where(RencanaPerjalanan.nama == "Lain")).one().pemilik is None
+
+# test impor yang terputus dilanjutkan dari checkpoint tanpa menulis ulang chunk yang sudah di-commit
+def test_impor_dilanjutkan_dari_checkpoint(session):
+    isi = ke_ndjson(*[rencana_sederhana(f"Rencana {i}") for i in range(5)])
+    checkpoint = {}
+
+    def terputus(pengimpor: PengimporNdjson):
+        checkpoint.update(baris=pengimpor.baris_diproses, offset=pengimpor.offset_diproses)
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        impor_ndjson(session, io.BytesIO(isi), ukuran_chunk=2, saat_commit=terputus)
+    assert checkpoint["baris"] == 2
+
+    berkas = io.BytesIO(isi)
+    berkas.seek(checkpoint["offset"])
+    laporan = impor_ndjson(session, berkas, ukuran_chunk=2, baris_awal=checkpoint["baris"], offset_awal=checkpoint["offset"])
+    assert (laporan.baris_diproses, laporan.jumlah_berhasil) == (5, 3)
+    assert sorted(session.exec(select(RencanaPerjalanan.nama)).all()) == [f"Rencana {i}" for i in range(5)]
+
+# test impor yang terputus lalu dikirim ulang dari awal tanpa checkpoint tidak menggandakan rencana tanpa id
+def test_impor_dikirim_ulang_tanpa_duplikat(client, session, auth_headers):
+    isi = ke_ndjson(*[rencana_sederhana(f"Rencana {i}") for i in range(5)], rencana_sederhana("Rencana 0"))
+
+    def terputus(pengimpor: PengimporNdjson):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        impor_ndjson(session, io.BytesIO(isi), pemilik="johndoe", ukuran_chunk=2, saat_commit=terputus)
+    assert len(session.exec(select(RencanaPerjalanan)).all()) == 2
+
+    # client tidak menerima laporan sehingga seluruh body dikirim ulang; baris yang sama di posisi lain tetap rencana tersendiri
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+    laporan = client.post("/api/impor/rencana", content=isi, headers=headers).json()
+    assert (laporan["jumlah_berhasil"], laporan["jumlah_dilewati"], laporan["jumlah_gagal"]) == (4, 2, 0)
+    laporan = client.post("/api/impor/rencana", content=isi, headers=headers).json()
+    assert (laporan["jumlah_berhasil"], laporan["jumlah_dilewati"], laporan["jumlah_gagal"]) == (0, 6, 0)
+    session.expire_all()
+    assert sorted(session.exec(select(RencanaPerjalanan.nama)).all()) == ["Rencana 0", "Rencana 0"] + [f"Rencana {i}" for i in range(1, 5)]
+
+    # pemilik lain yang mengimpor body yang sama mendapat rencananya sendiri
+    headers_alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}", "Content-Type": "application/x-ndjson"}
+    assert client.post("/api/impor/rencana", content=isi, headers=headers_alice).json()["jumlah_berhasil"] == 6
+
+@pytest.mark.asyncio
+async def test_aiter_baris():
+    async def potongan():
+        for data in (b'{"a":', b'1}\n{"b"', b":2}\n\n", b'{"c":3}'):
+            yield data
+
+    assert [baris async for baris in aiter_baris(potongan())] == [b'{"a":1}\n', b'{"b":2}\n', b"\n", b'{"c":3}']
+
+# menjalankan CLI impor dengan argumen baris perintah, mengembalikan exit code
+def jalankan_impor(monkeypatch, *argumen) -> int:
+    monkeypatch.setattr(sys, "argv", ["impor.py", *map(str, argumen)])
+    with pytest.raises(SystemExit) as keluar:
+        impor.main()
+    return keluar.value.code
+
+# test CLI impor yang terhenti di tengah chunk dilanjutkan dari checkpoint tanpa baris ganda atau terlewat
+def test_cli_impor_dilanjutkan_dari_checkpoint(engine_file, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(impor, "engine", engine_file)
+    masukan = tmp_path / "rencana.ndjson"
+    masukan.write_bytes(ke_ndjson(*[rencana_sederhana(f"Rencana {i}") for i in range(9)]))
+    checkpoint = tmp_path / "impor.checkpoint"
+
+    # proses terhenti saat menulis chunk ketiga, setelah 4 baris (dua chunk) di-commit
+    sisipkan_pengeluaran = repository.sisipkan_pengeluaran
+    jumlah_chunk = []
+
+    def terhenti_pada_chunk_ketiga(session, baris):
+        jumlah_chunk.append(1)
+        if len(jumlah_chunk) == 3:
+            raise KeyboardInterrupt
+        sisipkan_pengeluaran(session, baris)
+
+    monkeypatch.setattr(repository, "sisipkan_pengeluaran", terhenti_pada_chunk_ketiga)
+    monkeypatch.setattr(sys, "argv", ["impor.py", str(masukan), "--checkpoint", str(checkpoint), "--chunk", "2", "--pemilik", "alice"])
+    with pytest.raises(KeyboardInterrupt):
+        impor.main()
+    monkeypatch.setattr(repository, "sisipkan_pengeluaran", sisipkan_pengeluaran)
+
+    posisi = baca_checkpoint(str(checkpoint))
+    assert posisi["baris"] == 4
+    assert posisi["offset"] == len(b"".join(masukan.read_bytes().splitlines(keepends=True)[:4]))
+    with Session(engine_file) as session:
+        assert len(session.exec(select(RencanaPerjalanan)).all()) == 4
+
+    assert jalankan_impor(monkeypatch, masukan, "--checkpoint", checkpoint, "--chunk", "2", "--pemilik", "alice") == 0
+    stderr = capsys.readouterr().err
+    assert "dilanjutkan dari baris 5" in stderr
+    assert "5 rencana diimpor, 0 gagal" in stderr
+    with Session(engine_file) as session:
+        rencana = session.exec(select(RencanaPerjalanan)).all()
+    assert sorted(r.nama for r in rencana) == [f"Rencana {i}" for i in range(9)]
+    assert {r.pemilik for r in rencana} == {"alice"}
+
+    # checkpoint sudah di akhir file sehingga menjalankan ulang tidak mengimpor apa pun
+    assert jalankan_impor(monkeypatch, masukan, "--checkpoint", checkpoint) == 0
+    assert "0 rencana diimpor" in capsys.readouterr().err
+    assert baca_checkpoint(str(checkpoint))["baris"] == 9
+
+# test CLI impor menulis kesalahan per baris ke file dan menolak checkpoint milik input lain
+def test_cli_impor_kesalahan_dan_checkpoint_lain(engine_file, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(impor, "engine", engine_file)
+    masukan = tmp_path / "rencana.ndjson"
+    masukan.write_bytes(ke_ndjson(rencana_sederhana("Valid"), rencana_sederhana("Terbalik", durasi_mulai="2024-12-06")) + b"{bukan json\n")
+
+    assert jalankan_impor(monkeypatch, masukan) == 1
+    stderr = capsys.readouterr().err
+    assert "baris 2: " in stderr and "baris 3: " in stderr
+    assert "1 rencana diimpor, 2 gagal" in stderr
+
+    kesalahan = tmp_path / "kesalahan.ndjson"
+    monkeypatch.setattr(impor, "MAKS_KESALAHAN_DICATAT", 1)
+    assert jalankan_impor(monkeypatch, masukan, "--kesalahan", kesalahan) == 1
+    assert [json.loads(b)["baris"] for b in kesalahan.read_bytes().splitlines()] == [2]
+    stderr = capsys.readouterr().err
+    assert "1 rencana dilewati karena sudah diimpor sebelumnya" in stderr
+    assert "hanya 1 kesalahan pertama yang dicatat" in stderr
+
+    checkpoint = tmp_path / "impor.checkpoint"
+    impor.simpan_checkpoint(str(checkpoint), {"input": str(tmp_path / "lain.ndjson"), "baris": 1, "offset": 10})
+    assert jalankan_impor(monkeypatch, masukan, "--checkpoint", checkpoint) == 2
+    assert "milik input lain" in capsys.readouterr().err
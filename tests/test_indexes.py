@@ -0,0 +1,155 @@
+# skrip untuk test index database pada tabel entity
+import time
+import pytest
+from datetime import date, time as waktu, timedelta
+from uuid import uuid4
+from sqlalchemy import inspect, insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+from models import RencanaPerjalanan, HariPerjalanan, Aktivitas, Pengeluaran
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+# menambahkan sejumlah rencana lengkap dengan hari, aktivitas dan pengeluaran secara bulk
+def isi_data(engine, jumlah_rencana, hari_per_rencana=5, aktivitas_per_hari=3, pengeluaran_per_rencana=5):
+    rencana_rows, hari_rows, aktivitas_rows, pengeluaran_rows = [], [], [], []
+    mulai = date(2024, 1, 1)
+    for _ in range(jumlah_rencana):
+        rencana_id = uuid4()
+        rencana_rows.append({"id": rencana_id, "nama": "Trip", "durasi_mulai": mulai,
+                             "durasi_selesai": mulai + timedelta(days=30), "anggaran_jumlah": 1e9,
+                             "anggaran_mata_uang": "IDR"})
+        for h in range(hari_per_rencana):
+            hari_id = uuid4()
+            hari_rows.append({"idHari": hari_id, "tanggal": mulai + timedelta(days=h), "rencana_id": rencana_id})
+            for a in range(aktivitas_per_hari):
+                aktivitas_rows.append({"idAktivitas": uuid4(), "waktuMulai": waktu(8 + a), "waktuSelesai": waktu(9 + a),
+                                       "deskripsi": "Aktivitas", "lokasi": {}, "hari_id": hari_id})
+        for p in range(pengeluaran_per_rencana):
+            pengeluaran_rows.append({"idPengeluaran": uuid4(), "deskripsi": "Biaya", "tanggalPengeluaran": mulai + timedelta(days=p),
+                                     "biaya_jumlah": 1000.0, "biaya_mata_uang": "IDR", "rencana_id": rencana_id})
+
+    with Session(engine) as session:
+        for model, rows in ((RencanaPerjalanan, rencana_rows), (HariPerjalanan, hari_rows),
+                            (Aktivitas, aktivitas_rows), (Pengeluaran, pengeluaran_rows)):
+            if rows:
+                session.execute(insert(model), rows)
+        session.commit()
+    return rencana_rows[-1]["id"]
+
+# waktu tercepat untuk memuat satu aggregate lengkap dengan session baru
+def waktu_muat_aggregate(engine, rencana_id, ulang=20):
+    terbaik = float("inf")
+    for _ in range(ulang):
+        with Session(engine) as session:
+            mulai = time.perf_counter()
+            rencana = session.get(RencanaPerjalanan, rencana_id)
+            for hari in rencana.hariPerjalananList:
+                len(hari.aktivitasList)
+            len(rencana.pengeluaranList)
+            terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik
+
+def test_index_tersedia(engine):
+    inspector = inspect(engine)
+    index_hari = {ix["name"]: ix for ix in inspector.get_indexes("hariperjalanan")}
+    index_aktivitas = {ix["name"]: ix for ix in inspector.get_indexes("aktivitas")}
+    index_pengeluaran = {ix["name"]: ix for ix in inspector.get_indexes("pengeluaran")}
+
+    assert index_hari["ux_hariperjalanan_rencana_id_tanggal"]["column_names"] == ["rencana_id", "tanggal"]
+    assert index_hari["ux_hariperjalanan_rencana_id_tanggal"]["unique"]
+    assert index_aktivitas["ix_aktivitas_hari_id_waktuMulai"]["column_names"] == ["hari_id", "waktuMulai"]
+    assert index_pengeluaran["ix_pengeluaran_rencana_id_tanggalPengeluaran"]["column_names"] == ["rencana_id", "tanggalPengeluaran"]
+
+@pytest.mark.parametrize("tabel, kolom", [
+    ("hariperjalanan", "rencana_id"),
+    ("pengeluaran", "rencana_id"),
+    ("aktivitas", "hari_id"),
+])
+def test_muat_relasi_memakai_index(engine, tabel, kolom):
+    with engine.connect() as conn:
+        plan = conn.execute(text(f"EXPLAIN QUERY PLAN SELECT * FROM {tabel} WHERE {kolom} = :id"), {"id": uuid4().hex}).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert "USING INDEX" in detail
+    assert not detail.startswith("SCAN")
+
+@pytest.mark.parametrize("tabel, kolom", [
+    ("hariperjalanan", "tanggal"),
+    ("pengeluaran", "tanggalPengeluaran"),
+])
+def test_min_max_tanggal_memakai_index(engine, tabel, kolom):
+    with engine.connect() as conn:
+        plan = conn.execute(text(f'EXPLAIN QUERY PLAN SELECT MIN("{kolom}"), MAX("{kolom}") FROM {tabel} WHERE rencana_id = :id'), {"id": uuid4().hex}).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert "COVERING INDEX" in detail
+    assert not detail.startswith("SCAN")
+
+def test_daftar_rencana_keyset_memakai_index(engine):
+    inspector = inspect(engine)
+    index_rencana = {ix["name"]: ix for ix in inspector.get_indexes("rencanaperjalanan")}
+    assert index_rencana["ix_rencanaperjalanan_pemilik_durasi_mulai_id"]["column_names"] == ["pemilik", "durasi_mulai", "id"]
+
+    with engine.connect() as conn:
+        plan = conn.execute(
+            text("EXPLAIN QUERY PLAN SELECT id, nama FROM rencanaperjalanan WHERE pemilik = :pemilik "
+                 "AND (durasi_mulai, id) > (:mulai, :id) ORDER BY durasi_mulai, id LIMIT 21"),
+            {"pemilik": "johndoe", "mulai": "2024-12-01", "id": uuid4().hex}
+        ).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert "ix_rencanaperjalanan_pemilik_durasi_mulai_id" in detail
+    assert "TEMP B-TREE" not in detail
+
+@pytest.mark.parametrize("tabel, kolom_induk, kolom_urutan, index", [
+    ("pengeluaran", "rencana_id", '"tanggalPengeluaran"', "ix_pengeluaran_rencana_id_tanggalPengeluaran"),
+    ("hariperjalanan", "rencana_id", "tanggal", "ux_hariperjalanan_rencana_id_tanggal"),
+    ("aktivitas", "hari_id", '"waktuMulai"', "ix_aktivitas_hari_id_waktuMulai"),
+])
+def test_daftar_anak_keyset_memakai_index(engine, tabel, kolom_induk, kolom_urutan, index):
+    with engine.connect() as conn:
+        plan = conn.execute(
+            text(f"EXPLAIN QUERY PLAN SELECT * FROM {tabel} WHERE {kolom_induk} = :id "
+                 f"AND {kolom_urutan} > :nilai ORDER BY {kolom_urutan} DESC LIMIT 21"),
+            {"id": uuid4().hex, "nilai": "2024-12-01"}
+        ).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert index in detail
+    assert "TEMP B-TREE" not in detail
+
+def test_tanggal_hari_unik_per_rencana(engine):
+    rencana_id = isi_data(engine, 1, hari_per_rencana=1, aktivitas_per_hari=0, pengeluaran_per_rencana=0)
+    with Session(engine) as session:
+        session.add(HariPerjalanan(tanggal=date(2024, 1, 1), rencana_id=rencana_id))
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+# aktivitasList dimuat terurut berdasarkan waktu mulai meskipun disisipkan acak
+def test_aktivitas_dimuat_terurut(engine):
+    rencana_id = isi_data(engine, 1, hari_per_rencana=1, aktivitas_per_hari=0, pengeluaran_per_rencana=0)
+    with Session(engine) as session:
+        hari = session.get(RencanaPerjalanan, rencana_id).hariPerjalananList[0]
+        session.execute(insert(Aktivitas), [
+            {"idAktivitas": uuid4(), "waktuMulai": waktu(jam), "waktuSelesai": waktu(jam, 30), "deskripsi": "A", "lokasi": {}, "hari_id": hari.idHari}
+            for jam in (15, 8, 12, 10)
+        ])
+        session.commit()
+
+    with Session(engine) as session:
+        hari = session.get(RencanaPerjalanan, rencana_id).hariPerjalananList[0]
+        assert [a.waktuMulai.hour for a in hari.aktivitasList] == [8, 10, 12, 15]
+
+def test_waktu_muat_aggregate_tetap_datar(engine):
+    rencana_kecil = isi_data(engine, 100)
+    waktu_kecil = waktu_muat_aggregate(engine, rencana_kecil)
+
+    # tabel anak tumbuh 20 kali lipat
+    rencana_besar = isi_data(engine, 1900)
+    waktu_besar = waktu_muat_aggregate(engine, rencana_besar)
+
+    # tanpa index, waktu muat akan naik sebanding dengan jumlah baris (full table scan)
+    assert waktu_besar < waktu_kecil * 3
@@ -0,0 +1,300 @@
+# skrip untuk test bus invalidasi cache antar worker
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import types
+import pytest
+from uuid import UUID, uuid4
+
+import cache
+from cache import CacheAggregate
+from invalidasi import BusInvalidasi, BusSqlite, BusRedis, buat_bus
+
+# satu "worker": cache sendiri dengan bus sqlite yang membaca file log bersama
+class Worker:
+    def __init__(self, path):
+        self.cache = CacheAggregate(ttl=60, maks_byte=1024 * 1024)
+        self.bus = BusSqlite(str(path), interval=3600)
+        self.bus.mulai(self.cache.invalidasi, self.cache.kosongkan)
+
+    def berhenti(self):
+        self.bus.berhenti()
+
+@pytest.fixture(name="dua_worker")
+def dua_worker_fixture(tmp_path):
+    worker = [Worker(tmp_path / "invalidasi.db"), Worker(tmp_path / "invalidasi.db")]
+    yield worker
+    for w in worker:
+        w.berhenti()
+
+def test_bus_sqlite_menyebarkan_invalidasi(dua_worker):
+    a, b = dua_worker
+    rencana_id = uuid4()
+    a.cache.simpan(rencana_id, 1, b"v1")
+    b.cache.simpan(rencana_id, 1, b"v1")
+
+    a.bus.terbitkan(rencana_id, 2)
+    a.bus.tarik()
+    b.bus.tarik()
+
+    # pesan sendiri diabaikan, worker lain mengeluarkan entri dan menolak versi basi
+    assert a.cache.ambil(rencana_id) == (1, b"v1")
+    assert b.cache.ambil(rencana_id) is None
+    assert not b.cache.simpan(rencana_id, 1, b"v1")
+    assert a.bus.snapshot()["terbit"] == 1
+    assert b.bus.snapshot()["terima"] == 1
+
+def test_bus_sqlite_mengosongkan_cache_bila_pesan_terlewat(dua_worker):
+    a, b = dua_worker
+    rencana_id = uuid4()
+    b.cache.simpan(rencana_id, 1, b"v1")
+
+    # baris dihapus retensi sebelum sempat dibaca worker b
+    a.bus.terbitkan(uuid4(), 2)
+    a.bus.terbitkan(uuid4(), 2)
+    a.bus._koneksi_tulis.execute("DELETE FROM log_invalidasi WHERE seq = (SELECT MIN(seq) FROM log_invalidasi)")
+    b.bus.tarik()
+
+    assert b.cache.ambil(rencana_id) is None
+    assert b.bus.snapshot()["kosongkan"] == 1
+    assert b.bus.snapshot()["terima"] == 1
+
+# test worker yang tertinggal melewati seluruh baris yang sudah dihapus retensi tetap mengosongkan cache sekali
+def test_bus_sqlite_retensi_menghapus_seluruh_log(dua_worker):
+    a, b = dua_worker
+    rencana_id = uuid4()
+    b.cache.simpan(rencana_id, 1, b"v1")
+
+    a.bus.retensi = 0
+    a.bus.terbitkan(uuid4(), 2)
+    a.bus.terbitkan(uuid4(), 2)
+    a.bus.tarik()
+    assert a.bus._koneksi_tulis.execute("SELECT COUNT(*) FROM log_invalidasi").fetchone()[0] == 0
+
+    b.bus.tarik()
+    b.bus.tarik()
+    assert b.cache.ambil(rencana_id) is None
+    assert b.bus.snapshot()["kosongkan"] == 1
+    assert a.bus.snapshot()["kosongkan"] == 0
+
+# menunggu kondisi yang dipenuhi thread penerima bus
+def tunggu(kondisi, batas: float = 5.0):
+    akhir = time.monotonic() + batas
+    while not kondisi():
+        assert time.monotonic() < akhir, "kondisi tidak terpenuhi"
+        time.sleep(0.01)
+
+# test thread penerima bus sqlite membaca log secara berkala dan tetap berjalan setelah log gagal dibaca
+def test_bus_sqlite_polling_thread(tmp_path):
+    a = BusSqlite(str(tmp_path / "invalidasi.db"), interval=3600)
+    b = BusSqlite(str(tmp_path / "invalidasi.db"), interval=0.01)
+    diterima = []
+    b.mulai(lambda rencana_id, versi: diterima.append((rencana_id, versi)), lambda: None)
+
+    tarik = b.tarik
+    gagal = []
+
+    # pembacaan pertama gagal seperti saat file log terkunci
+    def tarik_sekali_gagal():
+        if not gagal:
+            gagal.append(True)
+            raise sqlite3.OperationalError("database is locked")
+        tarik()
+
+    b.tarik = tarik_sekali_gagal
+    try:
+        rencana_id = uuid4()
+        a.terbitkan(rencana_id, 3)
+        tunggu(lambda: diterima == [(rencana_id, 3)])
+        assert gagal == [True]
+    finally:
+        a.berhenti()
+        b.berhenti()
+    assert b._thread is None and b._koneksi_baca is None
+
+# test antarmuka bus tidak dapat dipakai langsung tanpa terbitkan dan mulai
+def test_bus_invalidasi_abstrak():
+    with pytest.raises(TypeError):
+        BusInvalidasi()
+
+def test_buat_bus_url_tidak_didukung():
+    with pytest.raises(ValueError):
+        buat_bus("kafka://localhost")
+
+def test_buat_bus_sqlite(tmp_path):
+    bus = buat_bus(f"sqlite:///{tmp_path}/invalidasi.db")
+    assert isinstance(bus, BusSqlite)
+    assert bus.path == f"{tmp_path}/invalidasi.db"
+    bus.berhenti()
+
+# server pub/sub palsu pengganti paket redis: setiap subscriber memiliki antrean pesan sendiri
+class ServerPubSub:
+    def __init__(self):
+        self.subscriber = []
+        self.putus = threading.Event()
+        self.terbit_gagal = False
+
+# modul redis palsu dengan API yang dipakai BusRedis
+def modul_redis_palsu(server: ServerPubSub):
+    class RedisError(Exception):
+        pass
+
+    class PubSubPalsu:
+        def __init__(self, ignore_subscribe_messages: bool):
+            assert ignore_subscribe_messages
+            self.pesan = queue.Queue()
+            self.ditutup = False
+
+        def subscribe(self, channel):
+            self.channel = channel
+            server.subscriber.append(self)
+
+        def get_message(self, timeout: float):
+            if server.putus.is_set():
+                server.putus.clear()
+                raise RedisError("koneksi terputus")
+            try:
+                return self.pesan.get(timeout=min(timeout, 0.01))
+            except queue.Empty:
+                return None
+
+        def close(self):
+            self.ditutup = True
+            server.subscriber.remove(self)
+
+    class KlienPalsu:
+        def publish(self, channel, pesan):
+            if server.terbit_gagal:
+                raise RedisError("koneksi ditolak")
+            for subscriber in list(server.subscriber):
+                if subscriber.channel == channel:
+                    subscriber.pesan.put({"type": "message", "channel": channel, "data": pesan.encode()})
+
+        def pubsub(self, ignore_subscribe_messages: bool = False):
+            return PubSubPalsu(ignore_subscribe_messages)
+
+    class Redis:
+        @staticmethod
+        def from_url(url, **opsi):
+            assert url == "redis://localhost:6379/0"
+            return KlienPalsu()
+
+    return types.SimpleNamespace(Redis=Redis, RedisError=RedisError)
+
+@pytest.fixture(name="server_redis")
+def server_redis_fixture(monkeypatch):
+    server = ServerPubSub()
+    monkeypatch.setitem(sys.modules, "redis", modul_redis_palsu(server))
+    return server
+
+# test bus redis menyebarkan invalidasi ke worker lain dan mengosongkan cache saat koneksi terputus
+def test_bus_redis_pubsub(server_redis):
+    a, b = buat_bus("redis://localhost:6379/0"), buat_bus("redis://localhost:6379/0")
+    assert isinstance(a, BusRedis)
+    diterima, dikosongkan = [], []
+    for bus, daftar in ((a, []), (b, diterima)):
+        bus.mulai(lambda rencana_id, versi, daftar=daftar: daftar.append((rencana_id, versi)), lambda: dikosongkan.append(True))
+    try:
+        tunggu(lambda: len(server_redis.subscriber) == 2)
+        rencana_id = uuid4()
+        a.terbitkan(rencana_id, 4)
+        tunggu(lambda: diterima == [(rencana_id, 4)])
+        assert a.snapshot() == {"jenis": "redis", "terbit": 1, "terima": 0, "kosongkan": 0, "gagal_terbit": 0}
+        assert b.snapshot()["terima"] == 1
+
+        # subscriber pertama yang membaca saat koneksi putus mengosongkan cache lalu berlangganan ulang
+        server_redis.putus.set()
+        tunggu(lambda: dikosongkan == [True])
+        assert a.snapshot()["kosongkan"] + b.snapshot()["kosongkan"] == 1
+
+        # publish yang gagal dicatat tanpa melempar exception
+        server_redis.terbit_gagal = True
+        assert not a.terbitkan_aman(uuid4(), 5)
+        assert a.snapshot()["gagal_terbit"] == 1
+    finally:
+        a.berhenti()
+        b.berhenti()
+    assert server_redis.subscriber == []
+
+def test_bus_redis_tanpa_paket_redis(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(RuntimeError, match="pip install travel-planner\\[redis\\]"):
+        BusRedis("redis://localhost:6379/0")
+
+# test startup/shutdown aplikasi menjalankan penerima bus yang menerapkan pesan ke cache aggregate
+def test_cache_menjalankan_bus_invalidasi(monkeypatch, tmp_path):
+    cache_uji = CacheAggregate(ttl=60, maks_byte=1024 * 1024)
+    bus = BusSqlite(str(tmp_path / "invalidasi.db"), interval=3600)
+    lain = BusSqlite(str(tmp_path / "invalidasi.db"), interval=3600)
+    monkeypatch.setattr(cache, "cache_aggregate", cache_uji)
+    monkeypatch.setattr(cache, "bus_invalidasi", bus)
+
+    cache.mulai_bus_invalidasi()
+    try:
+        a, b = uuid4(), uuid4()
+        cache_uji.simpan(a, 1, b"a")
+        cache_uji.simpan(b, 1, b"b")
+        lain.terbitkan(a, 2)
+        bus.tarik()
+        assert cache_uji.ambil(a) is None
+        assert cache_uji.ambil(b) == (1, b"b")
+
+        # pesan berikutnya terhapus sebelum terbaca sehingga seluruh cache dikosongkan
+        lain.terbitkan(uuid4(), 2)
+        lain._koneksi_tulis.execute("DELETE FROM log_invalidasi")
+        bus.tarik()
+        assert cache_uji.ambil(b) is None
+    finally:
+        cache.hentikan_bus_invalidasi()
+        lain.berhenti()
+    assert bus._thread is None
+
+# test penulisan lewat endpoint diterbitkan ke worker lain
+def test_penulisan_endpoint_menginvalidasi_worker_lain(client, sample_rencana_data, auth_headers, monkeypatch, tmp_path):
+    a = Worker(tmp_path / "invalidasi.db")
+    b = Worker(tmp_path / "invalidasi.db")
+    monkeypatch.setattr(cache, "cache_aggregate", a.cache)
+    monkeypatch.setattr(cache, "bus_invalidasi", a.bus)
+    try:
+        rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+        url = f"/api/perencanaan/{rencana_id}"
+        isi = client.get(url, headers=auth_headers).content
+        b.cache.simpan(UUID(rencana_id), 1, isi)
+
+        client.put(f"{url}/anggaran", json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}}, headers=auth_headers)
+        b.bus.tarik()
+
+        assert b.cache.snapshot()["jumlah_entri"] == 0
+        assert client.get("/api/monitoring/cache", headers=auth_headers).json()["bus"]["terbit"] == 1
+    finally:
+        a.berhenti()
+        b.berhenti()
+
+# test penulisan yang sudah di-commit tetap berhasil saat bus tidak dapat menerbitkan invalidasi
+def test_penulisan_tetap_berhasil_saat_bus_gagal(client, sample_rencana_data, auth_headers, monkeypatch, tmp_path):
+    a = Worker(tmp_path / "invalidasi.db")
+    monkeypatch.setattr(cache, "cache_aggregate", a.cache)
+    monkeypatch.setattr(cache, "bus_invalidasi", a.bus)
+
+    def terbitkan_terkunci(rencana_id, versi):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(a.bus, "terbitkan", terbitkan_terkunci)
+    try:
+        rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+        url = f"/api/perencanaan/{rencana_id}"
+        client.get(url, headers=auth_headers)
+        assert a.cache.snapshot()["jumlah_entri"] == 1
+
+        response = client.put(f"{url}/anggaran", json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}}, headers=auth_headers)
+        assert response.status_code == 200
+
+        # invalidasi tetap berlaku di cache lokal dan kegagalan tercatat di statistik bus
+        assert a.cache.snapshot()["jumlah_entri"] == 0
+        assert client.get(url, headers=auth_headers).json()["anggaran_jumlah"] == 7000000.0
+        bus = client.get("/api/monitoring/cache", headers=auth_headers).json()["bus"]
+        assert (bus["terbit"], bus["gagal_terbit"]) == (0, 1)
+    finally:
+        a.berhenti()
@@ -0,0 +1,152 @@
+# skrip untuk test middleware kompresi response
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from kompresi import MiddlewareKompresi, etag_tanpa_encoding, etag_terkompresi, pilih_encoding
+
+ISI_BESAR = {"aktivitasList": [{"deskripsi": f"Aktivitas {i}", "lokasi": {"namaTempat": "Pantai Kuta"}} for i in range(200)]}
+
+@pytest.fixture(name="client_kompresi")
+def client_kompresi_fixture():
+    app = FastAPI()
+    app.add_middleware(MiddlewareKompresi, min_byte=500)
+
+    @app.get("/besar")
+    def besar():
+        return ISI_BESAR
+
+    @app.get("/kecil")
+    def kecil():
+        return {"pesan": "ok"}
+
+    @app.get("/etag")
+    def dengan_etag():
+        return JSONResponse(ISI_BESAR, headers={"ETag": '"3"'})
+
+    @app.get("/tidak-berubah")
+    def tidak_berubah(etag: bool = True):
+        return Response(status_code=304, headers={"ETag": '"3"'} if etag else {})
+
+    @app.get("/stream")
+    def stream():
+        def baris():
+            for i in range(100):
+                yield json.dumps({"baris": i, "isi": "x" * 20}) + "\n"
+        return StreamingResponse(baris(), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+def test_pilih_encoding():
+    tersedia = ["br", "zstd", "gzip"]
+    assert pilih_encoding("gzip, deflate, br", tersedia) == "br"
+    assert pilih_encoding("gzip;q=1.0, br;q=0.5", tersedia) == "gzip"
+    assert pilih_encoding("br;q=0, *", tersedia) == "zstd"
+    assert pilih_encoding("identity", tersedia) is None
+    assert pilih_encoding("", tersedia) is None
+    assert pilih_encoding("*;q=0", ["gzip"]) is None
+    # bobot q yang tidak valid dianggap q=0 (ditolak)
+    assert pilih_encoding("br;q=abc, gzip", tersedia) == "gzip"
+
+# test response besar dikompresi gzip dan response kecil dikirim apa adanya
+def test_kompresi_gzip_dengan_ambang(client_kompresi):
+    response = client_kompresi.get("/besar", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) < len(json.dumps(ISI_BESAR))
+    assert response.json() == ISI_BESAR
+
+    response = client_kompresi.get("/kecil", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.json() == {"pesan": "ok"}
+
+    response = client_kompresi.get("/besar", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+
+# test ETag tetap kuat dan diberi sufiks encoding saat body dikompresi
+def test_kompresi_etag_per_encoding(client_kompresi):
+    assert client_kompresi.get("/etag", headers={"Accept-Encoding": "gzip"}).headers["ETag"] == '"3-gzip"'
+    assert client_kompresi.get("/etag", headers={"Accept-Encoding": "identity"}).headers["ETag"] == '"3"'
+
+# test sufiks encoding ETag dipasang dan dilepas
+def test_etag_terkompresi():
+    assert etag_terkompresi('"3"', "br") == '"3-br"'
+    assert etag_terkompresi('W/"3"', "gzip") == 'W/"3-gzip"'
+    assert etag_tanpa_encoding('"3-zstd"') == '"3"'
+    assert etag_tanpa_encoding('"3-1a2b3c4d-gzip"') == '"3-1a2b3c4d"'
+    assert etag_tanpa_encoding('"3"') == '"3"'
+    assert etag_terkompresi("bukan-etag", "gzip") == "bukan-etag"
+
+# test 304 membawa ETag bersufiks hanya bila client menyimpan representasi dengan encoding yang sama
+def test_kompresi_etag_304(client_kompresi):
+    def etag_304(**headers):
+        response = client_kompresi.get("/tidak-berubah", headers=headers)
+        assert response.status_code == 304
+        return response.headers.get("ETag")
+
+    assert etag_304(**{"Accept-Encoding": "gzip", "If-None-Match": '"3-gzip"'}) == '"3-gzip"'
+    assert etag_304(**{"Accept-Encoding": "gzip", "If-None-Match": '"3"'}) == '"3"'
+    assert etag_304(**{"Accept-Encoding": "identity", "If-None-Match": '"3-gzip"'}) == '"3"'
+    assert client_kompresi.get("/tidak-berubah", params={"etag": "false"}, headers={"Accept-Encoding": "gzip"}).headers.get("ETag") is None
+
+# test response streaming dikompresi per potongan tanpa Content-Length
+def test_kompresi_streaming(client_kompresi):
+    with client_kompresi.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        mentah = b"".join(response.iter_raw())
+
+    baris = gzip.decompress(mentah).decode().splitlines()
+    assert len(baris) == 100
+    assert json.loads(baris[-1])["baris"] == 99
+
+    # setiap potongan di-flush sehingga awal stream dapat didekompresi sebelum stream selesai
+    dekompresor = zlib.decompressobj(31)
+    assert dekompresor.decompress(mentah[: len(mentah) // 2]).startswith(b'{"baris": 0')
+
+def test_kompresi_brotli(client_kompresi):
+    pytest.importorskip("brotli")
+    response = client_kompresi.get("/besar", headers={"Accept-Encoding": "br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.json() == ISI_BESAR
+
+def test_kompresi_zstd(client_kompresi):
+    pytest.importorskip("zstandard")
+    response = client_kompresi.get("/besar", headers={"Accept-Encoding": "zstd"})
+    assert response.headers["Content-Encoding"] == "zstd"
+    assert response.json() == ISI_BESAR
+
+# test aggregate besar dari aplikasi utama dikirim terkompresi
+def test_get_rencana_terkompresi(client, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    url = f"/api/perencanaan/{rencana_id}"
+    client.post(
+        f"{url}/pengeluaran/batch",
+        json=[{"deskripsi": f"Struk {i}", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"} for i in range(30)],
+        headers=auth_headers,
+    )
+
+    response = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()["pengeluaranList"]) == 30
+
+    # ETag bersufiks encoding tetap dapat dipakai untuk If-None-Match dan If-Match
+    etag = response.headers["ETag"]
+    assert etag == '"2-gzip"'
+    response = client.get(url, headers={**auth_headers, "Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    response = client.get(url, headers={**auth_headers, "Accept-Encoding": "identity", "If-None-Match": '"2"'})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == '"2"'
+
+    # If-Match memakai perbandingan kuat sehingga ETag lemah ditolak
+    anggaran = {"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}}
+    assert client.put(f"{url}/anggaran", json=anggaran, headers={**auth_headers, "If-Match": 'W/"2"'}).status_code == 412
+    response = client.put(f"{url}/anggaran", json=anggaran, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
@@ -0,0 +1,89 @@
+# skrip untuk test jumlah query SQL per endpoint (mencegah regresi refresh/reload setelah commit)
+import pytest
+from datetime import date, time
+from uuid import UUID
+from models import RencanaPerjalanan, Aktivitas, Pengeluaran
+from database import DB_EXPIRE_ON_COMMIT
+
+# jumlah query di bawah berlaku untuk mode session expire_on_commit=False
+pytestmark = pytest.mark.skipif(DB_EXPIRE_ON_COMMIT, reason="DB_EXPIRE_ON_COMMIT=true memuat ulang objek setelah commit")
+
+LOKASI = {"namaLokasi": "Pantai Kuta", "alamat": "Kuta, Bali", "latitude": -8.72, "longitude": 115.17}
+
+# membuat rencana berisi hari, aktivitas dan pengeluaran, lalu mengosongkan identity map
+# agar setiap request diukur seperti request baru dengan session baru
+@pytest.fixture
+def rencana_id(client, session, sample_rencana_data, auth_headers):
+    rencana_id = client.post("/api/perencanaan/", json=sample_rencana_data, headers=auth_headers).json()["id"]
+    rencana = session.get(RencanaPerjalanan, UUID(rencana_id))
+    for hari_ke in range(1, 4):
+        hari = rencana.tambahHariPerjalanan(date(2024, 12, hari_ke))
+        hari.tambahAktivitas(Aktivitas(waktuMulai=time(9), waktuSelesai=time(10), deskripsi="Tur", lokasi=LOKASI))
+        rencana.tambahPengeluaran(Pengeluaran(deskripsi="Makan", biaya_jumlah=100.0, tanggalPengeluaran=hari.tanggal))
+    session.commit()
+    session.expunge_all()
+    return rencana_id
+
+# menjalankan request dan mengembalikan response beserta jumlah statement SQL yang dikirim
+@pytest.fixture
+def ukur(client, session, executed_queries, auth_headers):
+    def _ukur(method, url, **kwargs):
+        session.expunge_all()
+        executed_queries.clear()
+        response = client.request(method, url, headers=auth_headers, **kwargs)
+        return response, len(executed_queries)
+    return _ukur
+
+# test membuat rencana: satu INSERT tanpa refresh
+def test_jumlah_query_create_rencana(ukur, sample_rencana_data):
+    response, jumlah = ukur("POST", "/api/perencanaan/", json=sample_rencana_data)
+    assert response.status_code == 201
+    assert jumlah == 1
+
+# test menambahkan hari: baca rencana, cek tanggal lewat index, INSERT hari, UPDATE versi
+# (hariPerjalananList tidak dimuat, sehingga jumlah baris yang dibaca tidak bergantung pada jumlah hari)
+def test_jumlah_query_add_hari(ukur, rencana_id):
+    response, jumlah = ukur("POST", f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-05"})
+    assert response.status_code == 200
+    assert jumlah == 4
+
+# test menambahkan pengeluaran: baca rencana, INSERT pengeluaran, UPDATE total dan versi
+def test_jumlah_query_add_pengeluaran(ukur, rencana_id):
+    data = {"deskripsi": "Hotel", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"}
+    response, jumlah = ukur("POST", f"/api/perencanaan/{rencana_id}/pengeluaran", json=data)
+    assert response.status_code == 200
+    assert jumlah == 3
+
+# test menambahkan aktivitas: baca rencana, cari hari, kandidat konflik, INSERT aktivitas, UPDATE versi
+def test_jumlah_query_add_aktivitas(ukur, rencana_id):
+    data = {"waktuMulai": "13:00:00", "waktuSelesai": "14:00:00", "deskripsi": "Makan siang", "lokasi": LOKASI}
+    response, jumlah = ukur("POST", f"/api/perencanaan/{rencana_id}/hari/2024-12-02/aktivitas", json=data)
+    assert response.status_code == 200
+    assert jumlah == 5
+
+# test update anggaran: baca rencana lalu UPDATE
+def test_jumlah_query_update_anggaran(ukur, rencana_id):
+    response, jumlah = ukur("PUT", f"/api/perencanaan/{rencana_id}/anggaran", json={"anggaranBaru": {"jumlah": 7000000.0, "mata_uang": "IDR"}})
+    assert response.status_code == 200
+    assert response.json()["anggaran_jumlah"] == 7000000.0
+    assert jumlah == 2
+
+# test update durasi: baca rencana, MIN/MAX tanggal hari dan pengeluaran (satu query), lalu UPDATE
+def test_jumlah_query_update_durasi(ukur, rencana_id):
+    response, jumlah = ukur("PUT", f"/api/perencanaan/{rencana_id}/durasi", json={"durasiBaru": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-10"}})
+    assert response.status_code == 200
+    assert response.json()["durasi_selesai"] == "2024-12-10"
+    assert jumlah == 3
+
+# test menghapus hari: baca rencana, cari hari, DELETE aktivitas, DELETE hari, UPDATE versi
+def test_jumlah_query_delete_hari(ukur, rencana_id):
+    response, jumlah = ukur("DELETE", f"/api/perencanaan/{rencana_id}/hari/2024-12-01")
+    assert response.status_code == 200
+    assert jumlah == 5
+
+# test menghapus pengeluaran: baca rencana, cari pengeluaran, DELETE pengeluaran, UPDATE total dan versi
+def test_jumlah_query_delete_pengeluaran(ukur, session, rencana_id):
+    id_pengeluaran = session.get(RencanaPerjalanan, UUID(rencana_id)).pengeluaranList[0].idPengeluaran
+    response, jumlah = ukur("DELETE", f"/api/perencanaan/{rencana_id}/pengeluaran/{id_pengeluaran}")
+    assert response.status_code == 200
+    assert jumlah == 4
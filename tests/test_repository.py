@@ -0,0 +1,172 @@
+# skrip untuk test query SQL terarah pada repository
+import pytest
+from datetime import date
+from datetime import time
+from sqlmodel import select
+from models import RencanaPerjalanan, Pengeluaran, Aktivitas
+from repository import cek_konsistensi_total_pengeluaran, hitung_ulang_total_pengeluaran
+import cache
+from cache import CacheAggregate
+
+# membuat rencana dengan sejumlah pengeluaran yang sudah tersimpan
+def buat_rencana_dengan_pengeluaran(session, jumlah):
+    rencana = RencanaPerjalanan(
+        nama="Test",
+        durasi_mulai=date(2024, 12, 1),
+        durasi_selesai=date(2024, 12, 7),
+        anggaran_jumlah=1e12,
+        anggaran_mata_uang="IDR"
+    )
+    session.add(rencana)
+    for i in range(jumlah):
+        rencana.tambahPengeluaran(Pengeluaran(deskripsi=f"Biaya {i}", biaya_jumlah=100.0, tanggalPengeluaran=date(2024, 12, 2)))
+    session.commit()
+    return rencana.id
+
+def test_tambah_pengeluaran_tidak_memuat_koleksi(session, executed_queries):
+    rencana_id = buat_rencana_dengan_pengeluaran(session, 500)
+    session.expunge_all()
+
+    rencana = session.get(RencanaPerjalanan, rencana_id)
+    executed_queries.clear()
+    rencana.tambahPengeluaran(Pengeluaran(deskripsi="Taksi", biaya_jumlah=50.0, tanggalPengeluaran=date(2024, 12, 3)))
+    session.commit()
+
+    assert not any(q.lstrip().upper().startswith("SELECT") and "FROM pengeluaran" in q for q in executed_queries)
+    assert rencana.total_pengeluaran == 50050.0
+    assert rencana.jumlah_pengeluaran == 501
+    assert cek_konsistensi_total_pengeluaran(session, rencana_id) == []
+
+def test_cek_dan_hitung_ulang_total_pengeluaran(session, monkeypatch):
+    rencana_id = buat_rencana_dengan_pengeluaran(session, 3)
+    rencana_lain = buat_rencana_dengan_pengeluaran(session, 1)
+
+    # merusak total tersimpan
+    rencana = session.get(RencanaPerjalanan, rencana_id)
+    rencana.total_pengeluaran = 0.0
+    rencana.jumlah_pengeluaran = 0
+    session.commit()
+
+    assert cek_konsistensi_total_pengeluaran(session) == [rencana_id]
+
+    # hitung ulang tidak melakukan commit sendiri
+    hitung_ulang_total_pengeluaran(session, rencana_id)
+    session.rollback()
+    assert cek_konsistensi_total_pengeluaran(session) == [rencana_id]
+
+    # pemanggil melakukan commit lalu menginvalidasi entri cache dengan versi yang dikembalikan
+    cache_uji = CacheAggregate(ttl=60, maks_byte=1024 * 1024)
+    monkeypatch.setattr(cache, "cache_aggregate", cache_uji)
+    versi_lama = session.get(RencanaPerjalanan, rencana_id).versi
+    cache_uji.simpan(rencana_id, versi_lama, b"{}")
+    diperbarui = hitung_ulang_total_pengeluaran(session, rencana_id)
+    assert diperbarui == [(rencana_id, versi_lama + 1)]
+    session.commit()
+    for id_diperbarui, versi in diperbarui:
+        cache.invalidasi_rencana(id_diperbarui, versi)
+    assert cache_uji.ambil(rencana_id) is None
+
+    assert cek_konsistensi_total_pengeluaran(session) == []
+    assert session.get(RencanaPerjalanan, rencana_id).total_pengeluaran == 300.0
+    assert session.get(RencanaPerjalanan, rencana_lain).jumlah_pengeluaran == 1
+    assert {id_diperbarui for id_diperbarui, _ in hitung_ulang_total_pengeluaran(session)} == {rencana_id, rencana_lain}
+
+# membuat rencana dengan satu hari berisi sejumlah aktivitas berurutan per 10 menit
+def buat_hari_dengan_aktivitas(session, rencana_id, jumlah):
+    rencana = session.get(RencanaPerjalanan, rencana_id)
+    hari = rencana.tambahHariPerjalanan(date(2024, 12, 3))
+    for i in range(jumlah):
+        menit = i * 10
+        hari.aktivitasList.append(Aktivitas(
+            waktuMulai=time(menit // 60, menit % 60),
+            waktuSelesai=time(menit // 60, menit % 60 + 5),
+            deskripsi=f"Aktivitas {i}",
+            lokasi={"namaLokasi": "X", "alamat": "Y", "latitude": 0.0, "longitude": 0.0}
+        ))
+    session.commit()
+
+# jalur penulisan endpoint tidak memuat koleksi anak aggregate
+def test_endpoint_penulisan_tidak_memuat_aggregate(client, session, executed_queries, auth_headers):
+    rencana_id = buat_rencana_dengan_pengeluaran(session, 200)
+    buat_hari_dengan_aktivitas(session, rencana_id, 100)
+    session.expunge_all()
+    lokasi = {"namaLokasi": "X", "alamat": "Y", "latitude": 0.0, "longitude": 0.0}
+
+    # SELECT pada tabel anak yang difilter berdasarkan induknya (refresh satu baris lewat primary key
+    # pada mode DB_EXPIRE_ON_COMMIT=true tidak dihitung)
+    def select_koleksi():
+        return [
+            q for q in executed_queries
+            if q.lstrip().upper().startswith("SELECT") and "WHERE" in q
+            and any(kolom in q.split("WHERE", 1)[1] for kolom in ("pengeluaran.rencana_id", "aktivitas.hari_id"))
+        ]
+
+    executed_queries.clear()
+    response = client.post(
+        f"/api/perencanaan/{rencana_id}/pengeluaran",
+        json={"deskripsi": "Taksi", "biaya": {"jumlah": 50.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-03"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["total_pengeluaran"] == 20050.0
+    assert select_koleksi() == []
+
+    executed_queries.clear()
+    response = client.post(
+        f"/api/perencanaan/{rencana_id}/hari/2024-12-03/aktivitas",
+        json={"waktuMulai": "23:00:00", "waktuSelesai": "23:30:00", "deskripsi": "Malam", "lokasi": lokasi},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    # hanya satu seek kandidat konflik yang dibatasi LIMIT
+    kandidat = select_koleksi()
+    assert len(kandidat) == 1 and "LIMIT" in kandidat[0]
+
+    pengeluaran_id = session.exec(select(Pengeluaran.idPengeluaran).where(Pengeluaran.rencana_id == rencana_id)).first()
+    executed_queries.clear()
+    response = client.delete(f"/api/perencanaan/{rencana_id}/pengeluaran/{pengeluaran_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["jumlah_pengeluaran"] == 200
+    assert len(select_koleksi()) == 1
+
+    executed_queries.clear()
+    response = client.delete(f"/api/perencanaan/{rencana_id}/hari/2024-12-03", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["jumlah_aktivitas_dihapus"] == 101
+    assert select_koleksi() == []
+
+    assert session.exec(select(Aktivitas)).all() == []
+    assert cek_konsistensi_total_pengeluaran(session, rencana_id) == []
+
+def test_cari_anak_lewat_sql_tanpa_memuat_koleksi(session, executed_queries):
+    rencana_id = buat_rencana_dengan_pengeluaran(session, 200)
+    rencana = session.get(RencanaPerjalanan, rencana_id)
+    for hari_ke in range(1, 8):
+        rencana.tambahHariPerjalanan(date(2024, 12, hari_ke))
+    session.commit()
+    id_pengeluaran = session.exec(select(Pengeluaran.idPengeluaran).where(Pengeluaran.rencana_id == rencana_id)).first()
+    session.expunge_all()
+
+    rencana = session.get(RencanaPerjalanan, rencana_id)
+    executed_queries.clear()
+
+    assert rencana.getHariPerjalanan(date(2024, 12, 4)).tanggal == date(2024, 12, 4)
+    assert rencana.getPengeluaran(id_pengeluaran).idPengeluaran == id_pengeluaran
+    with pytest.raises(ValueError, match="sudah ada"):
+        rencana.tambahHariPerjalanan(date(2024, 12, 4))
+    assert rencana.hapusPengeluaran(id_pengeluaran) is True
+    session.commit()
+
+    # satu query per pencarian, koleksi anak tetap belum dimuat
+    assert len([q for q in executed_queries if q.lstrip().upper().startswith("SELECT")]) == 4
+    assert "hariPerjalananList" not in rencana.__dict__
+    assert "pengeluaranList" not in rencana.__dict__
+    assert rencana.jumlah_pengeluaran == 199
+    assert cek_konsistensi_total_pengeluaran(session, rencana_id) == []
+
+    # setelah koleksi dimuat, pencarian memakai index koleksi tanpa query tambahan
+    assert len(rencana.hariPerjalananList) == 7
+    executed_queries.clear()
+    hari = rencana.getHariPerjalanan(date(2024, 12, 6))
+    assert executed_queries == []
+    assert any(h is hari for h in rencana.hariPerjalananList)
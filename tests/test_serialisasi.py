@@ -0,0 +1,29 @@
+# skrip untuk test serializer JSON aggregate
+import json
+from datetime import date, time
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+
+from models.aggregate_root import RencanaPerjalanan
+from models.entity import HariPerjalanan, Aktivitas, Pengeluaran
+from schema import RencanaPerjalananRead
+from serialisasi import ResponseJSON, serialisasi_rencana
+
+def test_serialisasi_rencana_sama_dengan_jsonable_encoder():
+    rencana = RencanaPerjalanan(nama="Bali", durasi_mulai=date(2024, 12, 1), durasi_selesai=date(2024, 12, 3), anggaran_jumlah=5e6)
+    hari = HariPerjalanan(tanggal=date(2024, 12, 1))
+    hari.aktivitasList.append(Aktivitas(waktuMulai=time(8, 0), waktuSelesai=time(9, 30), deskripsi="Sarapan", lokasi={"namaTempat": "Kuta", "koordinat": [-8.7, 115.1]}))
+    rencana.hariPerjalananList.append(hari)
+    rencana.pengeluaranList.append(Pengeluaran(deskripsi="Tiket", biaya_jumlah=150000.0, biaya_mata_uang="IDR", tanggalPengeluaran=date(2024, 12, 2)))
+
+    hasil = json.loads(serialisasi_rencana(rencana))
+    assert hasil == jsonable_encoder(RencanaPerjalananRead.model_validate(rencana))
+    assert hasil["hariPerjalananList"][0]["aktivitasList"][0]["waktuMulai"] == "08:00:00"
+
+def test_response_json_meneruskan_bytes():
+    assert ResponseJSON(content=b'{"a":1}').body == b'{"a":1}'
+    assert json.loads(ResponseJSON(content={"id": UUID(int=1), "tanggal": date(2024, 12, 1)}).body) == {
+        "id": "00000000-0000-0000-0000-000000000001",
+        "tanggal": "2024-12-01",
+    }
@@ -62,18 +62,91 @@ def test_add_hari_perjalanan_duplicate(client, auth_headers):
     # Coba tambahkan lagi - should fail
     response = client.post(f"/api/perencanaan/{rencana_id}/hari", json=hari_data, headers=auth_headers)
     
-    # Accept 400 or 500 for now (duplicate handling needs fix in backend)
-    assert response.status_code in [400, 500]
+    assert response.status_code == 400
+    assert "sudah ada" in response.json()["detail"]
 
 # test menambahkan Aktivitas - sukses
-@pytest.mark.skip(reason="Lokasi serialization not implemented in backend")
 def test_add_aktivitas_success(client, auth_headers):
-    pass
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-03"}, headers=auth_headers)
+
+    aktivitas_data = {
+        "waktuMulai": "09:00:00",
+        "waktuSelesai": "11:00:00",
+        "deskripsi": "Museum",
+        "lokasi": {"namaLokasi": "Museum", "alamat": "Jl. Merdeka", "latitude": -6.17, "longitude": 106.82}
+    }
+    response = client.post(
+        f"/api/perencanaan/{rencana_id}/hari/2024-12-03/aktivitas",
+        json=aktivitas_data,
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["tanggal"] == "2024-12-03"
+    assert result["aktivitas"]["deskripsi"] == "Museum"
+    assert result["aktivitas"]["lokasi"]["namaLokasi"] == "Museum"
 
 # test menambahkan Aktivitas yang konflik
-@pytest.mark.skip(reason="Lokasi serialization not implemented in backend")
 def test_add_aktivitas_conflict(client, auth_headers):
-    pass
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-03"}, headers=auth_headers)
+
+    lokasi = {"namaLokasi": "Museum", "alamat": "Jl. Merdeka", "latitude": -6.17, "longitude": 106.82}
+    url = f"/api/perencanaan/{rencana_id}/hari/2024-12-03/aktivitas"
+    client.post(url, json={"waktuMulai": "09:00:00", "waktuSelesai": "11:00:00", "deskripsi": "Museum", "lokasi": lokasi}, headers=auth_headers)
+    client.post(url, json={"waktuMulai": "13:00:00", "waktuSelesai": "15:00:00", "deskripsi": "Pasar", "lokasi": lokasi}, headers=auth_headers)
+
+    # bertabrakan dengan aktivitas pertama (bukan aktivitas terakhir di hari tersebut)
+    response = client.post(url, json={"waktuMulai": "10:00:00", "waktuSelesai": "12:00:00", "deskripsi": "Kafe", "lokasi": lokasi}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "Museum" in response.json()["detail"]
+
+    # berbatasan tepat dengan aktivitas lain tidak dianggap konflik
+    response = client.post(url, json={"waktuMulai": "11:00:00", "waktuSelesai": "13:00:00", "deskripsi": "Makan", "lokasi": lokasi}, headers=auth_headers)
+    assert response.status_code == 200
+
+    # waktu mulai melebihi waktu selesai ditolak sama seperti pada endpoint batch
+    response = client.post(url, json={"waktuMulai": "18:00:00", "waktuSelesai": "17:00:00", "deskripsi": "Terbalik", "lokasi": lokasi}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "melebihi waktu selesai" in response.json()["detail"]
+
+# test menambahkan Aktivitas pada hari yang belum dibuat
+def test_add_aktivitas_hari_not_found(client, auth_headers):
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+
+    aktivitas_data = {
+        "waktuMulai": "09:00:00",
+        "waktuSelesai": "11:00:00",
+        "deskripsi": "Museum",
+        "lokasi": {"namaLokasi": "Museum", "alamat": "Jl. Merdeka", "latitude": -6.17, "longitude": 106.82}
+    }
+    response = client.post(
+        f"/api/perencanaan/{rencana_id}/hari/2024-12-04/aktivitas",
+        json=aktivitas_data,
+        headers=auth_headers
+    )
+
+    assert response.status_code == 404
 
 # test menambahkan Pengeluaran - sukses
 def test_add_pengeluaran_success(client, auth_headers):
@@ -99,10 +172,12 @@ def test_add_pengeluaran_success(client, auth_headers):
         headers=auth_headers
     )
     
-    # Backend has a bug (500 error) - skip for now
-    if response.status_code == 500:
-        pytest.skip("Backend error - Pengeluaran endpoint needs fixing")
     assert response.status_code == 200
+    result = response.json()
+    assert result["pengeluaran"]["deskripsi"] == "Hotel"
+    assert result["total_pengeluaran"] == 1000000.0
+    assert result["jumlah_pengeluaran"] == 1
+    assert result["sisa_anggaran"] == 4000000.0
 
 # test menambahkan Pengeluaran melebihi anggaran
 def test_add_pengeluaran_exceeds_budget(client, auth_headers):
@@ -128,9 +203,6 @@ def test_add_pengeluaran_exceeds_budget(client, auth_headers):
         headers=auth_headers
     )
     
-    # Backend has a bug (500 error) - skip for now
-    if response.status_code == 500:
-        pytest.skip("Backend error - Pengeluaran endpoint needs fixing")
     assert response.status_code == 400
 
 # test update anggaran - sukses
@@ -156,8 +228,6 @@ def test_update_anggaran_success(client, auth_headers):
         headers=auth_headers
     )
     
-    if response.status_code == 500:
-        pytest.skip("Backend error - Update anggaran endpoint needs fixing")
     assert response.status_code == 200
 
 # test update durasi - sukses  
@@ -183,10 +253,50 @@ def test_update_durasi_success(client, auth_headers):
         headers=auth_headers
     )
     
-    if response.status_code == 500:
-        pytest.skip("Backend error - Update durasi endpoint needs fixing")
     assert response.status_code == 200
 
+# test update durasi yang memotong hari dan pengeluaran yang sudah ada - ditolak dengan daftar tanggalnya
+def test_update_durasi_di_luar_hari_dan_pengeluaran(client, auth_headers):
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    for tanggal in ("2024-12-02", "2024-12-05", "2024-12-06"):
+        client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": tanggal}, headers=auth_headers)
+    client.post(
+        f"/api/perencanaan/{rencana_id}/pengeluaran",
+        json={"deskripsi": "Hotel", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-01"},
+        headers=auth_headers
+    )
+
+    response = client.put(
+        f"/api/perencanaan/{rencana_id}/durasi",
+        json={"durasiBaru": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-04"}},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert "hari perjalanan" in response.json()["detail"]
+    assert "2024, 12, 5" in response.json()["detail"] and "2024, 12, 6" in response.json()["detail"]
+
+    response = client.put(
+        f"/api/perencanaan/{rencana_id}/durasi",
+        json={"durasiBaru": {"tanggalMulai": "2024-12-02", "tanggalSelesai": "2024-12-07"}},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert "pengeluaran" in response.json()["detail"]
+
+    response = client.put(
+        f"/api/perencanaan/{rencana_id}/durasi",
+        json={"durasiBaru": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-06"}},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["durasi_selesai"] == "2024-12-06"
+
 # test add hari perjalanan on first day
 def test_add_hari_perjalanan_first_day(client, auth_headers):
     data = {
@@ -330,3 +440,124 @@ def test_add_hari_perjalanan_unauthorized(client, auth_headers):
     )
     
     assert response.status_code == 401
+
+# test menambahkan Pengeluaran secara batch - sukses
+def test_add_pengeluaran_batch_success(client, auth_headers):
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+
+    items = [
+        {"deskripsi": f"Struk {i}", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"}
+        for i in range(1000)
+    ]
+    response = client.post(f"/api/perencanaan/{rencana_id}/pengeluaran/batch", json=items, headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["jumlah_ditambahkan"] == 1000
+    assert len(result["idPengeluaranList"]) == 1000
+    assert result["total_pengeluaran"] == 1000000.0
+    assert result["versi"] == 2
+
+    get_response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert len(get_response.json()["pengeluaranList"]) == 1000
+
+# test menambahkan Pengeluaran secara batch dengan item tidak valid - tidak ada yang disimpan
+def test_add_pengeluaran_batch_atomik(client, auth_headers):
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+
+    items = [
+        {"deskripsi": "Makan", "biaya": {"jumlah": 2000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-02"},
+        {"deskripsi": "Tiket", "biaya": {"jumlah": 1000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-15"},
+        {"deskripsi": "Hotel", "biaya": {"jumlah": 3000.0, "mata_uang": "IDR"}, "tanggalPengeluaran": "2024-12-03"},
+    ]
+    response = client.post(f"/api/perencanaan/{rencana_id}/pengeluaran/batch", json=items, headers=auth_headers)
+
+    assert response.status_code == 400
+    kesalahan = response.json()["detail"]["kesalahan"]
+    # item dengan tanggal di luar durasi tidak ikut dihitung, sehingga item lain (2000 + 3000) masih dalam anggaran
+    assert [k["indeks"] for k in kesalahan] == [1]
+    assert "durasi" in kesalahan[0]["pesan"]
+
+    get_response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers)
+    assert get_response.json()["pengeluaranList"] == []
+    assert get_response.json()["versi"] == 1
+
+# test menambahkan Aktivitas secara batch ke beberapa hari - sukses
+def test_add_aktivitas_batch_success(client, auth_headers):
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-02"}, headers=auth_headers)
+    client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-03"}, headers=auth_headers)
+
+    lokasi = {"namaLokasi": "Pantai Kuta", "alamat": "Kuta, Bali", "latitude": -8.72, "longitude": 115.17}
+    items = [
+        {"tanggal": "2024-12-02", "waktuMulai": "13:00:00", "waktuSelesai": "14:00:00", "deskripsi": "Makan siang", "lokasi": lokasi},
+        {"tanggal": "2024-12-03", "waktuMulai": "09:00:00", "waktuSelesai": "10:00:00", "deskripsi": "Snorkeling", "lokasi": lokasi},
+        {"tanggal": "2024-12-02", "waktuMulai": "09:00:00", "waktuSelesai": "13:00:00", "deskripsi": "Surfing", "lokasi": lokasi},
+    ]
+    response = client.post(f"/api/perencanaan/{rencana_id}/aktivitas/batch", json=items, headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["jumlah_ditambahkan"] == 3
+    assert len(result["idAktivitasList"]) == 3
+    assert result["versi"] == 4
+
+    hari_list = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers).json()["hariPerjalananList"]
+    aktivitas = {h["tanggal"]: [a["deskripsi"] for a in h["aktivitasList"]] for h in hari_list}
+    assert aktivitas == {"2024-12-02": ["Surfing", "Makan siang"], "2024-12-03": ["Snorkeling"]}
+
+# test menambahkan Aktivitas secara batch dengan item tidak valid - tidak ada yang disimpan
+def test_add_aktivitas_batch_atomik(client, auth_headers):
+    data = {
+        "nama": "Test",
+        "durasi": {"tanggalMulai": "2024-12-01", "tanggalSelesai": "2024-12-07"},
+        "anggaran": {"jumlah": 5000000.0, "mata_uang": "IDR"}
+    }
+    create_response = client.post("/api/perencanaan/", json=data, headers=auth_headers)
+    rencana_id = create_response.json()["id"]
+    client.post(f"/api/perencanaan/{rencana_id}/hari", json={"tanggal": "2024-12-02"}, headers=auth_headers)
+
+    lokasi = {"namaLokasi": "Pantai Kuta", "alamat": "Kuta, Bali", "latitude": -8.72, "longitude": 115.17}
+    client.post(
+        f"/api/perencanaan/{rencana_id}/hari/2024-12-02/aktivitas",
+        json={"waktuMulai": "09:00:00", "waktuSelesai": "10:00:00", "deskripsi": "Surfing", "lokasi": lokasi},
+        headers=auth_headers
+    )
+
+    items = [
+        {"tanggal": "2024-12-02", "waktuMulai": "13:00:00", "waktuSelesai": "14:00:00", "deskripsi": "Makan siang", "lokasi": lokasi},
+        {"tanggal": "2024-12-02", "waktuMulai": "09:30:00", "waktuSelesai": "11:00:00", "deskripsi": "Snorkeling", "lokasi": lokasi},
+        {"tanggal": "2024-12-02", "waktuMulai": "13:30:00", "waktuSelesai": "15:00:00", "deskripsi": "Belanja", "lokasi": lokasi},
+        {"tanggal": "2024-12-05", "waktuMulai": "09:00:00", "waktuSelesai": "10:00:00", "deskripsi": "Tur", "lokasi": lokasi},
+        {"tanggal": "2024-12-02", "waktuMulai": "18:00:00", "waktuSelesai": "17:00:00", "deskripsi": "Terbalik", "lokasi": lokasi},
+    ]
+    response = client.post(f"/api/perencanaan/{rencana_id}/aktivitas/batch", json=items, headers=auth_headers)
+
+    assert response.status_code == 400
+    kesalahan = response.json()["detail"]["kesalahan"]
+    assert [k["indeks"] for k in kesalahan] == [1, 2, 3, 4]
+    assert "Surfing" in kesalahan[0]["pesan"]
+    assert "Makan siang" in kesalahan[1]["pesan"]
+    assert "tidak ditemukan" in kesalahan[2]["pesan"]
+
+    get_response = client.get(f"/api/perencanaan/{rencana_id}", headers=auth_headers).json()
+    assert [a["deskripsi"] for a in get_response["hariPerjalananList"][0]["aktivitasList"]] == ["Surfing"]
+    assert get_response["versi"] == 3